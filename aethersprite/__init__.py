@@ -1,33 +1,60 @@
 """Aethersprite Discord bot/framework"""
 
+# local; first, so that it can time everything else
+from .profiler import Phase, profiler
+
 # stdlib
-from importlib import import_module
+from asyncio import gather, get_running_loop
+from copy import deepcopy
+from functools import wraps
 import logging
 from os import environ
 from os.path import isfile, sep
-from typing import Optional
+from typing import Any, Optional
 from random import seed
+import signal
 
 # 3rd party
-import colorlog
-from discord import Activity, ActivityType, DMChannel, Intents, Message
+from discord import (
+    Activity,
+    ActivityType,
+    Embed,
+    Forbidden,
+    Intents,
+    MemberCacheFlags,
+    Message,
+)
 from discord.ext.commands import (
+    AutoShardedBot,
     Bot,
     CheckFailure,
     command,
+    CommandInvokeError,
     CommandNotFound,
     Context,
 )
 from pretty_help import PrettyHelp
 import toml
 
+# local
+from .logs import LogPipeline
+
+profiler.phase("imports", start=profiler.root.start).finish()
+
 config = {
     "bot": {
         "data_folder": ".",
         "extensions": ["aethersprite.extensions.base._all"],
+        "command_mode": "prefix",
         "help_command": "aehelp",
+        "log_format": "color",
         "log_level": "INFO",
     },
+    "runtime": {
+        "loop": "asyncio",
+        "eager_tasks": False,
+        "executor_workers": None,
+    },
     "webapp": {
         "proxies": None,
         "flask": {
@@ -39,14 +66,121 @@ config = {
 }
 """Configuration"""
 
-# Load config from file and merge with defaults
+_defaults = deepcopy(config)
 config_file = environ.get("AETHERSPRITE_CONFIG", "config.toml")
 
-if isfile(config_file):
-    config = {**config, **toml.load(config_file)}
+RESTART_KEYS = (
+    "bot.command_mode",
+    "bot.data_folder",
+    "bot.help_command",
+    "bot.owner",
+    "bot.token",
+)
+"""Configuration keys which cannot be changed without a restart"""
+
+
+def _merge(base: dict, overrides: dict) -> dict:
+    """
+    Recursively merge one dict on top of another.
+
+    Args:
+        base: The dict to merge into (which is not modified)
+        overrides: The values to merge on top
+
+    Returns:
+        The merged dict
+    """
+
+    merged = deepcopy(base)
+
+    for key, val in overrides.items():
+        if isinstance(val, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], val)
+        else:
+            merged[key] = deepcopy(val)
+
+    return merged
+
+
+def _diff(old: dict, new: dict, path: str = "") -> dict[str, tuple[Any, Any]]:
+    """
+    Find the differences between two configuration dicts.
+
+    Args:
+        old: The previous configuration
+        new: The updated configuration
+        path: The dotted path to the dicts being compared
+
+    Returns:
+        A mapping of dotted keys to (old value, new value) pairs
+    """
+
+    changes = {}
+
+    for key in old.keys() | new.keys():
+        name = f"{path}{key}"
+        before, after = old.get(key), new.get(key)
+
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.update(_diff(before, after, f"{name}."))
+        elif before != after:
+            changes[name] = (before, after)
+
+    return changes
+
+
+def _update(target: dict, source: dict):
+    """
+    Update a dict in place (recursively) so that it matches another, keeping
+    the identity of any nested dicts that other modules may hold.
+
+    Args:
+        target: The dict to update
+        source: The dict to match
+    """
+
+    for key in target.keys() - source.keys():
+        del target[key]
+
+    for key, val in source.items():
+        if isinstance(val, dict) and isinstance(target.get(key), dict):
+            _update(target[key], val)
+        else:
+            target[key] = val
+
+
+def _load_config() -> dict:
+    """
+    Load the configuration file (if any) and merge it with the defaults.
+
+    Returns:
+        The merged configuration
+    """
+
+    if not isfile(config_file):
+        return deepcopy(_defaults)
+
+    return _merge(_defaults, toml.load(config_file))
+
+
+with profiler.phase("config"):
+    config = _load_config()
 
 data_folder = f"{config['bot']['data_folder']}{sep}"
 
+SHARD_IDS_ENV = "AETHERSPRITE_SHARD_IDS"
+"""Environment variable a sharded worker's shard IDs are passed in"""
+
+SHARD_COUNT_ENV = "AETHERSPRITE_SHARD_COUNT"
+"""Environment variable a sharded worker's total shard count is passed in"""
+
+shard_ids: list[int] | None = (
+    [int(i) for i in environ[SHARD_IDS_ENV].split(",")]
+    if environ.get(SHARD_IDS_ENV)
+    else None
+)
+"""Shards run by this process, if it is a sharded worker"""
+
 log = logging.getLogger(__name__)
 """Root logger instance"""
 
@@ -62,9 +196,64 @@ async def help_proxy(ctx: Context, command: Optional[str] = None):
         await ctx.send_help(command)
 
 
+HELP_CACHE_SIZE = 1024
+"""How many rendered help responses to keep for each bot"""
+
+_help_pages: dict[int, dict[tuple, list[Embed]]] = {}
+"""Rendered help pages, by bot, then by guild, channel, permission class,
+prefix, invoked name, and argument"""
+
+_help_state: dict[int, tuple] = {}
+"""What each bot's cached help pages were rendered against"""
+
+
+def _invalidate_help(guild_id: int | None = None):
+    """
+    Discard rendered help pages, e.g. when gating rules change.
+
+    Args:
+        guild_id: The guild whose pages should be discarded, or None for
+            every guild
+    """
+
+    for pages in _help_pages.values():
+        if guild_id is None:
+            pages.clear()
+
+            continue
+
+        for key in [k for k in pages if k[0] == guild_id]:
+            del pages[key]
+
+
+def _invalidate_help_key(key: str | None):
+    """
+    Discard rendered help pages when a setting which role-based checks read
+    changes.
+
+    Args:
+        key: The setting's composite key, or None for every guild
+    """
+
+    _invalidate_help(None if key is None else int(key.split("#")[0]))
+
+
+def _watch_role_settings():
+    """Watch the settings which role-based checks read."""
+
+    from .filters import RoleFilter
+    from .settings import settings, watch
+
+    for name, setting in settings.items():
+        if isinstance(setting.filter, RoleFilter):
+            watch(name, _invalidate_help_key)
+
+
 class _MyHelp(PrettyHelp):
     def __init__(self):
         super().__init__(delete_invoke=True)
+        self._caching: tuple | None = None
+        """Where the pages being rendered should be cached, if anywhere"""
 
     @property
     def invoked_with(self):
@@ -80,150 +269,619 @@ class _MyHelp(PrettyHelp):
 
         return ctx.invoked_with
 
+    @staticmethod
+    def _cache_key(ctx: Context, command: str | None) -> tuple:
+        """
+        Get the cache key for a help request. Members with the same
+        permissions and roles in a channel see the same help.
 
-# colored log output
-streamHandler = logging.StreamHandler()
-streamHandler.setFormatter(
-    colorlog.ColoredFormatter(
-        "{asctime} {log_color}{levelname:<7}{reset} "
-        "{bold_white}{module}:{funcName}{reset} {cyan}\u00bb{reset} {message}",
-        style="{",
-    )
+        Args:
+            ctx: The help command's context
+            command: The command or category help was requested for
+
+        Returns:
+            The key
+        """
+
+        from .authz import owner
+
+        author = ctx.author
+        perms = ctx.channel.permissions_for(author)  # type: ignore
+        roles = tuple(sorted(r.id for r in getattr(author, "roles", ())))
+        # the owner may see commands nobody else can
+        cls = (
+            ("owner", author.id)
+            if str(author) == owner
+            else (perms.value, roles)
+        )
+
+        return (
+            ctx.guild.id if ctx.guild else None,
+            ctx.channel.id,
+            cls,
+            ctx.clean_prefix,
+            ctx.invoked_with,
+            command,
+        )
+
+    async def command_callback(self, ctx: Context, /, *, command=None):
+        state = tuple(map(id, ctx.bot.all_commands.values()))
+        cache = _help_pages.setdefault(id(ctx.bot), {})
+
+        if state != _help_state.get(id(ctx.bot)):
+            # commands were (re)loaded, possibly with settings of their own
+            cache.clear()
+            _help_state[id(ctx.bot)] = state
+            _watch_role_settings()
+
+        key = self._cache_key(ctx, command)
+        pages = cache.get(key)
+
+        if pages is None:
+            self._caching = key
+
+            return await super().command_callback(ctx, command=command)
+
+        await self.prepare_help_command(ctx, command)
+        await self._deliver([page.copy() for page in pages])
+
+    async def filter_commands(self, commands, /, *, sort=False, key=None):
+        from .authz import checking_help
+
+        # failed checks shouldn't react to the help invocation
+        token = checking_help.set(True)
+
+        try:
+            return await super().filter_commands(commands, sort=sort, key=key)
+        finally:
+            checking_help.reset(token)
+
+    async def send_pages(self):
+        pages = self.paginator.pages
+
+        if self._caching is not None:
+            cache = _help_pages.setdefault(id(self.context.bot), {})
+
+            while len(cache) >= HELP_CACHE_SIZE:
+                del cache[next(iter(cache))]
+
+            cache[self._caching] = [page.copy() for page in pages]
+            self._caching = None
+
+        await self._deliver(pages)
+
+    async def _deliver(self, pages: list[Embed]):
+        """
+        Send rendered help pages.
+
+        Args:
+            pages: The pages
+        """
+
+        ctx = self.context
+        destination = self.get_destination()
+
+        if self.delete_invoke and ctx.interaction is None:
+            try:
+                await ctx.message.delete()
+            except (Forbidden, CommandInvokeError):
+                log.warning("Missing permissions to delete help invocation")
+
+        if not pages:
+            await destination.send(f"```{self.get_ending_note()}```")
+        else:
+            await self.menu.send_pages(ctx, destination, pages)
+
+
+# queued log output, tagged with shard IDs for sharded workers
+log_pipeline = LogPipeline(
+    log,
+    config["bot"].get("log_format", "color"),
+    config["bot"].get("log_sample"),
+    environ[SHARD_IDS_ENV] if shard_ids is not None else "",
 )
-log.addHandler(streamHandler)
+"""Log output pipeline"""
 
 activity = Activity(name=f"@me {_help}", type=ActivityType.listening)
 """Activity on login"""
 
-intents: Intents = Intents.default()
-intents.members = True
-intents.message_content = True
-_helpcmd = _MyHelp()
+BASE_INTENTS = ("guilds", "guild_messages", "dm_messages", "message_content")
+"""Gateway intents the bot needs regardless of which extensions are loaded"""
+
+SLASH_BASE_INTENTS = ("guilds",)
+"""Base gateway intents when only application commands are used"""
+
+
+def _get_identities() -> list[dict[str, Any]]:
+    """
+    Get the bot identities to run. Without an `identities` list in the
+    configuration, there is a single identity using the `bot` table's token
+    and extensions.
+
+    Returns:
+        One dict per identity, with its name, token, and extensions
+    """
+
+    found = config.get("identities") or [{}]
+
+    return [
+        {
+            "name": ident.get("name", f"bot{i}" if i else "default"),
+            "token": ident.get(
+                "token",
+                None
+                if i
+                else config["bot"].get("token", environ.get("DISCORD_TOKEN")),
+            ),
+            "extensions": ident.get("extensions", config["bot"]["extensions"]),
+        }
+        for i, ident in enumerate(found)
+    ]
+
+
+identities = _get_identities()
+"""Bot identities run by this process"""
+
+if shard_ids is not None and len(identities) > 1:
+    raise ValueError("Sharded workers can only run a single bot identity")
+
+
+_mention_prefixes: dict[int, list[str]] = {}
+"""Prefixes for mentioning each bot, by bot"""
+
+_guild_prefixes: dict[int, str | None] = {}
+"""The value of the `prefix` setting in each guild, by guild ID"""
+
+
+def _invalidate_prefix(key: str | None):
+    """Forget cached prefixes when the `prefix` setting changes."""
+
+    if key is None:
+        _guild_prefixes.clear()
+    else:
+        _guild_prefixes.pop(int(key.split("#")[0]), None)
 
 
 def get_prefixes(bot: Bot, message: Message):
-    from .settings import settings
+    base = _mention_prefixes.get(id(bot))
 
-    assert bot.user
-    user_id = bot.user.id
-    base = [f"<@!{user_id}> ", f"<@{user_id}> "]
-    default = [config.get("bot", {}).get("prefix", "!")]
+    if base is None:
+        assert bot.user
+        user_id = bot.user.id
+        base = _mention_prefixes[id(bot)] = [
+            f"<@!{user_id}> ",
+            f"<@{user_id}> ",
+        ]
 
-    if "prefix" not in settings:
-        return base + default
+    guild = message.guild
 
-    prefix = settings["prefix"].get(message)  # type: ignore
+    if guild is None:
+        prefix = None
+    else:
+        try:
+            prefix = _guild_prefixes[guild.id]
+        except KeyError:
+            from .settings import settings
+
+            prefix = (
+                settings["prefix"].get(message)  # type: ignore
+                if "prefix" in settings
+                else None
+            )
+            _guild_prefixes[guild.id] = prefix
 
     if prefix is None:
-        return base + default
+        prefix = config["bot"].get("prefix", "!")
 
     return base + [prefix]
 
 
-bot = Bot(command_prefix=get_prefixes, intents=intents, help_command=_helpcmd)
-"""The bot itself"""
+def _member_cache_options(policy: str) -> dict[str, Any]:
+    """
+    Get the client options for a member cache policy. Any policy other than
+    "full" disables chunking at startup; code which needs a member that is not
+    cached should use `aethersprite.members.get_member` to fetch it.
+
+    - `full`: cache every member of every guild
+    - `active`: cache members who join or are in voice channels
+    - `voice`: cache members who are in voice channels
+    - `none`: cache no members
+
+    Args:
+        policy: The member cache policy
+
+    Returns:
+        Keyword arguments for the bot's constructor
+    """
+
+    if policy == "full":
+        return {}
+
+    flags = MemberCacheFlags.none()
+
+    if policy in ("active", "voice"):
+        flags.voice = True
+
+    if policy == "active":
+        flags.joined = True
+    elif policy not in ("voice", "none"):
+        raise ValueError(f"Unknown member cache policy: {policy}")
+
+    return {"member_cache_flags": flags, "chunk_guilds_at_startup": False}
+
+
+def apply_intents(bot: Bot, needs: dict[str, list[str]]):
+    """
+    Limit a bot's gateway intents to the base intents plus those given,
+    along with any the member cache policy requires. The bot's intents are
+    updated in place; this must be done before connecting.
+
+    Args:
+        bot: The bot to update
+        needs: A mapping of intent names to the extensions which need them
+    """
+
+    needs = {k: list(v) for k, v in needs.items()}
+    flags = _member_cache_options(
+        config["bot"].get("member_cache", "full")
+    ).get("member_cache_flags")
+
+    if flags is not None:
+        # the member cache cannot be kept without the events that feed it
+        if flags.joined:
+            needs.setdefault("members", []).append("bot.member_cache")
+
+        if flags.voice:
+            needs.setdefault("voice_states", []).append("bot.member_cache")
+
+    base = (
+        SLASH_BASE_INTENTS
+        if config["bot"].get("command_mode", "prefix") == "slash"
+        else BASE_INTENTS
+    )
+    wanted = Intents.none()
+
+    for flag in base + tuple(needs):
+        setattr(wanted, flag, True)
+
+    # the connection state derived these from the intents it was created with
+    state = bot._connection
+    intents = state._intents
+    intents.value = wanted.value
+
+    for flag, names in sorted(needs.items()):
+        log.info("Intent %s enabled by: %s", flag, ", ".join(names))
+
+    if flags is None:
+        state.member_cache_flags = MemberCacheFlags.from_intents(intents)
+        state._chunk_guilds = intents.members
+
+    state.raw_presence_flag = not intents.members and intents.presences
+
+    if intents.members and not state.member_cache_flags._empty:
+        state.__dict__.pop("store_user", None)
+    else:
+        state.store_user = state.store_user_no_intents
+
+
+_shards = (
+    {}
+    if shard_ids is None
+    else {"shard_ids": shard_ids, "shard_count": int(environ[SHARD_COUNT_ENV])}
+)
 
 
-@bot.event
 async def on_connect():
     log.info("Connected to Discord")
 
 
-@bot.event
 async def on_disconnect():
     log.info("Disconnected")
 
 
-@bot.event
 async def on_error(method: str, *args, **kwargs):
-    log.exception(f"Error in method {method}\nargs: {args}\nkwargs: {kwargs}\n")
+    log.exception(
+        "Error in method %s\nargs: %s\nkwargs: %s\n", method, args, kwargs
+    )
 
 
-@bot.event
 async def on_command_error(ctx: Context, error: Exception):
     """Suppress command check failures and invalid commands."""
 
-    from .extensions.base.alias import Alias
+    from .limits import LimitReached
+
+    if isinstance(error, LimitReached):
+        await ctx.send(str(error))
 
-    if isinstance(error, CheckFailure):
         return
 
-    if isinstance(error, CommandNotFound):
-        if isinstance(ctx.channel, DMChannel):
-            return
+    if isinstance(error, (CheckFailure, CommandNotFound)):
+        return
 
-        bot: Bot = ctx.bot
-        cog: Alias | None = bot.get_cog("Alias")  # type: ignore
+    raise error
 
-        if cog is None:
-            return
 
-        assert ctx.guild
-        guild = str(ctx.guild.id)
-        aliases = cog.aliases[guild] if guild in cog.aliases else None
+async def on_resumed():
+    log.info("Connection resumed")
 
-        if aliases is None:
-            return
 
-        assert ctx.prefix
-        name = ctx.message.content.replace(ctx.prefix, "").split(" ")[0].strip()
+def make_bot() -> Bot:
+    """
+    Create a bot with the core event handlers attached. Its gateway intents
+    start out broad, and are trimmed down by `apply_intents` once its
+    extensions have been loaded.
+
+    Returns:
+        The new bot
+    """
+
+    intents: Intents = Intents.default()
+    intents.members = True
+    intents.message_content = True
+    new = (Bot if shard_ids is None else AutoShardedBot)(
+        command_prefix=get_prefixes,
+        intents=intents,
+        help_command=_MyHelp(),
+        **_shards,
+        **_member_cache_options(config["bot"].get("member_cache", "full")),
+    )
 
-        if name not in aliases:
+    for handler in (
+        on_command_error,
+        on_connect,
+        on_disconnect,
+        on_error,
+        on_resumed,
+    ):
+        new.event(handler)
+
+    @new.event
+    async def on_message(message: Message):
+        # most messages aren't commands; skip building a context for them
+        if message.author.bot or not message.content.startswith(
+            tuple(get_prefixes(new, message))
+        ):
             return
 
-        cmd = ctx.bot.get_command(aliases[name])
+        ctx = await new.get_context(message)
 
-        if cmd is None:
-            return
+        if ctx.command is None:
+            # the alias extension may not be loaded
+            cog: Any = new.get_cog("Alias")
+            ctx.command = None if cog is None else cog.resolve(ctx)
 
-        ctx.command = cmd
+            # unknown commands are dropped rather than raising CommandNotFound
+            if ctx.command is None:
+                return
 
-        return await ctx.bot.invoke(ctx)
+        await new.invoke(ctx)
 
-    raise error
+    @new.event
+    async def on_ready():
+        log.info("Logged in as %s", new.user)
 
+        if _gateway is not None:
+            _gateway.finish()
 
-@bot.event
-async def on_ready():
-    log.info(f"Logged in as {bot.user}")
-    await bot.change_presence(activity=activity)
+        await new.change_presence(activity=activity)
 
+    return new
 
-@bot.event
-async def on_resumed():
-    log.info("Connection resumed")
 
+bots: dict[str, Bot] = {ident["name"]: make_bot() for ident in identities}
+"""Bots run by this process, by identity name"""
 
-async def _load_ext(ext: str, package: str | None = None):
-    mod = import_module(ext, package)
+bot = bots[identities[0]["name"]]
+"""The bot itself (or the first of them, if there are several)"""
 
-    if hasattr(mod, "META_EXTENSION") and mod.META_EXTENSION:
-        for child in mod._mods:
-            await _load_ext(f"..{child}", ext)
+intents = bot._connection._intents
+"""The bot's gateway intents"""
 
-        return
 
-    if not hasattr(mod, "setup"):
-        return
+async def reload_config() -> dict[str, tuple[Any, Any]]:
+    """
+    Re-read the configuration file and apply any changes in place. Once the
+    changes have been applied, the `config_reload` event is dispatched with
+    them, so extensions may listen for `on_config_reload` to react.
 
-    log.info(f"Bot extension setup: {mod.__name__}")
-    await bot.load_extension(mod.__name__)
+    Returns:
+        A mapping of the dotted keys which changed to (old, new) pairs
+    """
 
+    from .loader import load_extensions, required_intents, resolve
 
-async def entrypoint():
-    token = config["bot"].get("token", environ.get("DISCORD_TOKEN", None))
+    new = _load_config()
+    changes = _diff(config, new)
+
+    if not changes:
+        log.info("Configuration reloaded; no changes")
+
+        return changes
+
+    _update(config, new)
+    log.info("Configuration reloaded; changed: %s", ", ".join(sorted(changes)))
+
+    for key in RESTART_KEYS:
+        if key in changes:
+            log.warning("Changing %s requires a restart", key)
+
+    if "bot.log_level" in changes:
+        log.setLevel(getattr(logging, config["bot"].get("log_level", "INFO")))
+
+    if any(k.startswith(("bot.log_format", "bot.log_sample")) for k in changes):
+        log_pipeline.configure(
+            config["bot"].get("log_format", "color"),
+            config["bot"].get("log_sample"),
+        )
+
+    current = {ident["name"]: ident for ident in identities}
+    updated = _get_identities()
+
+    if [(i["name"], i["token"]) for i in updated] != [
+        (i["name"], i["token"]) for i in identities
+    ]:
+        log.warning("Changing bot identities requires a restart")
+
+    for ident in updated:
+        name = ident["name"]
+
+        if (
+            name not in bots
+            or current[name]["extensions"] == ident["extensions"]
+        ):
+            continue
+
+        target = bots[name]
+        old_exts = resolve(current[name]["extensions"])
+        new_exts = resolve(ident["extensions"])
+
+        for ext in old_exts.keys() - new_exts.keys():
+            if ext in target.extensions:
+                log.info("Bot extension unload: %s", ext)
+                await target.unload_extension(ext)
+
+        lazy = config["bot"].get("lazy_extensions", False)
+        await load_extensions(target, ident["extensions"], lazy=lazy)
+        needs = required_intents(ident["extensions"], lazy=lazy)
+        current[name] = ident
+
+        if config["bot"].get("command_mode", "prefix") != "prefix":
+            from .slash import register, sync_all, syncs
+
+            register(target)
+            syncs.spawn(sync_all(target))
+
+        for flag, names in sorted(needs.items()):
+            if not getattr(target.intents, flag):
+                log.warning(
+                    "Intent %s (needed by %s) requires a restart",
+                    flag,
+                    ", ".join(names),
+                )
+
+    identities[:] = list(current.values())
+
+    for target in bots.values():
+        target.dispatch("config_reload", changes)
+
+    return changes
+
+
+async def _reload_on_signal():
+    try:
+        await reload_config()
+    except Exception:
+        log.exception("Error reloading configuration")
+
+
+_gateway: Phase | None = None
+"""Startup phase for connecting to the gateway"""
+
+
+def _profile_on_ready():
+    """
+    Time each on_ready listener, finishing the startup profile once they have
+    all run for the first time.
+    """
+
+    listeners = list(bot.extra_events.get("on_ready", []))
+    pending = set(listeners)
+    ready: Phase | None = None
+
+    def done():
+        assert ready
+        ready.finish()
+        profiler.finish()
+        log.info("Startup profile written to %s", profiler.output)
+
+        for line in profiler.summary():
+            log.info(line)
+
+    def wrap(listener):
+        @wraps(listener)
+        async def wrapper(*args, **kwargs):
+            nonlocal ready
+
+            if profiler.finished:
+                return await listener(*args, **kwargs)
+
+            if ready is None:
+                ready = profiler.phase("on_ready")
+
+            phase = profiler.phase(
+                f"{listener.__module__}:{listener.__name__}", parent=ready
+            )
+
+            try:
+                return await listener(*args, **kwargs)
+            finally:
+                phase.finish()
+                pending.discard(listener)
+
+                if not pending:
+                    done()
+
+        return wrapper
+
+    for listener in listeners:
+        bot.remove_listener(listener, "on_ready")
+        bot.add_listener(wrap(listener), "on_ready")
+
+    if not listeners:
+
+        @bot.listen("on_ready")
+        async def finish_profile():
+            nonlocal ready
+
+            if not profiler.finished:
+                ready = profiler.phase("on_ready")
+                done()
+
+
+async def _start(bot: Bot, identity: dict[str, Any]):
+    """
+    Load a bot's extensions, then connect it to Discord.
+
+    Args:
+        bot: The bot to start
+        identity: The bot's identity
+    """
+
+    global _gateway
+
+    token = identity["token"]
     # need credentials
     assert token is not None, (
-        "bot.token not in config and DISCORD_TOKEN not in env variables"
+        f"no token for {identity['name']}; bot.token not in config and "
+        "DISCORD_TOKEN not in env variables"
     )
-    # for any commands or scheduled tasks, etc. that need random numbers
-    seed()
     bot.remove_command("help")
-    bot.add_command(help_proxy)
+    bot.add_command(help_proxy.copy())
+
+    from . import gating
+    from .limits import install
+    from .settings import watch
+
+    watch("prefix", _invalidate_prefix)
+    gating.watch(_invalidate_help)
+    install(bot)
 
     # probe extensions for bot hooks
-    for ext in config["bot"]["extensions"]:
-        await _load_ext(ext)
+    from .loader import load_extensions, required_intents
+
+    lazy = config["bot"].get("lazy_extensions", False)
+
+    with profiler.phase("extensions"):
+        await load_extensions(bot, identity["extensions"], lazy=lazy)
+
+    apply_intents(bot, required_intents(identity["extensions"], lazy=lazy))
+    mode = config["bot"].get("command_mode", "prefix")
+
+    if mode != "prefix":
+        from .slash import MODES, setup_slash
+
+        assert mode in MODES, f"Unknown command mode: {mode}"
+        setup_slash(bot)
 
     if log.level >= logging.DEBUG:
         for key, evs in bot.extra_events.items():
@@ -232,7 +890,54 @@ async def entrypoint():
             for f in evs:
                 out.append(f"{f.__module__}:{f.__name__}")
 
-            log.debug(f"{key} => {out!r}")
+            log.debug("%s => %r", key, out)
+
+    primary = bot is bots[identities[0]["name"]]
+
+    if primary and profiler.output is not None:
+        _profile_on_ready()
 
     # here we go!
-    await bot.start(token=token)
+    with profiler.phase("login"):
+        await bot.login(token)
+
+    if primary:
+        _gateway = profiler.phase("gateway")
+
+    await bot.connect()
+
+
+async def shutdown():
+    """Disconnect every bot, so that `entrypoint` can finish gracefully."""
+
+    log.info("Shutting down")
+    await gather(*(b.close() for b in bots.values()))
+
+
+async def entrypoint():
+    from . import snapshot
+    from .tasks import open_group
+
+    # for any commands or scheduled tasks, etc. that need random numbers
+    seed()
+    loop = get_running_loop()
+    # a reload requested while one is under way is queued, and any more are
+    # dropped, since they would all read the same file
+    reloads = open_group("config.reload", 1, 1)
+    shutdowns = open_group("shutdown", 1, 0)
+
+    if hasattr(signal, "SIGHUP"):
+        loop.add_signal_handler(
+            signal.SIGHUP, lambda: reloads.spawn(_reload_on_signal())
+        )
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda: shutdowns.spawn(shutdown()))
+        except NotImplementedError:
+            # not supported by every event loop (e.g. on Windows)
+            pass
+
+    await gather(*(_start(bots[i["name"]], i) for i in identities))
+    # only reached after a graceful shutdown
+    snapshot.save()
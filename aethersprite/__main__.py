@@ -1,10 +1,68 @@
 """Entrypoint"""
 
 # stdlib
-from asyncio import new_event_loop
+from argparse import ArgumentParser
+from os import environ
+from os.path import splitext
+import sys
 
 # local
-from aethersprite import entrypoint
+from aethersprite import (
+    config,
+    data_folder,
+    entrypoint,
+    identities,
+    shard_ids,
+)
+from aethersprite.profiler import profiler
+from aethersprite.runtime import new_loop
 
-loop = new_event_loop()
+parser = ArgumentParser(prog="python -m aethersprite")
+parser.add_argument(
+    "--profile-startup",
+    metavar="FILE",
+    nargs="?",
+    const=f"{data_folder}startup-profile.json",
+    default=environ.get("AETHERSPRITE_PROFILE_STARTUP", None),
+    help="Write a JSON profile of startup phases to FILE (default: "
+    "startup-profile.json in the data folder). May also be set with the "
+    "AETHERSPRITE_PROFILE_STARTUP environment variable.",
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=config["bot"].get("workers", None),
+    help="Run the bot in WORKERS supervised processes, each connecting a "
+    "subset of its shards.",
+)
+parser.add_argument(
+    "--shards",
+    type=int,
+    default=config["bot"].get("shards", None),
+    help="The total number of shards to run (default: one per worker).",
+)
+args = parser.parse_args()
+
+if shard_ids is None and (args.workers or args.shards):
+    if len(identities) > 1:
+        parser.error("sharding is not supported with several bot identities")
+
+    from aethersprite.launcher import supervise
+
+    # workers are given the same arguments; they know they are workers
+    supervise(args.workers or 1, args.shards, sys.argv[1:])
+    sys.exit(0)
+
+profiler.output = args.profile_startup
+
+if profiler.output is not None and shard_ids is not None:
+    base, ext = splitext(profiler.output)
+    profiler.output = f"{base}-shards-{'-'.join(map(str, shard_ids))}{ext}"
+
+runtime = config["runtime"]
+loop = new_loop(
+    runtime.get("loop", "asyncio"),
+    runtime.get("eager_tasks", False),
+    runtime.get("executor_workers", None),
+)
 loop.run_until_complete(entrypoint())
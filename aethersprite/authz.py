@@ -1,6 +1,7 @@
 """Authorization module"""
 
 # stdlib
+from contextvars import ContextVar
 from os import environ
 from typing import Sequence
 
@@ -11,10 +12,36 @@ from discord.ext.commands import Context
 # local
 from . import config, log
 from .emotes import POLICE_OFFICER
+from .members import get_member
 from .settings import settings
 
 owner = config["bot"].get("owner", environ.get("NCFACBOT_OWNER", None))
-_help = config["bot"]["help_command"]
+
+checking_help: ContextVar[bool] = ContextVar("checking_help", default=False)
+"""Set while the help command checks which commands to list"""
+
+
+async def _get_author(ctx: Context) -> Member:
+    """
+    Get the member who invoked a command, fetching them if necessary (e.g.
+    when running with a lean member cache).
+
+    Args:
+        ctx: The current context
+
+    Returns:
+        The invoking member
+    """
+
+    if not isinstance(ctx.author, Member) and ctx.guild is not None:
+        member = await get_member(ctx.guild, ctx.author.id)
+
+        if member is not None:
+            return member
+
+    assert isinstance(ctx.author, Member)
+
+    return ctx.author
 
 
 async def channel_only(ctx) -> bool:
@@ -56,30 +83,27 @@ def is_in_any_role(user: Member, roles: Sequence[Role]) -> bool:
 
 async def react_if_not_help(ctx: Context):
     """
-    If the command was not invoked as an alias of the help command, react with
-    the police officer emoji.
+    If the command was not being checked for the help command's listing,
+    react with the police officer emoji.
 
     Args:
         ctx: The current context
     """
 
-    cog = ctx.bot.get_cog("alias")
-
-    if cog is None:
-        log.warn("alias cog not loaded")
-
+    # only react if they invoked the command directly (i.e. not via !help)
+    if checking_help.get():
         return
 
-    aliases = cog.get_aliases(ctx, _help)
-    help_aliases = [_help] + aliases
-
-    # only react if they invoked the command directly (i.e. not via !help)
-    if ctx.invoked_with not in help_aliases:
+    if ctx.interaction is None:
         await ctx.message.add_reaction(POLICE_OFFICER)
-        log.warn(
-            f"{ctx.author} attempted to access unauthorized command "
-            f"{ctx.command}"
-        )
+    else:
+        await ctx.send(POLICE_OFFICER, ephemeral=True)
+
+    log.warn(
+        "%s attempted to access unauthorized command %s",
+        ctx.author,
+        ctx.command,
+    )
 
 
 async def require_admin(ctx: Context) -> bool:
@@ -93,14 +117,14 @@ async def require_admin(ctx: Context) -> bool:
         Whether the user is authorized
     """
 
-    assert isinstance(ctx.author, Member)
-    perms = ctx.channel.permissions_for(ctx.author)
+    author = await _get_author(ctx)
+    perms = ctx.channel.permissions_for(author)
 
     if (
         perms.administrator
         or perms.manage_channels
         or perms.manage_guild
-        or owner == str(ctx.author)
+        or owner == str(author)
     ):
         return True
 
@@ -109,6 +133,25 @@ async def require_admin(ctx: Context) -> bool:
     return False
 
 
+async def require_owner(ctx: Context) -> bool:
+    """
+    Check for requiring the bot owner to execute a command.
+
+    Args:
+        ctx: The current context
+
+    Returns:
+        Whether the user is authorized
+    """
+
+    if owner is not None and owner == str(ctx.author):
+        return True
+
+    await react_if_not_help(ctx)
+
+    return False
+
+
 async def require_roles(ctx: Context, roles: Sequence[Role]) -> bool:
     """
     Check for requiring particular roles to execute a command. Membership in at
@@ -122,9 +165,7 @@ async def require_roles(ctx: Context, roles: Sequence[Role]) -> bool:
         Whether the user is authorized
     """
 
-    assert isinstance(ctx.author, Member)
-
-    if is_in_any_role(ctx.author, roles):
+    if is_in_any_role(await _get_author(ctx), roles):
         return True
 
     await react_if_not_help(ctx)
@@ -179,15 +220,14 @@ async def require_roles_from_setting(
         Whether the user is authorized
     """
 
-    assert isinstance(ctx.author, Member)
-
-    perms = ctx.channel.permissions_for(ctx.author)
+    author = await _get_author(ctx)
+    perms = ctx.channel.permissions_for(author)
 
     if (
         perms.administrator
         or perms.manage_channels
         or perms.manage_guild
-        or owner == str(ctx.author)
+        or owner == str(author)
     ):
         # Superusers get a pass
         return True
@@ -206,7 +246,7 @@ async def require_roles_from_setting(
         # no roles set, use default
         return open_by_default
 
-    for r in ctx.author.roles:
+    for r in author.roles:
         if r.id in roles_id:
             return True
 
@@ -0,0 +1,4 @@
+"""
+Benchmarks; each module may be run with
+`python -m aethersprite.benchmarks.<name>`
+"""
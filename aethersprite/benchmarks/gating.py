@@ -0,0 +1,160 @@
+"""
+Command gating benchmark
+
+Checks a stream of commands against a guild with some yeeted and
+whitelisted commands, using the real gates of the `yeet`, `only`, and
+`name_only` extensions (backed by temporary databases), and reports the
+per-command overhead of each way of deciding them:
+
+- uncompiled: every command asks each gate for its rules and builds a
+  `aethersprite.gating.Policy` from them, as if nothing were kept between
+  commands (each gate reading its own data, as the extensions' checks used
+  to)
+- compiled: `aethersprite.gating.check_gates`, which compiles each channel's
+  policy the first time it is needed and decides later commands against it
+
+```shell
+python -m aethersprite.benchmarks.gating --commands 50000 --channels 20
+```
+"""
+
+# stdlib
+from argparse import ArgumentParser
+import asyncio as aio
+from os.path import join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from types import SimpleNamespace
+
+# 3rd party
+from sqlitedict import SqliteDict
+
+# local
+from ..extensions.base import name_only, only, yeet
+from ..gating import add_gate, check_gates, invalidate, remove_gate
+from ..settings import Setting
+
+GUILD = 1
+NAMES = ("poll", "roles", "wipe", "gmt", "utc", "nick", "github", "catalog")
+
+
+def _ctx(bot: SimpleNamespace, channel: int, name: str) -> SimpleNamespace:
+    """
+    Create a stand-in for a command's context.
+
+    Args:
+        bot: The stand-in bot
+        channel: The channel ID
+        name: The command's name
+
+    Returns:
+        The context
+    """
+
+    return SimpleNamespace(
+        author="bench",
+        bot=bot,
+        channel=SimpleNamespace(id=channel),
+        command=SimpleNamespace(name=name),
+        guild=SimpleNamespace(id=GUILD),
+        interaction=None,
+        message=None,
+    )
+
+
+async def _uncompiled(ctx) -> bool:
+    """Check a command after discarding its guild's compiled policies."""
+
+    invalidate(GUILD)
+
+    return await check_gates(ctx)
+
+
+async def _run(check, contexts) -> tuple[float, int]:
+    """
+    Run a check for every context, as discord.py would.
+
+    Args:
+        check: The bot check
+        contexts: The contexts of the commands
+
+    Returns:
+        The number of seconds it took, and how many commands were allowed
+    """
+
+    allowed = 0
+    start = perf_counter()
+
+    for ctx in contexts:
+        if await check(ctx):
+            allowed += 1
+
+    return perf_counter() - start, allowed
+
+
+def main():
+    parser = ArgumentParser(prog="python -m aethersprite.benchmarks.gating")
+    parser.add_argument("--commands", type=int, default=20_000)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tmp:
+        path = join(tmp, "gating.sqlite3")
+        guild = str(GUILD)
+        # the extensions' gates read their databases from module globals
+        yeet.yeets = SqliteDict(path, tablename="yeets", autocommit=True)
+        only.onlies = SqliteDict(path, tablename="onlies", autocommit=True)
+        yeet.yeets[guild] = {"wipe", "poll#1", "roles#2"}
+        only.onlies[guild] = {"3": {"gmt", "utc"}}
+        bot = SimpleNamespace(
+            add_check=lambda check: None,
+            remove_check=lambda check: None,
+            user=SimpleNamespace(mentioned_in=lambda message: True),
+        )
+        aio.run(name_only.setup(bot))  # type: ignore
+        # keep setting reads in memory, rather than in the bot's database
+        Setting._cache[guild] = {"nameonly": None}
+
+        for channel in range(args.channels):
+            Setting._cache[f"{guild}#{channel}"] = {"nameonly.channel": None}
+
+        add_gate(bot, "yeet", yeet._gate)  # type: ignore
+        add_gate(bot, "only", only._gate)  # type: ignore
+        contexts = [
+            _ctx(bot, n % args.channels, NAMES[n % len(NAMES)])
+            for n in range(args.commands)
+        ]
+        print(
+            f"{args.commands} commands in {args.channels} channel(s), "
+            f"best of {args.rounds}"
+        )
+
+        for name, check in (
+            ("uncompiled policies", _uncompiled),
+            ("compiled policies", check_gates),
+        ):
+            best = None
+
+            for _ in range(args.rounds):
+                # include the cost of compiling each channel's policy
+                invalidate()
+                elapsed, allowed = aio.run(_run(check, contexts))
+                best = elapsed if best is None else min(best, elapsed)
+
+            assert best is not None
+            print(
+                f"{name:<24} {best:>8.3f}s "
+                f"{best / args.commands * 1_000_000:>8.2f}us/command "
+                f"({allowed} allowed)"
+            )
+
+        aio.run(name_only.teardown(bot))  # type: ignore
+        remove_gate(bot, "yeet")  # type: ignore
+        remove_gate(bot, "only")  # type: ignore
+        yeet.yeets.close()
+        only.onlies.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Event loop runtime benchmark
+
+Builds the bot with `aethersprite.make_bot`, loads the configured extensions,
+and feeds it a storm of fake messages through its real `on_message` handler
+under each available runtime (see `aethersprite.runtime`), reporting how long
+it took to handle them all. Most of the messages are ordinary chatter, which
+is dropped by the prefix check; the rest are commands which are run, resolved
+from an alias, suppressed by a gate, or unknown. Replies are counted rather
+than sent to Discord, and the guild's settings, aliases, and yeets are kept
+in memory or in temporary databases, so nothing is changed in the bot's data.
+
+```shell
+python -m aethersprite.benchmarks.runtime --messages 50000 --channels 5
+```
+"""
+
+# stdlib
+from argparse import ArgumentParser
+import asyncio as aio
+import logging
+from os.path import join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any
+
+# 3rd party
+from discord.ext.commands import Bot, Context
+from sqlitedict import SqliteDict
+
+# local
+from .. import config, log, make_bot
+from ..loader import load_extensions
+from ..runtime import new_loop
+from ..settings import Setting
+
+GUILD = 1
+BOT_ID = 2
+USER_ID = 3
+MESSAGES = (
+    # ordinary chatter, which never builds a context
+    ("hello there", False),
+    ("how is everyone doing today?", False),
+    ("!!!", False),
+    ("anyone around?", False),
+    # commands, aliases, yeeted and unknown commands
+    ("!gmt", False),
+    ("!utc +5", False),
+    ("!time", False),
+    ("!wipe", False),
+    ("!nope", False),
+    # another bot's messages are ignored
+    ("!gmt", True),
+)
+"""Contents of the messages fed to the bot, and whether a bot sent them"""
+
+
+class _Context(Context):
+    """Context which counts replies instead of sending them."""
+
+    replies = 0
+
+    async def send(self, *args, **kwargs) -> Any:
+        _Context.replies += 1
+
+
+def _message(bot: Bot, channel: int, content: str, is_bot: bool):
+    """
+    Create a stand-in for a message.
+
+    Args:
+        bot: The bot receiving the message
+        channel: The channel ID
+        content: The message's content
+        is_bot: Whether another bot sent the message
+
+    Returns:
+        The message
+    """
+
+    return SimpleNamespace(
+        _state=bot._connection,
+        attachments=(),
+        author=SimpleNamespace(bot=is_bot, id=USER_ID),
+        channel=SimpleNamespace(id=channel),
+        content=content,
+        guild=SimpleNamespace(id=GUILD),
+        mentions=(),
+    )
+
+
+async def _storm(tmp: str, messages: int, channels: int) -> float:
+    """
+    Feed messages to a newly built bot.
+
+    Args:
+        tmp: The folder to keep temporary databases in
+        messages: The number of messages to feed it
+        channels: The number of channels to spread them across
+
+    Returns:
+        The number of seconds it took to handle every message
+    """
+
+    bot = make_bot()
+    bot._connection.user = SimpleNamespace(  # type: ignore
+        id=BOT_ID, mentioned_in=lambda message: True
+    )
+    guild = str(GUILD)
+
+    async with bot:
+        await load_extensions(bot, config["bot"]["extensions"])
+        yeet: Any = bot.extensions.get("aethersprite.extensions.base.yeet")
+
+        if yeet is not None:
+            # the yeet gate reads its database from a module global
+            yeet.yeets = SqliteDict(
+                join(tmp, "runtime.sqlite3"), tablename="yeets"
+            )
+            yeet.yeets[guild] = {"wipe"}
+
+        alias: Any = bot.get_cog("Alias")
+
+        if alias is not None:
+            alias.resolved[guild] = {"time": "gmt"}
+
+        # keep setting reads in memory, rather than in the bot's database
+        Setting._cache[guild] = {}
+
+        for channel in range(channels):
+            Setting._cache[f"{guild}#{channel}"] = {}
+
+        bot.get_context = lambda origin, cls=_Context: Bot.get_context(
+            bot, origin, cls=cls
+        )
+        batch = [
+            _message(bot, n % channels, *MESSAGES[n % len(MESSAGES)])
+            for n in range(messages)
+        ]
+        start = perf_counter()
+
+        for message in batch:
+            bot.dispatch("message", message)
+
+        # wait for the handlers, and any events they dispatch in turn
+        while pending := [
+            task
+            for task in aio.all_tasks()
+            if task.get_name().startswith("discord.py: ")
+        ]:
+            await aio.gather(*pending)
+
+        elapsed = perf_counter() - start
+
+        if yeet is not None:
+            yeet.yeets.close()
+
+    return elapsed
+
+
+def main():
+    parser = ArgumentParser(prog="python -m aethersprite.benchmarks.runtime")
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--channels", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    # commands log each use, which would swamp the results
+    log.setLevel(logging.WARNING)
+    runtimes = [
+        (loop, eager)
+        for loop in ("asyncio", "uvloop")
+        for eager in (False, True)
+    ]
+
+    print(
+        f"{args.messages} messages in {args.channels} channel(s), "
+        f"best of {args.rounds}"
+    )
+
+    for loop, eager in runtimes:
+        name = f"{loop}{' + eager tasks' if eager else ''}"
+
+        if loop == "uvloop":
+            try:
+                import uvloop  # noqa: F401
+            except ImportError:
+                print(f"{name:<24} skipped (not installed)")
+
+                continue
+
+        if eager and not hasattr(aio, "eager_task_factory"):
+            print(f"{name:<24} skipped (requires Python 3.12+)")
+
+            continue
+
+        best = None
+        _Context.replies = 0
+
+        for _ in range(args.rounds):
+            ev = new_loop(loop, eager)
+
+            try:
+                with TemporaryDirectory() as tmp:
+                    elapsed = ev.run_until_complete(
+                        _storm(tmp, args.messages, args.channels)
+                    )
+            finally:
+                ev.close()
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        assert best is not None
+        print(
+            f"{name:<24} {best:>8.3f}s "
+            f"{args.messages / best:>10.0f} messages/s "
+            f"{best / args.messages * 1_000_000:>8.2f}us/message "
+            f"({_Context.replies // args.rounds} replies)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 """Load all extensions"""
 
+# local
+from aethersprite.authz import channel_only, require_admin
+from aethersprite.storage import open_db
+
 META_EXTENSION = True
 
 _mods = (
@@ -11,6 +15,7 @@ _mods = (
     "name_only",
     "nick",
     "only",
+    "owner",
     "poll",
     "prefix",
     "roles",
@@ -18,3 +23,33 @@ _mods = (
     "wipe",
     "yeet",
 )
+
+# extensions which may be deferred until first use (see aethersprite.loader)
+_lazy = {
+    "github": {
+        "commands": {
+            "github": "GitHub URL for bot source code, feature requests",
+        },
+    },
+    "gmt": {
+        "commands": {
+            "gmt": "Get current time or offset in GMT",
+            "utc": "Get current time or offset in UTC",
+        },
+    },
+    "nick": {
+        "commands": {"nick": "Change the bot's nickname on this server"},
+        "checks": {"nick": (require_admin, channel_only)},
+    },
+    "wipe": {
+        "commands": {"wipe": "Delete all messages in a channel."},
+        "checks": {"wipe": (channel_only, require_admin)},
+        # confirmations which were pending when the bot was last stopped
+        "reactions": (
+            "wipe",
+            lambda: open_db("wipe.sqlite3", "wipes").values(),
+        ),
+        "limits": ("wipe",),
+        "intents": ("guild_reactions",),
+    },
+}
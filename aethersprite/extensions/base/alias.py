@@ -1,46 +1,94 @@
-"""Alias cog"""
+"""
+Alias cog
+
+Aliases are resolved as messages are dispatched (see `Alias.resolve`),
+against a map of each guild's aliases which is kept in memory, so invoking a
+command by an alias costs the same as invoking it by name.
+"""
 
 # 3rd party
-from discord.ext.commands import Bot, Cog, command, Context
-from sqlitedict import SqliteDict
+from discord.ext.commands import Bot, Cog, Command, command, Context
 
 # local
-from aethersprite import data_folder, log
+from aethersprite import log, responses
 from aethersprite.authz import channel_only, require_admin
+from aethersprite.storage import open_db
 
-aliases = SqliteDict(
-    f"{data_folder}alias.sqlite3", tablename="aliases", autocommit=True
-)
+aliases = open_db("alias.sqlite3", "aliases")
 """Aliases database"""
 
 bot: Bot
 
 
+def _forget(guild: str):
+    """Drop a guild's aliases from every bot's map, after changing them."""
+
+    from aethersprite import bots
+
+    for b in bots.values():
+        cog: Alias | None = b.get_cog("Alias")  # type: ignore
+
+        if cog is not None:
+            cog.resolved.pop(guild, None)
+
+    responses.invalidate(f"alias:{guild}")
+
+
 class Alias(Cog):
     """Alias commands; add and remove command aliases"""
 
-    @staticmethod
-    def get_aliases(ctx: Context, cmd: str):
+    def get_aliases(self, ctx: Context, cmd: str):
         """Get aliases for the given command and context."""
 
         assert ctx.guild
-        mylist = list()
-        guild = str(ctx.guild.id)
-
-        if guild not in aliases:
-            return mylist
-
-        glist = aliases[guild]
+        glist = self.guild_aliases(str(ctx.guild.id))
 
-        for k in glist:
-            if glist[k] == cmd:
-                mylist.append(k)
-
-        return mylist
+        return [k for k in glist if glist[k] == cmd]
 
     def __init__(self, bot):
         self.bot = bot
         self.aliases = aliases
+        self.resolved: dict[str, dict[str, str]] = {}
+        """Each guild's aliases, as read from the database, by guild ID"""
+
+    def guild_aliases(self, guild: str) -> dict[str, str]:
+        """
+        Get a guild's aliases, reading them from the database only if they
+        have not been read already.
+
+        Args:
+            guild: The guild's ID
+
+        Returns:
+            The guild's aliases, mapped to the names of their commands
+        """
+
+        try:
+            return self.resolved[guild]
+        except KeyError:
+            pass
+
+        als = self.resolved[guild] = aliases.get(guild, {})
+
+        return als
+
+    def resolve(self, ctx: Context) -> Command | None:
+        """
+        Get the command a context's invoked name is an alias for.
+
+        Args:
+            ctx: The context of the message
+
+        Returns:
+            The command, if the name is an alias in the context's guild
+        """
+
+        if ctx.guild is None or not ctx.invoked_with:
+            return None
+
+        name = self.guild_aliases(str(ctx.guild.id)).get(ctx.invoked_with)
+
+        return None if name is None else self.bot.get_command(name)
 
     @command(name="alias.add")
     async def add(self, ctx: Context, alias: str, command: str):
@@ -48,18 +96,14 @@ class Alias(Cog):
 
         assert ctx.guild
         guild = str(ctx.guild.id)
-
-        if ctx.guild.id not in aliases:
-            aliases[guild] = dict()
-
-        als = aliases[guild]
+        als = dict(self.guild_aliases(guild))
 
         if alias in als:
             await ctx.send(":newspaper: Already exists.")
 
             return
 
-        cmd = bot.get_command(command)
+        cmd = self.bot.get_command(command)
 
         if cmd is None:
             await ctx.send(":scream: No such command!")
@@ -68,7 +112,8 @@ class Alias(Cog):
 
         als[alias] = command
         aliases[guild] = als
-        log.info(f"{ctx.author} added alias {alias} for {command}")
+        _forget(guild)
+        log.info("%s added alias %s for %s", ctx.author, alias, command)
         await ctx.send(":sunglasses: Done.")
 
     @command(name="alias.remove")
@@ -77,9 +122,9 @@ class Alias(Cog):
 
         assert ctx.guild
         guild = str(ctx.guild.id)
-        als = aliases[guild] if guild in aliases else None
+        als = dict(self.guild_aliases(guild))
 
-        if als is None or alias not in als:
+        if alias not in als:
             await ctx.send(":person_shrugging: None set.")
 
             return
@@ -91,7 +136,8 @@ class Alias(Cog):
         else:
             aliases[guild] = als
 
-        log.info(f"{ctx.author} removed alias {alias}")
+        _forget(guild)
+        log.info("%s removed alias %s", ctx.author, alias)
         await ctx.send(":wastebasket: Removed.")
 
     @command(name="alias.list")
@@ -101,17 +147,14 @@ class Alias(Cog):
         assert ctx.guild
         guild = str(ctx.guild.id)
 
-        if guild not in aliases:
-            aliases[guild] = dict()
-
-        als = aliases[guild]
-        output = ", ".join([f"`{k}` => `{als[k]}`" for k in als.keys()])
+        def render():
+            als = self.guild_aliases(guild)
+            output = ", ".join([f"`{k}` => `{als[k]}`" for k in als.keys()])
 
-        if len(output) == 0:
-            output = "None"
+            return f":detective: **{output or 'None'}**"
 
-        log.info(f"{ctx.author} viewed alias list")
-        await ctx.send(f":detective: **{output}**")
+        log.info("%s viewed alias list", ctx.author)
+        await responses.send_cached(ctx, render, f"alias:{guild}")
 
 
 async def setup(bot_: Bot):
@@ -4,16 +4,25 @@ Badnames extension; automatically kick users whose names match a blacklist.
 
 # local
 from aethersprite import log
-from aethersprite.settings import register, settings
+from aethersprite.features import drop_feature, feature, Feature
+from aethersprite.settings import register, settings, unregister
 
 # 3rd party
 from discord import Member
 from discord.ext.commands import Bot
 
+INTENTS = ("members",)
+
+# guilds with a blacklist configured
+blacklists: Feature
+
 
 async def on_member_join(member: Member):
     """Check member names against blacklist on join."""
 
+    if not blacklists.active(member.guild.id):
+        return
+
     badnames_setting: str = settings["badnames"].get(member)
 
     if badnames_setting is None:
@@ -25,12 +34,14 @@ async def on_member_join(member: Member):
     for n in badnames:
         if n in lowered_name:
             await member.kick(reason="Matched against badnames setting")
-            log.warning(f"Kicked {member} due to match against badnames")
+            log.warning("Kicked %s due to match against badnames", member)
 
             return
 
 
 async def setup(bot: Bot):
+    global blacklists
+
     # settings
     register(
         "badnames",
@@ -40,4 +51,11 @@ async def setup(bot: Bot):
         "A list of disallowed substrings to search for in usernames",
     )
 
+    blacklists = feature(bot, "badnames")
+    blacklists.track_settings("badnames")
     bot.add_listener(on_member_join)
+
+
+async def teardown(bot: Bot):
+    drop_feature(bot, "badnames")
+    unregister("badnames")
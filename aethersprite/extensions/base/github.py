@@ -21,7 +21,7 @@ async def github(ctx: Context):
         "For source code, feature requests, and bug reports, visit "
         "https://github.com/haliphax/aethersprite"
     )
-    log.info(f"{ctx.author} requested GitHub URL")
+    log.info("%s requested GitHub URL", ctx.author)
 
 
 async def setup(bot: Bot):
@@ -20,7 +20,9 @@ async def _time(ctx: Context, tz: str, offset: str | None):
     )
     offset_str = thetime.strftime(DATETIME_FORMAT)
     await ctx.send(f":clock: {offset_str}")
-    log.info(f"{ctx.author} requested {tz} offset of {delta}: {offset_str}")
+    log.info(
+        "%s requested %s offset of %s: %s", ctx.author, tz, delta, offset_str
+    )
 
 
 @command(brief="Get current time or offset in GMT")
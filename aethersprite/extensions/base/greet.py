@@ -5,13 +5,19 @@ users join the guild.
 
 # local
 from aethersprite import log
+from aethersprite.features import drop_feature, feature, Feature
 from aethersprite.filters import ChannelFilter
-from aethersprite.settings import register, settings
+from aethersprite.settings import register, settings, unregister
 
 # 3rd party
 from discord import Member
 from discord.ext.commands import Bot
 
+INTENTS = ("members",)
+
+# guilds with a greeting configured
+greetings: Feature
+
 # filters
 channel_filter = ChannelFilter("greet.channel")
 
@@ -19,6 +25,9 @@ channel_filter = ChannelFilter("greet.channel")
 async def on_member_join(member: Member):
     """Greet members when they join."""
 
+    if not greetings.active(member.guild.id):
+        return
+
     chan_setting = settings["greet.channel"].get(member)
     msg_setting = settings["greet.message"].get(member)
 
@@ -27,7 +36,10 @@ async def on_member_join(member: Member):
 
     channel = [c for c in member.guild.channels if c.name == chan_setting][0]
     log.info(
-        f"Greeting new member {member} in {member.guild.name} #{channel.name}"
+        "Greeting new member %s in %s #%s",
+        member,
+        member.guild.name,
+        channel.name,
     )
     await channel.send(  # type: ignore
         msg_setting.format(
@@ -39,6 +51,8 @@ async def on_member_join(member: Member):
 
 
 async def setup(bot: Bot):
+    global greetings
+
     # settings
     register(
         "greet.channel",
@@ -59,4 +73,13 @@ async def setup(bot: Bot):
         "will be replaced with a line break (new line).",
     )
 
+    greetings = feature(bot, "greet")
+    greetings.track_settings("greet.channel", "greet.message")
     bot.add_listener(on_member_join)
+
+
+async def teardown(bot: Bot):
+    drop_feature(bot, "greet")
+
+    for key in ("greet.channel", "greet.message"):
+        unregister(key)
@@ -4,33 +4,25 @@ and only respond to commands when addressed directly.
 """
 
 # 3rd party
-from discord import DMChannel
 from discord.ext.commands import Bot, Context
 
 # local
-from aethersprite import log
-from aethersprite.settings import register, settings
+from aethersprite.gating import add_gate, Gate, invalidate_key, remove_gate
+from aethersprite.settings import register, settings, unregister, watch
 
 
-async def check_name_only(ctx: Context):
-    """If the bot wasn't mentioned, refuse the command."""
+def _gate(ctx: Context) -> Gate:
+    """Compile whether commands must mention the bot in a context's channel."""
 
-    # don't bother with DMs
-    if isinstance(ctx.channel, DMChannel):
-        return True
-
-    if (
-        settings["nameonly"].get(ctx) or settings["nameonly.channel"].get(ctx)
-    ) and not ctx.bot.user.mentioned_in(ctx.message):
-        log.warn(f"{ctx.author} attempted command without mentioning bot")
-
-        return False
-
-    return True
+    return Gate(
+        name_only=bool(
+            settings["nameonly"].get(ctx)
+            or settings["nameonly.channel"].get(ctx)
+        )
+    )
 
 
 async def setup(bot: Bot):
-    bot.add_check(check_name_only)
     # settings
     register(
         "nameonly",
@@ -52,3 +44,13 @@ async def setup(bot: Bot):
         "If set, the bot will only respond when mentioned directly "
         "(in this channel). **See warning from `nameonly` setting.**",
     )
+    watch("nameonly", invalidate_key)
+    watch("nameonly.channel", invalidate_key)
+    add_gate(bot, "name_only", _gate)
+
+
+async def teardown(bot: Bot):
+    remove_gate(bot, "name_only")
+
+    for key in ("nameonly", "nameonly.channel"):
+        unregister(key)
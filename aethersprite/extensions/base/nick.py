@@ -17,7 +17,7 @@ async def nick(ctx: Context, *, nick: str):
     assert ctx.guild
     await ctx.guild.me.edit(nick=nick)
     await ctx.send(":thumbsup:")
-    log.info(f"{ctx.author} set bot nickname to {nick}")
+    log.info("%s set bot nickname to %s", ctx.author, nick)
 
 
 async def setup(bot):
@@ -3,18 +3,16 @@
 # TODO server whitelist
 
 # 3rd party
-from discord import DMChannel
 from discord.channel import TextChannel
 from discord.ext.commands import Cog, command, Context
-from sqlitedict import SqliteDict
 
 # local
-from aethersprite import data_folder, log
+from aethersprite import log, responses
 from aethersprite.authz import channel_only, require_admin
+from aethersprite.gating import add_gate, Gate, invalidate, remove_gate
+from aethersprite.storage import open_db
 
-onlies = SqliteDict(
-    f"{data_folder}only.sqlite3", tablename="onlies", autocommit=True
-)
+onlies = open_db("only.sqlite3", "onlies")
 """Only whitelist database"""
 
 
@@ -70,7 +68,9 @@ class Only(Cog):
         ourchan.add(command)
         ours[chan_id] = ourchan
         onlies[guild] = ours
-        log.info(f"{ctx.author} added {command} to {channel} whitelist")
+        invalidate(ctx.guild.id)
+        responses.invalidate(f"only:{guild}")
+        log.info("%s added %s to %s whitelist", ctx.author, command, channel)
         await ctx.send(":shield: Done.")
 
     @command(name="only.remove")
@@ -122,7 +122,11 @@ class Only(Cog):
         else:
             onlies[guild] = ours
 
-        log.info(f"{ctx.author} removed {command} from {channel} whitelist")
+        invalidate(ctx.guild.id)
+        responses.invalidate(f"only:{guild}")
+        log.info(
+            "%s removed %s from %s whitelist", ctx.author, command, channel
+        )
         await ctx.send(":wastebasket: Removed.")
 
     @command(name="only.list")
@@ -150,21 +154,16 @@ class Only(Cog):
         chan_id = str(channel.id)
         guild = str(ctx.guild.id)
 
-        if guild not in onlies:
-            onlies[guild] = dict()
-
-        ours = onlies[guild]
-
-        if channel not in ours:
-            ours[channel] = set([])
+        def render():
+            ours = onlies.get(guild, {})
+            output = "**, **".join(ours.get(chan_id, []))
 
-        output = "**, **".join(ours.get(chan_id, []))
+            return f":guard: **{output or 'None'}**"
 
-        if not len(output):
-            output = "None"
-
-        log.info(f"{ctx.author} viewed command whitelist for {channel}")
-        await ctx.send(f":guard: **{output}**")
+        log.info("%s viewed command whitelist for %s", ctx.author, channel)
+        await responses.send_cached(
+            ctx, render, f"only:{guild}", args=(channel.id,)
+        )
 
     @command(name="only.reset")
     async def reset(
@@ -209,45 +208,29 @@ class Only(Cog):
         else:
             onlies[guild] = ours
 
+        invalidate(ctx.guild.id)
+        responses.invalidate(f"only:{guild}")
         await ctx.send(":boom: Reset.")
-        log.info(f"{ctx.author} reset Only whitelist for {channel}")
+        log.info("%s reset Only whitelist for %s", ctx.author, channel)
 
 
-async def check_only(ctx: Context):
-    """Check that command is in the Only whitelist"""
+def _gate(ctx: Context) -> Gate:
+    """Compile the whitelist for a context's channel."""
 
     assert ctx.guild
-    assert ctx.command
-
-    if isinstance(ctx.channel, DMChannel):
-        # can't whitelist commands via DM, since we need a guild to check
-        # settings values
-        return True
-
-    guild = str(ctx.guild.id)
-    channel = str(ctx.channel.id)
-    ours = onlies[guild] if guild in onlies else None
-    ourchan = ours[channel] if ours is not None and channel in ours else None
+    ours = onlies.get(str(ctx.guild.id), {})
+    ourchan = ours.get(str(ctx.channel.id))
 
     if ourchan is None:
-        # none set for this channel; bail
-        return True
-
-    cmd = ctx.command.name
-
-    if cmd not in ourchan and cmd[0:5] != "only.":
-        log.debug(
-            f"Suppressing non-whitelisted command from {ctx.author}: "
-            f"{ctx.command.name} in #{ctx.channel} ({ctx.guild})"
-        )
-
-        return False
+        # none set for this channel
+        return Gate()
 
-    return True
+    # the only.* commands can't be locked out
+    return Gate(allowed=frozenset(ourchan), exempt=("only.",))
 
 
 async def setup(bot):
-    bot.add_check(check_only)
+    add_gate(bot, "only", _gate)
     cog = Only(bot)
 
     for c in cog.get_commands():
@@ -255,3 +238,7 @@ async def setup(bot):
         c.add_check(require_admin)
 
     await bot.add_cog(cog)
+
+
+async def teardown(bot):
+    remove_gate(bot, "only")
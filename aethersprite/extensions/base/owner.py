@@ -0,0 +1,196 @@
+"""Bot owner commands"""
+
+# stdlib
+from time import perf_counter
+
+# 3rd party
+from discord.ext.commands import Bot, check, command, Context
+from discord.ext.commands.errors import ExtensionError
+
+# local
+from aethersprite import (
+    config,
+    features,
+    log,
+    outbound,
+    reactions,
+    reload_config,
+)
+from aethersprite.authz import require_owner
+from aethersprite.responses import responses
+from aethersprite.tasks import metrics
+
+
+@command(name="config.reload", hidden=True)
+@check(require_owner)
+async def config_reload(ctx: Context):
+    """
+    Reload the configuration file
+
+    Re-reads the configuration file and applies any changes without restarting the bot. The same can be accomplished by sending the bot process a SIGHUP signal.
+    """
+
+    changes = await reload_config()
+
+    if not changes:
+        await ctx.send(":person_shrugging: No changes.")
+
+        return
+
+    keys = "**, **".join(sorted(changes.keys()))
+    await ctx.send(f":arrows_counterclockwise: Reloaded: **{keys}**")
+    log.info("%s reloaded configuration", ctx.author)
+
+
+@command(name="ext.reload", hidden=True)
+@check(require_owner)
+async def ext_reload(ctx: Context, name: str):
+    """
+    Reload an extension
+
+    Reloads the given extension's code without restarting the bot. The name may be the extension's full module name or just its last part (e.g. `poll`). If the new code fails to load, the old code is kept.
+    """
+
+    bot: Bot = ctx.bot
+    matches = [
+        ext for ext in bot.extensions if ext == name or ext.endswith(f".{name}")
+    ]
+
+    if len(matches) != 1:
+        await ctx.send(
+            f":person_shrugging: {len(matches)} loaded extensions match "
+            f"**{name}**."
+        )
+
+        return
+
+    start = perf_counter()
+
+    try:
+        await bot.reload_extension(matches[0])
+    except ExtensionError as ex:
+        await ctx.send(f":boom: Failed to reload **{matches[0]}**: {ex}")
+        log.exception("%s failed to reload %s", ctx.author, matches[0])
+
+        return
+
+    elapsed = (perf_counter() - start) * 1000
+
+    if config["bot"].get("command_mode", "prefix") != "prefix":
+        from aethersprite.slash import register, sync_all
+
+        # only guilds whose commands actually changed are synced
+        register(bot)
+        await sync_all(bot)
+
+    await ctx.send(
+        f":arrows_counterclockwise: Reloaded **{matches[0]}** "
+        f"in {elapsed:.2f}ms."
+    )
+    log.info("%s reloaded %s in %.2fms", ctx.author, matches[0], elapsed)
+
+
+@command(name="tasks", hidden=True)
+@check(require_owner)
+async def tasks_(ctx: Context):
+    """
+    Show background task metrics
+
+    Lists each supervised task group with its running and queued task counts and its lifetime counters.
+    """
+
+    groups = metrics()
+
+    if not groups:
+        await ctx.send(":person_shrugging: No task groups are open.")
+
+        return
+
+    lines = [
+        f"**{name}**: {m['running']} running, {m['queued']} queued "
+        f"(peak {m['peak']}); {m['completed']} completed, "
+        f"{m['failed']} failed, {m['cancelled']} cancelled, "
+        f"{m['rejected']} rejected"
+        for name, m in sorted(groups.items())
+    ]
+    await ctx.send("\n".join(lines))
+
+
+@command(name="outbound", hidden=True)
+@check(require_owner)
+async def outbound_(ctx: Context):
+    """
+    Show outbound request metrics
+
+    Lists each lane of the outbound request scheduler with its waiting requests, how long requests have waited, and its lifetime counters.
+    """
+
+    lanes = outbound.metrics()
+
+    if not lanes:
+        await ctx.send(":person_shrugging: Nothing has been sent.")
+
+        return
+
+    lines = []
+
+    for name in outbound.LANES:
+        m = lanes[name]
+        started = m["submitted"] - m["coalesced"] - m["waiting"]
+        average = m["waited"] / started * 1000 if started else 0
+        lines.append(
+            f"**{name}**: {m['waiting']} waiting (peak {m['peak']}); "
+            f"waited {average:.1f}ms on average, {m['longest'] * 1000:.1f}ms "
+            f"at most; {m['completed']} completed, {m['failed']} failed, "
+            f"{m['coalesced']} coalesced"
+        )
+
+    await ctx.send("\n".join(lines))
+
+
+@command(name="caches", hidden=True)
+@check(require_owner)
+async def caches(ctx: Context):
+    """
+    Show cache metrics
+
+    Lists the hit, miss, and invalidation counters of the bot's caches.
+    """
+
+    m = responses.metrics()
+    await ctx.send(
+        f"**responses**: {m['entries']} cached; {m['hits']} hits, "
+        f"{m['misses']} misses, {m['invalidations']} invalidated"
+    )
+
+
+@command(name="features", hidden=True)
+@check(require_owner)
+async def features_(ctx: Context):
+    """
+    Show feature metrics
+
+    Lists each feature with the number of guilds using it and how many events it has skipped and processed, and each reaction handler with the number of messages it owns and how many reactions were routed to it.
+    """
+
+    lines = [
+        f"**{name}**: in use in {m['guilds']} guild(s); {m['skipped']} "
+        f"events skipped, {m['processed']} processed"
+        for name, m in sorted(features.metrics().items())
+    ]
+    lines += [
+        f"**{name}** reactions: {m['messages']} message(s); {m['added']} "
+        f"added, {m['removed']} removed"
+        for name, m in sorted(reactions.metrics().items())
+    ]
+    lines.append(f"**ignored** reactions: {reactions.ignored()}")
+    await ctx.send("\n".join(lines))
+
+
+async def setup(bot: Bot):
+    bot.add_command(config_reload)
+    bot.add_command(ext_reload)
+    bot.add_command(tasks_)
+    bot.add_command(caches)
+    bot.add_command(features_)
+    bot.add_command(outbound_)
@@ -6,14 +6,13 @@ from functools import partial
 import re
 
 # 3rd party
-from discord import Color, Embed, Message, Member
+from discord import Color, Embed, Message, Member, PartialMessage
 from discord.ext.commands import check, command, Context
 from discord.ext.commands.bot import Bot
 from discord.raw_models import RawReactionActionEvent
-from sqlitedict import SqliteDict
 
 # api
-from aethersprite import data_folder, log
+from aethersprite import log, snapshot
 from aethersprite.authz import channel_only, owner, require_roles_from_setting
 from aethersprite.emotes import (
     BUTTON_SUFFIX,
@@ -25,17 +24,50 @@ from aethersprite.emotes import (
     WASTEBASKET,
 )
 from aethersprite.filters import RoleFilter
-from aethersprite.settings import register, settings
+from aethersprite.jobs import add_job, Job, remove_job
+from aethersprite.limits import limit, unlimit
+from aethersprite.loader import shared
+from aethersprite.members import get_member
+from aethersprite.outbound import BACKGROUND, NORMAL, Outbox, outbox
+from aethersprite.reactions import add_handler, remove_handler, track, untrack
+from aethersprite.settings import register, settings, unregister
+from aethersprite.storage import open_db
+
+INTENTS = ("guild_reactions",)
 
 # constants
 BAR_WIDTH = 20
 POLL_EXPIRY = 86400 * 90  # 90 days
 
 bot: Bot
+out: Outbox
 # database
-polls = SqliteDict(
-    f"{data_folder}poll.sqlite3", tablename="polls", autocommit=True
+polls = open_db("poll.sqlite3", "polls")
+
+
+def _open_index() -> dict[int, tuple[datetime, int | None]]:
+    built: dict[int, tuple[datetime, int | None]] = {}
+    restored = snapshot.register(
+        "poll.index", lambda: built, built.update, ("poll.sqlite3",), 2
+    )
+
+    if not restored:
+        # the database's keys are strings
+        built.update(
+            (int(k), (p["timestamp"], p.get("guild"))) for k, p in polls.items()
+        )
+
+    return built
+
+
+# poll creation times and guild IDs (unknown for older polls), by message ID;
+# mirrors the database so that polls can be found without querying it, and
+# is shared by every bot in the process
+index: dict[int, tuple[datetime, int | None]] = shared(
+    f"{__name__}.index", _open_index
 )
+# bots the extension is loaded into, by ID
+bots: dict[int, Bot] = shared(f"{__name__}.bots", dict)
 # filters
 create_filter = RoleFilter("poll.createroles")
 vote_filter = RoleFilter("poll.voteroles")
@@ -62,8 +94,12 @@ async def poll(ctx: Context, *, options: str):
     match = re.match(r"^(?:\[([^\]]+)\]\s*)?(.+)$", options)
 
     if match is None:
-        await ctx.message.add_reaction(THUMBS_DOWN)
-        log.warn(f"{ctx.author} Provided invalid arguments: {options}")
+        if ctx.interaction is None:
+            await ctx.message.add_reaction(THUMBS_DOWN)
+        else:
+            await ctx.send(THUMBS_DOWN, ephemeral=True)
+
+        log.warn("%s Provided invalid arguments: %s", ctx.author, options)
 
         return
 
@@ -77,8 +113,10 @@ async def poll(ctx: Context, *, options: str):
         opts[emoji] = {"text": opt, "count": 0, "votes": set([])}
         count += 1
 
+    assert ctx.guild
     poll = {
         "timestamp": datetime.utcnow(),
+        "guild": ctx.guild.id,
         "author": ctx.author.display_name,
         "author_id": ctx.author.id,
         "avatar": ctx.author.display_avatar.url,
@@ -89,17 +127,18 @@ async def poll(ctx: Context, *, options: str):
         "confirm": set([]),
     }
     msg: Message = await ctx.send(embed=_get_embed(poll))
+    route = ("channel", msg.channel.id)
 
-    for emoji in opts.keys():
-        await msg.add_reaction(emoji)
-
-    await msg.add_reaction(PROHIBITED)
-    await msg.add_reaction(WASTEBASKET)
-    await msg.add_reaction(CHECK_MARK)
+    for emoji in (*opts.keys(), PROHIBITED, WASTEBASKET, CHECK_MARK):
+        out.submit(route, partial(msg.add_reaction, emoji), BACKGROUND)
 
     polls[msg.id] = poll
-    log.info(f"{ctx.author} created poll: {poll!r}")
-    await ctx.message.delete()
+    index[msg.id] = (poll["timestamp"], ctx.guild.id)
+    track(bot, "poll", msg.id)
+    log.info("%s created poll: %r", ctx.author, poll)
+
+    if ctx.interaction is None:
+        out.submit(route, ctx.message.delete, BACKGROUND)
 
 
 def _get_embed(poll: dict):
@@ -136,7 +175,7 @@ def _get_embed(poll: dict):
 
 async def _update_poll(
     member: Member,
-    message: Message,
+    message: Message | PartialMessage,
     emoji: str,
     adjustment: int,
 ):
@@ -164,17 +203,35 @@ async def _update_poll(
     verb = "voted" if adjustment > 0 else "retracted vote"
 
     if acted:
-        log.info(f"{member} {verb} for {emoji} - {poll['prompt']}")
+        log.info("%s %s for %s - %s", member, verb, emoji, poll["prompt"])
     else:
         log.warn(
-            f"Ignored vote for {emoji} by {member} in {message.id} - "
-            f"{poll['prompt']} (reacts are out of sync)"
+            "Ignored vote for %s by %s in %s - %s (reacts are out of sync)",
+            emoji,
+            member,
+            message.id,
+            poll["prompt"],
         )
 
-    await message.edit(embed=_get_embed(poll))
+    await _edit(message, poll)
+
+
+async def _edit(message: Message | PartialMessage, poll: dict):
+    """Update a poll's embed, replacing any update still waiting to be sent."""
+
+    await out.submit(
+        ("channel", message.channel.id),
+        partial(message.edit, embed=_get_embed(poll)),
+        NORMAL,
+        ("edit", message.id),
+    )
 
 
-def _allowed(setting: str, message: Message, member: Member) -> bool:
+def _allowed(
+    setting: str,
+    message: Message | PartialMessage,
+    member: Member,
+) -> bool:
     perms = message.channel.permissions_for(member)
     poll = polls[message.id]
 
@@ -191,7 +248,7 @@ def _allowed(setting: str, message: Message, member: Member) -> bool:
     stg = settings[setting].get(message, raw=True)
 
     if stg is None:
-        log.debug(f"No roles configured ({setting}), allowing by default")
+        log.debug("No roles configured (%s), allowing by default", setting)
 
         return True
 
@@ -209,20 +266,13 @@ def _allowed(setting: str, message: Message, member: Member) -> bool:
 
 
 async def on_raw_reaction_add(payload: RawReactionActionEvent):
-    """Handle on_reaction_add event."""
+    """Handle reactions added to polls."""
 
-    assert bot.user
     assert payload.member
-
-    if payload.user_id == bot.user.id or payload.message_id not in polls:
-        return
-
     poll = polls[payload.message_id]
     channel = payload.member.guild.get_channel(payload.channel_id)
     assert channel
-    msg: Message = await channel.fetch_message(  # type: ignore
-        payload.message_id,
-    )
+    msg = channel.get_partial_message(payload.message_id)  # type: ignore
 
     async def _delete():
         assert payload.member
@@ -231,9 +281,11 @@ async def on_raw_reaction_add(payload: RawReactionActionEvent):
         confirm = payload.member.id in poll["confirm"]
 
         if delete and confirm:
-            await msg.delete()
+            await out.submit(("channel", msg.channel.id), msg.delete)
             del polls[msg.id]
-            log.info(f"{payload.member} deleted poll {msg.id} - {prompt}")
+            index.pop(msg.id, None)
+            untrack(bot, msg.id)
+            log.info("%s deleted poll %s - %s", payload.member, msg.id, prompt)
 
     if _allowed("poll.createroles", msg, payload.member):
         if payload.emoji.name == WASTEBASKET:
@@ -253,7 +305,7 @@ async def on_raw_reaction_add(payload: RawReactionActionEvent):
         if payload.emoji.name == PROHIBITED:
             poll["open"] = False
             polls[msg.id] = poll
-            await msg.edit(embed=_get_embed(poll))
+            await _edit(msg, poll)
 
             return
 
@@ -264,7 +316,10 @@ async def on_raw_reaction_add(payload: RawReactionActionEvent):
         or not poll["open"]
         or not _allowed("poll.voteroles", msg, payload.member)
     ):
-        await msg.remove_reaction(payload.emoji.name, payload.member)
+        await out.submit(
+            ("channel", msg.channel.id),
+            partial(msg.remove_reaction, payload.emoji.name, payload.member),
+        )
 
         return
 
@@ -272,24 +327,20 @@ async def on_raw_reaction_add(payload: RawReactionActionEvent):
 
 
 async def on_raw_reaction_remove(payload: RawReactionActionEvent):
-    "Handle on_reaction_remove event."
+    "Handle reactions removed from polls."
 
-    assert bot.user
     assert payload.guild_id
-
-    if payload.user_id == bot.user.id or payload.message_id not in polls:
-        return
-
     poll = polls[payload.message_id]
     guild = bot.get_guild(payload.guild_id)
     assert guild
-    member = guild.get_member(payload.user_id)
-    assert member
+    member = await get_member(guild, payload.user_id)
+
+    if member is None:
+        return
+
     channel = guild.get_channel(payload.channel_id)
     assert channel
-    msg: Message = await channel.fetch_message(  # type: ignore
-        payload.message_id,
-    )
+    msg = channel.get_partial_message(payload.message_id)  # type: ignore
 
     if payload.emoji.name == WASTEBASKET and member.id in poll["delete"]:
         poll["delete"].remove(member.id)
@@ -308,7 +359,7 @@ async def on_raw_reaction_remove(payload: RawReactionActionEvent):
     ):
         poll["open"] = True
         polls[msg.id] = poll
-        await msg.edit(embed=_get_embed(poll))
+        await _edit(msg, poll)
 
         return
 
@@ -318,21 +369,53 @@ async def on_raw_reaction_remove(payload: RawReactionActionEvent):
     await _update_poll(member, msg, payload.emoji.name, -1)
 
 
-async def on_ready():
-    # clear out old polls
+def _serves(bot: Bot, guild_id: int | None) -> bool:
+    # polls from before guilds were recorded may be anywhere
+    return guild_id is None or bot.get_guild(guild_id) is not None
+
+
+async def _track(job: Job):
+    """Route reactions to the bot's polls."""
+
+    for k, (_, guild_id) in index.items():
+        if _serves(bot, guild_id):
+            track(bot, "poll", k)
+
+
+async def _expire(job: Job):
+    """Clear out old polls."""
+
+    # one bot expires the polls of every bot in the process
+    if next(iter(bots), None) != id(bot):
+        return
+
     now = datetime.utcnow()
+    expired = [
+        k
+        for k, (ts, guild_id) in index.items()
+        if (now - ts).total_seconds() >= POLL_EXPIRY
+        and any(_serves(b, guild_id) for b in bots.values())
+    ]
+    job.total = len(expired)
+
+    for k in expired:
+        index.pop(k, None)
 
-    for k, p in polls.items():
-        ts: datetime = p["timestamp"]
+        for b in bots.values():
+            untrack(b, k)
 
-        if (now - ts).total_seconds() >= POLL_EXPIRY:
-            del polls[k]
+        # another shard's process may expire older polls, too
+        polls.pop(k, None)
+
+        job.done += 1
 
 
 async def setup(bot_: Bot):
-    global bot
+    global bot, out
 
     bot = bot_
+    out = outbox(bot)
+    bots[id(bot)] = bot
 
     # settings
     register(
@@ -353,18 +436,25 @@ async def setup(bot_: Bot):
     )
 
     # events
-    bot.add_listener(on_raw_reaction_add)
-    bot.add_listener(on_raw_reaction_remove)
-    bot.add_listener(on_ready)
+    add_handler(bot, "poll", on_raw_reaction_add, on_raw_reaction_remove)
+
+    # startup jobs; the bot's guilds aren't known until it is ready
+    add_job(bot, "poll.track", _track, 0, critical=True)
+    add_job(bot, "poll.expire", _expire, 90)
 
+    limit("poll")
     bot.add_command(poll)
 
 
 async def teardown(bot: Bot):
-    global settings
+    bots.pop(id(bot), None)
+    remove_handler(bot, "poll")
+    remove_job(bot, "poll.track")
+    remove_job(bot, "poll.expire")
+    unlimit("poll")
 
     for key in (
         "poll.createroles",
         "poll.voteroles",
     ):
-        del settings[key]
+        unregister(key)
@@ -3,15 +3,12 @@
 # 3rd party
 from discord.ext.commands import Context
 from discord.ext.commands.bot import Bot
-from sqlitedict import SqliteDict
 
 # api
-from aethersprite import data_folder
-from aethersprite.settings import register, settings
+from aethersprite.settings import register, settings, unregister
+from aethersprite.storage import open_db
 
-prefixes = SqliteDict(
-    f"{data_folder}prefix.sqlite3", tablename="prefixes", autocommit=True
-)
+prefixes = open_db("prefix.sqlite3", "prefixes")
 
 
 def get_prefixes(ctx: Context):
@@ -32,6 +29,4 @@ async def setup(bot: Bot):
 
 
 async def teardown(bot: Bot):
-    global settings
-
-    del settings["prefix"]
+    unregister("prefix")
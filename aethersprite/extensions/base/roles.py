@@ -3,28 +3,48 @@
 # stdlib
 import asyncio as aio
 from datetime import datetime, timedelta
+from functools import partial
 
 # 3rd party
-from discord import Color, Embed, Message
+from discord import Color, Embed, Message, PartialMessage
 from discord.errors import NotFound
 from discord.ext.commands import Bot, check, command, Context
 from discord.raw_models import RawReactionActionEvent
-from sqlitedict import SqliteDict
 
 # local
-from aethersprite import bot, data_folder, log
+from aethersprite import log
 from aethersprite.authz import channel_only, require_admin
 from aethersprite.common import FakeContext, seconds_to_str
 from aethersprite.filters import RoleFilter
-from aethersprite.settings import register, settings
+from aethersprite.jobs import add_job, Job, remove_job
+from aethersprite.limits import limit, unlimit
+from aethersprite.loader import claim, stash
+from aethersprite.members import get_member
+from aethersprite.outbound import BACKGROUND, NORMAL, Outbox, outbox, URGENT
+from aethersprite.reactions import add_handler, remove_handler, track, untrack
+from aethersprite.settings import register, settings, unregister
+from aethersprite.storage import open_db
+from aethersprite.tasks import open_group, TaskGroup
+
+INTENTS = ("guild_reactions",)
+
+bot: Bot
+out: Outbox
+# background directory updates and post deletions
+updates: TaskGroup
+deletions: TaskGroup
 
 loop = aio.get_event_loop()
+# pending deletions of self-service posts, by message ID
+timers: dict[int, aio.TimerHandle] = {}
+# self-service posts whose deletion is under way
+removing: set[int] = set()
 # constants
 DIGIT_SUFFIX = "\ufe0f\u20e3"
 # database
-postdb_file = f"{data_folder}roles.sqlite3"
-posts = SqliteDict(postdb_file, tablename="selfserv_posts", autocommit=True)
-directories = SqliteDict(postdb_file, tablename="catalog", autocommit=True)
+postdb_file = "roles.sqlite3"
+posts = open_db(postdb_file, "selfserv_posts")
+directories = open_db(postdb_file, "catalog")
 
 
 class DirectoryUpdateFilter(RoleFilter):
@@ -52,14 +72,14 @@ class DirectoryUpdateFilter(RoleFilter):
 
         async def update():
             try:
-                msg = await chan.fetch_message(  # type: ignore
+                msg = chan.get_partial_message(  # type: ignore
                     directory["message"],
                 )
                 await _get_message(ctx, msg)
             except NotFound:
                 pass
 
-        aio.ensure_future(update())
+        updates.spawn(update())
 
         return val
 
@@ -69,7 +89,7 @@ roles_filter = DirectoryUpdateFilter("roles.catalog")
 
 async def _get_message(
     ctx: Context,
-    msg: Message | None = None,
+    msg: Message | PartialMessage | None = None,
     expiry: str | None = None,
 ):
     roles_: list[str] = settings["roles.catalog"].get(ctx)[:10]  # type: ignore
@@ -88,14 +108,20 @@ async def _get_message(
         embed.add_field(name=f"{count}{DIGIT_SUFFIX} {role}", value="\u200b")
         count += 1
 
+    route = ("channel", ctx.channel.id)
+
     if msg is None:
         msg = await ctx.send(embed=embed)
     else:
-        await msg.edit(embed=embed)
-        await msg.clear_reactions()
+        await out.submit(
+            route, partial(msg.edit, embed=embed), NORMAL, ("edit", msg.id)
+        )
+        await out.submit(route, msg.clear_reactions)
 
     for i in range(0, count):
-        await msg.add_reaction(f"{i}{DIGIT_SUFFIX}")
+        out.submit(
+            route, partial(msg.add_reaction, f"{i}{DIGIT_SUFFIX}"), BACKGROUND
+        )
 
     return msg
 
@@ -116,7 +142,8 @@ async def roles(ctx: Context):
             ":person_shrugging: There are no available self-service roles."
         )
         log.warn(
-            f"{ctx.author} invoked roles self-service, but no roles are available"
+            "%s invoked roles self-service, but no roles are available",
+            ctx.author,
         )
 
         return
@@ -128,9 +155,12 @@ async def roles(ctx: Context):
         "expiry": datetime.utcnow() + timedelta(seconds=expiry_raw),
     }
 
-    log.info(f"{ctx.author} invoked roles self-service")
-    loop.call_later(expiry_raw, _delete, msg.id)
-    await ctx.message.delete()
+    track(bot, "roles", msg.id)
+    log.info("%s invoked roles self-service", ctx.author)
+    timers[msg.id] = loop.call_later(expiry_raw, _delete, msg.id)
+
+    if ctx.interaction is None:
+        out.submit(("channel", ctx.channel.id), ctx.message.delete, BACKGROUND)
 
 
 @command()
@@ -148,8 +178,8 @@ async def catalog(ctx: Context):
             ":person_shrugging: There are no available self-service roles."
         )
         log.warn(
-            f"{ctx.author} attempted to post roles catalog, but no roles "
-            "are available"
+            "%s attempted to post roles catalog, but no roles are available",
+            ctx.author,
         )
 
         return
@@ -162,53 +192,47 @@ async def catalog(ctx: Context):
 
         if chan is not None:
             try:
-                msg = await chan.fetch_message(  # type: ignore
-                    existing["message"],
+                await out.submit(
+                    ("channel", chan.id),
+                    chan.get_partial_message(  # type: ignore
+                        existing["message"],
+                    ).delete,
                 )
-                await msg.delete()
             except NotFound:
                 pass
 
+        untrack(bot, existing["message"])
+
     msg = await _get_message(ctx)
     directories[guild_id] = {"message": msg.id, "channel": ctx.channel.id}
+    track(bot, "roles", msg.id)
+
+    log.info("%s posted roles catalog to %s", ctx.author, ctx.channel)
 
-    log.info(f"{ctx.author} posted roles catalog to {ctx.channel}")
-    await ctx.message.delete()
+    if ctx.interaction is None:
+        out.submit(("channel", ctx.channel.id), ctx.message.delete, BACKGROUND)
 
 
 async def on_raw_reaction_add(payload: RawReactionActionEvent):
-    """Handle on_reaction_add event."""
+    """Handle reactions added to self-service and catalog posts."""
 
-    assert bot.user
     assert payload.guild_id
-
-    if payload.user_id == bot.user.id:
-        return
-
-    directory = (
-        directories[payload.guild_id]
-        if payload.guild_id in directories
-        else None
-    )
-
-    if payload.message_id not in posts and (
-        directory is None or payload.message_id != directory["message"]
-    ):
-        return
-
     guild = bot.get_guild(payload.guild_id)
     assert guild
     channel = guild.get_channel(payload.channel_id)
     assert channel
-    message = await channel.fetch_message(  # type: ignore
-        payload.message_id,
-    )
-    member = guild.get_member(payload.user_id)
-    assert member
+    message = channel.get_partial_message(payload.message_id)  # type: ignore
+    member = payload.member or await get_member(guild, payload.user_id)
+
+    if member is None:
+        return
+
+    unreact = partial(message.remove_reaction, payload.emoji, member)
+
     split = str(payload.emoji).split("\ufe0f")
 
     if len(split) != 2:
-        await message.remove_reaction(payload.emoji, member)
+        await out.submit(("channel", channel.id), unreact)
 
         return
 
@@ -224,35 +248,21 @@ async def on_raw_reaction_add(payload: RawReactionActionEvent):
     which = int(split[0])
 
     if which < 0 or which > len(roles_):
-        await message.remove_reaction(payload.emoji, member)
+        await out.submit(("channel", channel.id), unreact)
 
         return
 
     role = roles_[which]
-    await member.add_roles(role)
-    log.info(f"{member} added role {role}")
+    await out.submit(
+        ("guild", guild.id), partial(member.add_roles, role), URGENT
+    )
+    log.info("%s added role %s", member, role)
 
 
 async def on_raw_reaction_remove(payload: RawReactionActionEvent):
-    """Handle on_reaction_remove event."""
+    """Handle reactions removed from self-service and catalog posts."""
 
-    assert bot.user
     assert payload.guild_id
-
-    if payload.user_id == bot.user.id:
-        return
-
-    directory = (
-        directories[payload.guild_id]
-        if payload.guild_id in directories
-        else None
-    )
-
-    if payload.message_id not in posts and (
-        directory is None or payload.message_id != directory["message"]
-    ):
-        return
-
     split = str(payload.emoji).split("\ufe0f")
 
     if len(split) != 2:
@@ -260,8 +270,11 @@ async def on_raw_reaction_remove(payload: RawReactionActionEvent):
 
     guild = bot.get_guild(payload.guild_id)
     assert guild
-    member = guild.get_member(payload.user_id)
-    assert member
+    member = await get_member(guild, payload.user_id)
+
+    if member is None:
+        return
+
     fake_ctx = FakeContext(guild=guild)
     setting: list[int] = settings["roles.catalog"].get(
         fake_ctx,
@@ -277,41 +290,82 @@ async def on_raw_reaction_remove(payload: RawReactionActionEvent):
         return
 
     role = roles_[which]
-    await member.remove_roles(role)
-    log.info(f"{member} removed role {role}")
+    await out.submit(
+        ("guild", guild.id), partial(member.remove_roles, role), URGENT
+    )
+    log.info("%s removed role %s", member, role)
+
 
+async def _track(job: Job):
+    """Route reactions to the bot's self-service and catalog posts."""
 
-async def on_ready():
-    """Clear expired/missing roles posts on startup."""
+    # the database's keys are strings
+    for id, post in posts.items():
+        if bot.get_guild(post["guild"]) is not None:
+            track(bot, "roles", int(id))
 
-    # clean up missing directories
     for guild_id, directory in directories.items():
+        if bot.get_guild(int(guild_id)) is not None:
+            track(bot, "roles", directory["message"])
+
+
+async def _check_directories(job: Job):
+    """Clean up directory posts which have been deleted."""
+
+    async def check(item):
+        guild_id, directory = item
+        guild = bot.get_guild(int(guild_id))
+
+        # the guild may belong to another of the process's bots
+        if guild is None:
+            return
+
+        chan = guild.get_channel(directory["channel"])
+
+        if chan is None:
+            return
+
         try:
-            guild = bot.get_guild(int(guild_id))
-            assert guild
-            chan = guild.get_channel(directory["channel"])
-            assert chan
-            msg = await chan.fetch_message(  # type: ignore
-                directory["message"],
-            )
+            async with job.api():
+                await chan.fetch_message(  # type: ignore
+                    directory["message"],
+                )
         except NotFound:
-            log.warn(f"Deleted missing directory post for {guild_id}")
+            log.warning("Deleted missing directory post for %s", guild_id)
             del directories[guild_id]
+            untrack(bot, directory["message"])
+
+    await job.map(check, list(directories.items()))
+
+
+async def _schedule_posts(job: Job):
+    """Delete expired self-service posts and schedule the rest."""
 
-    # clean up expired posts
     now = datetime.utcnow()
+    expired = []
+
+    for key, msg in posts.items():
+        id = int(key)
+
+        if id in timers or bot.get_guild(msg["guild"]) is None:
+            continue
 
-    for id, msg in posts.items():
         if msg["expiry"] <= now:
-            _delete(id)
+            expired.append(id)
         else:
             expiry: datetime = msg["expiry"]
             diff = (expiry - now).total_seconds()
-            loop.call_later(diff, _delete, id)
-            log.debug(f"Scheduled deletion of self-service post {id}")
+            timers[id] = loop.call_later(diff, _delete, id)
+            log.debug("Scheduled deletion of self-service post %s", id)
 
+    async def remove(id: int):
+        async with job.api():
+            await _remove(id)
 
-def _delete(id: int):
+    await job.map(remove, expired)
+
+
+async def _remove(id: int):
     if id not in posts:
         return
 
@@ -320,22 +374,46 @@ def _delete(id: int):
     assert guild
     channel = guild.get_channel(post["channel"])
 
-    async def f():
-        try:
-            msg: Message = await channel.fetch_message(  # type: ignore
-                id,
-            )
-            await msg.delete()
-        except NotFound:
-            pass
+    try:
+        await out.submit(
+            ("channel", channel.id),  # type: ignore
+            channel.get_partial_message(id).delete,  # type: ignore
+            BACKGROUND,
+        )
+    except NotFound:
+        pass
+
+    del posts[id]
+    untrack(bot, id)
+    log.info("Deleted roles self-service post %s", id)
 
-        del posts[id]
 
-    aio.ensure_future(f())
-    log.info(f"Deleted roles self-service post {id}")
+async def _removal(id: int):
+    try:
+        await _remove(id)
+    finally:
+        removing.discard(id)
 
 
-async def setup(bot: Bot):
+def _delete(id: int):
+    timers.pop(id, None)
+
+    if deletions.spawn(_removal(id)):
+        removing.add(id)
+
+
+async def setup(bot_: Bot):
+    global bot, deletions, out, updates
+
+    bot = bot_
+    out = outbox(bot)
+    updates = open_group("roles.updates", 1, 20)
+    deletions = open_group("roles.deletions", 4, 500)
+
+    # pick up the deletion timers of the module this one is replacing
+    for id, when in (claim(bot, __name__) or {}).items():
+        timers[id] = loop.call_at(when, _delete, id)
+
     # settings
     register(
         "roles.catalog",
@@ -354,15 +432,39 @@ async def setup(bot: Bot):
     )
 
     # events
-    bot.add_listener(on_raw_reaction_add)
-    bot.add_listener(on_raw_reaction_remove)
-    bot.add_listener(on_ready)
+    add_handler(bot, "roles", on_raw_reaction_add, on_raw_reaction_remove)
+
+    # startup jobs; the bot's guilds aren't known until it is ready
+    add_job(bot, "roles.track", _track, 0, critical=True)
+    add_job(bot, "roles.posts", _schedule_posts, 10, 4, critical=True)
+    add_job(bot, "roles.directories", _check_directories, 50, 4)
 
+    limit("roles")
     bot.add_command(catalog)
     bot.add_command(roles)
 
 
 async def teardown(bot):
-    global settings
-
-    del settings["roles.catalog"]
+    # stop background work without waiting on it, so that a reload doesn't
+    # leave reactions to these posts unhandled in the meantime
+    updates.cancel()
+    deletions.cancel()
+
+    # hand pending deletions off to the next setup, in case of a reload;
+    # those which were under way are due immediately (removal is idempotent)
+    pending = {id: loop.time() for id in removing}
+
+    for id, timer in timers.items():
+        timer.cancel()
+        pending[id] = timer.when()
+
+    removing.clear()
+    stash(bot, __name__, pending)
+    remove_handler(bot, "roles")
+    remove_job(bot, "roles.track")
+    remove_job(bot, "roles.posts")
+    remove_job(bot, "roles.directories")
+    unlimit("roles")
+
+    for key in ("roles.catalog", "roles.postexpiry"):
+        unregister(key)
@@ -6,10 +6,16 @@ from discord.ext.commands import Bot, Cog, command, Context
 from functools import partial
 
 # local
-from aethersprite import log
+from aethersprite import log, responses
 from aethersprite.authz import channel_only, require_roles_from_setting
 from aethersprite.filters import RoleFilter
-from aethersprite.settings import register, settings
+from aethersprite.settings import (
+    register,
+    settings,
+    unregister,
+    unwatch,
+    watch,
+)
 
 # messages
 MSG_NO_SETTING = ":person_shrugging: No such setting exists."
@@ -36,9 +42,13 @@ class Settings(Cog):
     async def get_all(self, ctx: Context):
         """View a list of all settings"""
 
-        settings_str = "**, **".join(sorted(settings.keys()))
-        await ctx.send(f":gear: All settings: **{settings_str}**")
-        log.info(f"{ctx.author} viewed all settings")
+        def render():
+            settings_str = "**, **".join(sorted(settings.keys()))
+
+            return f":gear: All settings: **{settings_str}**"
+
+        await responses.send_cached(ctx, render, "settings")
+        log.info("%s viewed all settings", ctx.author)
 
     @command()
     async def get(
@@ -68,7 +78,7 @@ class Settings(Cog):
             f">>> Value: `{repr(val)}`\n"
             f"Default: `{repr(default)}`"
         )
-        log.info(f"{ctx.author} viewed setting {name} in {channel}")
+        log.info("%s viewed setting %s in %s", ctx.author, name, channel)
 
     @command()
     async def set(
@@ -99,8 +109,10 @@ class Settings(Cog):
         if name not in settings:
             await ctx.send(MSG_NO_SETTING)
             log.warn(
-                f"{ctx.author} attempted to set nonexistent setting: "
-                f"{name} in {channel}"
+                "%s attempted to set nonexistent setting: %s in %s",
+                ctx.author,
+                name,
+                channel,
             )
 
             return
@@ -108,13 +120,20 @@ class Settings(Cog):
         if settings[name].set(ctx, value, channel=channel.id):
             await ctx.send(":thumbsup: Value updated.")
             log.info(
-                f"{ctx.author} updated setting {name}: {value} in {channel}"
+                "%s updated setting %s: %s in %s",
+                ctx.author,
+                name,
+                value,
+                channel,
             )
         else:
             await ctx.send(":thumbsdown: Error updating value.")
             log.warn(
-                f"{ctx.author} failed to update setting {name}: {value} "
-                f"in {channel}"
+                "%s failed to update setting %s: %s in %s",
+                ctx.author,
+                name,
+                value,
+                channel,
             )
 
     @command()
@@ -140,8 +159,10 @@ class Settings(Cog):
 
         if name not in settings:
             log.warn(
-                f"{ctx.author} attempted to clear nonexistent setting: "
-                f"{name} in {channel}"
+                "%s attempted to clear nonexistent setting: %s in %s",
+                ctx.author,
+                name,
+                channel,
             )
             await ctx.send(MSG_NO_SETTING)
 
@@ -149,7 +170,7 @@ class Settings(Cog):
 
         settings[name].set(ctx, None, raw=True, channel=channel.id)
         await ctx.send(":negative_squared_cross_mark: Setting cleared.")
-        log.info(f"{ctx.author} cleared setting {name} in {channel}")
+        log.info("%s cleared setting %s in %s", ctx.author, name, channel)
 
     @command()
     async def desc(self, ctx: Context, name: str):
@@ -158,29 +179,40 @@ class Settings(Cog):
         if name not in settings:
             await ctx.send(MSG_NO_SETTING)
             log.warn(
-                f"{ctx.author} attempted to view description of "
-                f"nonexistent setting {name}"
+                "%s attempted to view description of nonexistent setting %s",
+                ctx.author,
+                name,
             )
 
             return
 
-        setting = settings[name]
+        def render():
+            setting = settings[name]
 
-        if setting.description is None:
-            await ctx.send(":person_shrugging: No description set.")
-        else:
-            await ctx.send(
+            if setting.description is None:
+                return ":person_shrugging: No description set."
+
+            return (
                 f":book: `{setting.name}` "
                 f"_(Channel: **{str(setting.channel)}**)_\n"
                 f"> {setting.description}"
             )
 
-        log.info(f"{ctx.author} viewed description of setting {name}")
+        await responses.send_cached(ctx, render, "settings", args=(name,))
+
+        log.info("%s viewed description of setting %s", ctx.author, name)
 
 
 role_filter = RoleFilter("settings.adminroles")
 
 
+def _registry_changed(key: str | None):
+    """Discard cached listings when a setting is registered or unregistered."""
+
+    if key is None:
+        responses.invalidate("settings")
+
+
 async def setup(_bot: Bot):
     global bot
 
@@ -197,6 +229,7 @@ async def setup(_bot: Bot):
         "moderators have de facto access to all commands.",
         filter=role_filter,
     )
+    watch("*", _registry_changed)
     cog = Settings(bot)
 
     for c in cog.get_commands():
@@ -204,3 +237,8 @@ async def setup(_bot: Bot):
         c.add_check(channel_only)
 
     await bot.add_cog(cog)
+
+
+async def teardown(bot: Bot):
+    unwatch("*", _registry_changed)
+    unregister("settings.adminroles")
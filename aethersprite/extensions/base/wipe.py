@@ -10,76 +10,78 @@
 
 # typing
 
+# stdlib
+from functools import partial
+
 # 3rd party
 from discord.ext.commands import Bot, check, command, Context
 from discord.channel import TextChannel
-from discord.message import Message
 from discord.raw_models import RawReactionActionEvent
-from sqlitedict import SqliteDict
 
 # api
-from aethersprite import bot, data_folder, log
+from aethersprite import log
 from aethersprite.authz import channel_only, require_admin
 from aethersprite.emotes import CHECK_MARK, PROHIBITED
+from aethersprite.limits import limit, unlimit
+from aethersprite.outbound import BACKGROUND, Outbox, outbox
+from aethersprite.reactions import add_handler, remove_handler, track, untrack
+from aethersprite.storage import open_db
+
+INTENTS = ("guild_reactions",)
 
+bot: Bot
+out: Outbox
 
 # database
-wipes = SqliteDict(
-    f"{data_folder}wipe.sqlite3",
-    tablename="wipes",
-    autocommit=True,
-)
+wipes = open_db("wipe.sqlite3", "wipes")
 
 
 async def on_raw_reaction_add(payload: RawReactionActionEvent):
-    """Handle on_reaction_add event."""
+    """Handle reactions added to wipe confirmations."""
 
-    assert bot.user
     assert payload.member
     assert payload.member.guild
-    if (
-        payload.user_id == bot.user.id
-        or payload.guild_id not in wipes
-        or wipes[payload.guild_id] != payload.message_id
-    ):
-        return
-
     channel: TextChannel = payload.member.guild.get_channel(
         payload.channel_id  # type: ignore
     )
-    msg: Message = await channel.fetch_message(payload.message_id)
+    msg = channel.get_partial_message(payload.message_id)
     perms = channel.permissions_for(payload.member)
+    route = ("channel", channel.id)
+    unreact = partial(msg.remove_reaction, payload.emoji, payload.member)
 
     if not perms.manage_messages:
-        await msg.remove_reaction(payload.emoji, payload.member)
+        await out.submit(route, unreact)
         return
 
     if payload.emoji.name == PROHIBITED:
-        log.info(f"{payload.member} canceled wipe in {channel}")
-        await msg.delete()
+        log.info("%s canceled wipe in %s", payload.member, channel)
+        await out.submit(route, msg.delete)
         del wipes[payload.guild_id]
+        untrack(bot, payload.message_id)
         return
 
     if payload.emoji.name != CHECK_MARK:
-        await msg.remove_reaction(payload.emoji, payload.member)
+        await out.submit(route, unreact)
         return
 
-    log.info(f"{payload.member} began wipe in {channel}")
+    log.info("%s began wipe in %s", payload.member, channel)
     del wipes[payload.guild_id]
+    untrack(bot, payload.message_id)
 
     # stop after a million just to be safe?
     for _ in range(1_000_000):
         done = True
-        log.info(f"Deleting up to 100 messages in {channel}")
+        log.info("Deleting up to 100 messages in %s", channel)
 
         async for m in channel.history(limit=100):
             done = False
-            await m.delete()
+            # let other work in the channel go first
+            await out.submit(route, m.delete, BACKGROUND)
 
         if done:
             break
 
-    log.info(f"{payload.member} finished wiping {channel}")
+    log.info("%s finished wiping %s", payload.member, channel)
 
 
 @command()
@@ -89,13 +91,35 @@ async def wipe(ctx: Context):
     """Delete all messages in a channel."""
 
     assert ctx.guild
-    log.info(f"{ctx.author} requested wipe in {ctx.channel}")
+    log.info("%s requested wipe in %s", ctx.author, ctx.channel)
     msg = await ctx.send("Are you sure?")
-    await msg.add_reaction(PROHIBITED)
-    await msg.add_reaction(CHECK_MARK)
+    route = ("channel", msg.channel.id)
+
+    for emoji in (PROHIBITED, CHECK_MARK):
+        out.submit(route, partial(msg.add_reaction, emoji), BACKGROUND)
+
+    # only the latest confirmation in each guild counts
+    if ctx.guild.id in wipes:
+        untrack(bot, wipes[ctx.guild.id])
+
     wipes[ctx.guild.id] = msg.id
+    track(bot, "wipe", msg.id)
+
+
+async def setup(bot_: Bot):
+    global bot, out
 
+    bot = bot_
+    out = outbox(bot)
 
-async def setup(bot: Bot):
+    limit("wipe")
     bot.add_command(wipe)
-    bot.add_listener(on_raw_reaction_add)
+    add_handler(bot, "wipe", on_raw_reaction_add)
+
+    for message_id in wipes.values():
+        track(bot, "wipe", message_id)
+
+
+async def teardown(bot: Bot):
+    remove_handler(bot, "wipe")
+    unlimit("wipe")
@@ -3,17 +3,16 @@
 # stdlib
 
 # 3rd party
-from discord import DMChannel, TextChannel
+from discord import TextChannel
 from discord.ext.commands import Bot, Cog, command, Context
-from sqlitedict import SqliteDict
 
 # local
-from aethersprite import data_folder, log
+from aethersprite import log, responses
 from aethersprite.authz import require_admin
+from aethersprite.gating import add_gate, Gate, invalidate, remove_gate
+from aethersprite.storage import open_db
 
-yeets = SqliteDict(
-    f"{data_folder}yeet.sqlite3", tablename="yeets", autocommit=True
-)
+yeets = open_db("yeet.sqlite3", "yeets")
 """Yeets database"""
 
 
@@ -50,11 +49,7 @@ class Yeet(Cog):
         server_key = command.lower().strip()
         key = f"{server_key}#{channel.id}"
         guild = str(ctx.guild.id)
-
-        if ctx.guild.id not in yeets:
-            yeets[guild] = set([])
-
-        ys = yeets[guild]
+        ys = set(yeets.get(guild, ()))
 
         if (key in ys and not server) or (server_key in ys and server):
             await ctx.send(":newspaper: Already done.")
@@ -70,8 +65,13 @@ class Yeet(Cog):
 
         ys.add(server_key if server else key)
         yeets[guild] = ys
+        invalidate(ctx.guild.id)
+        responses.invalidate(f"yeet:{guild}")
         log.info(
-            f"{ctx.author} yeeted {server_key if server else key} in {ctx.channel}"
+            "%s yeeted %s in %s",
+            ctx.author,
+            server_key if server else key,
+            ctx.channel,
         )
         await ctx.send(":boom: Yeet!")
 
@@ -116,8 +116,13 @@ class Yeet(Cog):
 
         ys.remove(server_key if server else key)
         yeets[guild] = ys
+        invalidate(ctx.guild.id)
+        responses.invalidate(f"yeet:{guild}")
         log.info(
-            f"{ctx.author} removed {server_key if server else key} in {channel}"
+            "%s removed %s in %s",
+            ctx.author,
+            server_key if server else key,
+            channel,
         )
         await ctx.send(":tada: Re-enabled.")
 
@@ -145,68 +150,60 @@ class Yeet(Cog):
             assert channel
 
         guild = str(ctx.guild.id)
-
-        if guild not in yeets:
-            yeets[guild] = []
-
         suffix = f"#{channel.id}"
         suffixlen = len(suffix)
-        output = "**, **".join(
-            [
-                (l if server else l[:-suffixlen])
-                for l in yeets[guild]
-                if server or l.endswith(suffix)
-            ]
-        )
 
-        if not len(output):
-            output = "None"
+        def render():
+            output = "**, **".join(
+                [
+                    (l if server else l[:-suffixlen])
+                    for l in yeets.get(guild, ())
+                    if server or l.endswith(suffix)
+                ]
+            )
+
+            return f":v: **{output or 'None'}**"
 
         log.info(
-            f"{ctx.author} viewed {'server ' if server else ''}yeet "
-            f"list in {channel}"
+            "%s viewed %syeet list in %s",
+            ctx.author,
+            "server " if server else "",
+            channel,
+        )
+        await responses.send_cached(
+            ctx,
+            render,
+            f"yeet:{guild}",
+            args=(None if server else channel.id,),
         )
-        await ctx.send(f":v: **{output}**")
-
 
-async def check_yeet(ctx: Context):
-    """Check that command has not been yeeted before allowing execution."""
 
-    if isinstance(ctx.channel, DMChannel):
-        # can't yeet commands via DM, since we need a guild to check
-        # settings values
-        return True
+def _gate(ctx: Context) -> Gate:
+    """Compile the commands yeeted in a context's channel."""
 
-    assert ctx.channel
-    assert ctx.command
     assert ctx.guild
-
     guild = str(ctx.guild.id)
+    suffix = f"#{ctx.channel.id}"
+    denied = set()
 
-    if guild not in yeets:
-        # none set for this guild; bail
-        return True
-
-    keys = (ctx.command.name, f"{ctx.command.name}#{ctx.channel.id}")
-
-    for k in keys:
-        if k in yeets[guild]:
-            log.debug(
-                f"Suppressing yeeted command from "
-                f"{ctx.author}: {ctx.command.name} in "
-                f"#{ctx.channel.name} ({ctx.guild.name})"  # type: ignore
-            )
-
-            return False
+    for k in yeets.get(guild, ()):
+        if "#" not in k:
+            denied.add(k)
+        elif k.endswith(suffix):
+            denied.add(k[: -len(suffix)])
 
-    return True
+    return Gate(denied=frozenset(denied))
 
 
 async def setup(bot: Bot):
-    bot.add_check(check_yeet)
+    add_gate(bot, "yeet", _gate)
     cog = Yeet(bot)
 
     for c in cog.get_commands():
         c.add_check(require_admin)
 
     await bot.add_cog(cog)
+
+
+async def teardown(bot: Bot):
+    remove_gate(bot, "yeet")
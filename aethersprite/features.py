@@ -0,0 +1,328 @@
+"""
+Feature enablement module
+
+Most guilds never use most features, but every member join (for example) is
+still passed to every extension listening for it. Extensions keep track, in
+memory, of the guilds in which each of their features is in use (e.g. has a
+greeting configured), and their listeners return early for events from any
+other guild, before doing any storage or API work.
+
+```python
+from aethersprite.features import drop_feature, feature, Feature
+
+things: Feature
+
+
+async def on_member_join(member):
+    if not things.active(member.guild.id):
+        return
+
+    ...
+
+
+async def setup(bot):
+    global things
+
+    things = feature(bot, "thing")
+    things.reset(guild_ids_which_have_things())
+
+
+async def teardown(bot):
+    drop_feature(bot, "thing")
+```
+
+Features which are in use wherever some settings have a value can track
+those settings with `Feature.track_settings` instead. Counters of the events
+each feature skipped and processed are available from `metrics()`.
+"""
+
+# stdlib
+from typing import Callable, Iterable
+
+# 3rd party
+from discord.ext.commands import Bot
+
+# local
+from . import log
+from .settings import Setting, settings, unwatch, watch
+
+
+class Feature(object):
+    """The guilds in which one of a bot's features is in use"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.guilds: set[int] = set()
+        """IDs of the guilds in which the feature is in use"""
+
+        self.everywhere = False
+        """If the feature is in use in every guild, e.g. because a setting it
+        tracks has a default value"""
+
+        self.skipped = 0
+        """Events skipped because the feature was not in use"""
+
+        self.processed = 0
+        """Events processed because the feature was in use"""
+
+        self._watching: list[tuple[str, Callable[[str | None], None]]] = []
+
+    def active(self, guild_id: int | None) -> bool:
+        """
+        Check whether the feature is in use in a guild, counting the event
+        being checked as skipped or processed.
+
+        Args:
+            guild_id: The guild's ID, or None for direct messages
+
+        Returns:
+            If the event should be processed
+        """
+
+        if self.everywhere or guild_id in self.guilds:
+            self.processed += 1
+
+            return True
+
+        self.skipped += 1
+
+        return False
+
+    def enable(self, guild_id: int):
+        """
+        Mark the feature as in use in a guild.
+
+        Args:
+            guild_id: The guild's ID
+        """
+
+        self.guilds.add(guild_id)
+
+    def disable(self, guild_id: int):
+        """
+        Mark the feature as no longer in use in a guild.
+
+        Args:
+            guild_id: The guild's ID
+        """
+
+        self.guilds.discard(guild_id)
+
+    def reset(self, guild_ids: Iterable[int]):
+        """
+        Replace the guilds in which the feature is in use.
+
+        Args:
+            guild_ids: The guilds' IDs
+        """
+
+        self.guilds = set(guild_ids)
+
+    def track_settings(self, *names: str):
+        """
+        Keep the feature in use in every guild where any of the given guild
+        settings has a value, now and as they change.
+
+        Args:
+            names: The names of the settings
+        """
+
+        def changed(key: str | None):
+            if key is None:
+                self._update_everywhere(names)
+
+                return
+
+            _index_key(key)
+            guild_id = int(key.split("#")[0])
+            index = _indexed()
+
+            if any(guild_id in index.get(n, {}) for n in names):
+                self.enable(guild_id)
+            else:
+                self.disable(guild_id)
+
+        for name in names:
+            watch(name, changed)
+            self._watching.append((name, changed))
+
+        index = _indexed()
+        self._update_everywhere(names)
+        self.reset(
+            guild_id for n in names for guild_id in index.get(n, {}).keys()
+        )
+        log.debug("%s is in use in %d guild(s)", self.name, len(self.guilds))
+
+    def _update_everywhere(self, names: tuple[str, ...]):
+        """
+        Check whether any of the given settings has a default value.
+
+        Args:
+            names: The names of the settings
+        """
+
+        self.everywhere = any(
+            n in settings and settings[n].default is not None for n in names
+        )
+
+    def close(self):
+        """Stop tracking settings."""
+
+        for name, callback in self._watching:
+            unwatch(name, callback)
+
+        self._watching.clear()
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Get the feature's counters.
+
+        Returns:
+            Guilds in use, and events skipped and processed
+        """
+
+        return {
+            "guilds": len(self.guilds),
+            "skipped": self.skipped,
+            "processed": self.processed,
+        }
+
+
+_index: dict[str, dict[int, set[str]]] | None = None
+"""Composite keys where each setting has a value, by setting name and guild"""
+
+
+def _indexed() -> dict[str, dict[int, set[str]]]:
+    """
+    Get the index of setting values, reading every stored value the first
+    time it is needed. The database is shared by every bot and feature in the
+    process, so it is only read once; the index is kept up to date as
+    settings change.
+
+    Returns:
+        The index
+    """
+
+    global _index
+
+    if _index is None:
+        _index = {}
+
+        for key, row in Setting._values.items():
+            _index_row(key, Setting._cache.get(key, row))
+
+        watch("*", _index_key)
+
+    return _index
+
+
+def _index_key(key: str | None):
+    """
+    Update the index with the values stored under a key.
+
+    Args:
+        key: The composite key, or None if a setting was (un)registered
+    """
+
+    if key is None or _index is None:
+        return
+
+    row = Setting._cache.get(key)
+
+    if row is None:
+        row = Setting._values.get(key, {})
+
+    _index_row(key, row)
+
+
+def _index_row(key: str, row: dict):
+    """
+    Update the index with a row of setting values.
+
+    Args:
+        key: The composite key
+        row: The values of every setting stored under the key
+    """
+
+    assert _index is not None
+    guild_id = int(key.split("#")[0])
+
+    for name, value in row.items():
+        guilds = _index.setdefault(name, {})
+
+        if value is not None:
+            guilds.setdefault(guild_id, set()).add(key)
+
+            continue
+
+        keys = guilds.get(guild_id)
+
+        if keys is not None:
+            keys.discard(key)
+
+            if not keys:
+                del guilds[guild_id]
+
+
+_features: dict[int, dict[str, Feature]] = {}
+"""Features, by bot and name"""
+
+
+def feature(bot: Bot, name: str) -> Feature:
+    """
+    Get one of a bot's features, creating it if it doesn't exist yet.
+
+    Args:
+        bot: The bot
+        name: The feature's name
+
+    Returns:
+        The feature
+    """
+
+    features = _features.setdefault(id(bot), {})
+
+    if name not in features:
+        features[name] = Feature(name)
+
+    return features[name]
+
+
+def drop_feature(bot: Bot, name: str):
+    """
+    Forget one of a bot's features, e.g. when its extension is torn down.
+
+    Args:
+        bot: The bot
+        name: The feature's name
+    """
+
+    features = _features.get(id(bot), {})
+    dropped = features.pop(name, None)
+
+    if dropped is not None:
+        dropped.close()
+
+    if not features:
+        _features.pop(id(bot), None)
+
+
+def metrics() -> dict[str, dict[str, int]]:
+    """
+    Get the metrics of every feature. Features of the same name (e.g. one for
+    each bot an extension is loaded into) are combined.
+
+    Returns:
+        Each feature's metrics (see `Feature.metrics`), by name
+    """
+
+    out: dict[str, dict[str, int]] = {}
+
+    for features in _features.values():
+        for name, feat in features.items():
+            totals = out.setdefault(name, {})
+
+            for key, value in feat.metrics().items():
+                totals[key] = totals.get(key, 0) + value
+
+    return out
@@ -2,6 +2,7 @@
 
 from .boolean_filter import BooleanFilter
 from .channel_filter import ChannelFilter
+from .cooldown_filter import CooldownFilter
 from .role_filter import RoleFilter
 from .seconds_filter import SecondsFilter
 from .setting_filter import SettingFilter
@@ -9,6 +10,7 @@ from .setting_filter import SettingFilter
 __all__ = (
     "BooleanFilter",
     "ChannelFilter",
+    "CooldownFilter",
     "RoleFilter",
     "SecondsFilter",
     "SettingFilter",
@@ -0,0 +1,67 @@
+"""Cooldown setting filter"""
+
+# 3rd party
+from discord.ext.commands import Context
+
+# local
+from ..common import get_timespan_chunks, seconds_to_str
+from .setting_filter import SettingFilter
+
+
+class CooldownFilter(SettingFilter):
+    """
+    Filter used for converting strings like `3/60` or `3/1h` (uses per span of
+    time) to cooldown values
+    """
+
+    def __init__(self, setting: str):
+        super().__init__(setting)
+
+    def in_(self, ctx: Context, value: str | None) -> tuple[int, int] | None:
+        """
+        Filter setting input.
+
+        Args:
+            ctx: The current context
+            value: The incoming value
+
+        Returns:
+            The raw setting value (uses, seconds)
+        """
+
+        if not value:
+            return
+
+        uses, _, per = value.partition("/")
+
+        try:
+            seconds = int(per)
+        except ValueError:
+            days, hours, minutes = get_timespan_chunks(per)
+            seconds = minutes * 60 + hours * 3600 + days * 86400
+
+        if int(uses) < 1 or seconds < 1:
+            raise ValueError(f"Invalid cooldown: {value}")
+
+        return (int(uses), seconds)
+
+    def out(
+        self,
+        ctx: Context,
+        value: tuple[int, int] | None,
+    ) -> str | None:
+        """
+        Filter setting output.
+
+        Args:
+            ctx: The current context
+            value: The raw setting value (uses, seconds)
+
+        Returns:
+            The filtered setting value (uses per span of time)
+        """
+
+        if not value:
+            return
+
+        return f"{value[0]} per {seconds_to_str(value[1])}"
@@ -0,0 +1,275 @@
+"""
+Command gating module
+
+Extensions which decide whether commands may be run in a channel (`yeet`,
+`only`, `name_only`) register a gate rather than a bot check of their own.
+The first time a command is run in a channel, every gate registered for the
+bot is asked for its rules there, and they are compiled into a policy which
+is kept in memory. Every later command in the channel is decided against the
+compiled policy, without touching any database, until one of the gates'
+underlying data changes and the extension calls `invalidate`.
+
+```python
+from aethersprite.gating import add_gate, Gate, invalidate, remove_gate
+
+
+def _gate(ctx):
+    return Gate(denied=frozenset(blocked_commands(ctx)))
+
+
+async def setup(bot):
+    add_gate(bot, "thing", _gate)
+
+
+async def teardown(bot):
+    remove_gate(bot, "thing")
+
+
+def on_change(guild_id):
+    invalidate(guild_id)
+```
+"""
+
+# stdlib
+from typing import Callable, NamedTuple
+
+# 3rd party
+from discord.ext.commands import Bot, Context
+
+# local
+from . import log
+
+
+class Gate(NamedTuple):
+    """The rules a gate contributes to a channel's policy"""
+
+    denied: frozenset[str] = frozenset()
+    """Commands which may not be run"""
+
+    allowed: frozenset[str] | None = None
+    """If set, the only commands which may be run"""
+
+    exempt: tuple[str, ...] = ()
+    """Prefixes of command names which are exempt from `allowed`"""
+
+    name_only: bool = False
+    """If commands must mention the bot"""
+
+
+class Policy(object):
+    """A channel's compiled policy"""
+
+    __slots__ = ("denied", "allowed", "exempt", "name_only", "_decisions")
+
+    def __init__(self, gates: list[Gate]):
+        self.denied = frozenset().union(*(g.denied for g in gates))
+        whitelists = [g.allowed for g in gates if g.allowed is not None]
+        self.allowed = (
+            frozenset.intersection(*whitelists) if whitelists else None
+        )
+        self.exempt = tuple(p for g in gates for p in g.exempt)
+        self.name_only = any(g.name_only for g in gates)
+        self._decisions: dict[str, str | None] = {}
+
+    def refuse(self, name: str) -> str | None:
+        """
+        Decide whether a command may be run, regardless of how it was
+        addressed.
+
+        Args:
+            name: The command's name
+
+        Returns:
+            Why the command is refused, or None if it is not
+        """
+
+        try:
+            return self._decisions[name]
+        except KeyError:
+            pass
+
+        reason = None
+
+        if name in self.denied:
+            reason = "yeeted"
+        elif (
+            self.allowed is not None
+            and name not in self.allowed
+            and not name.startswith(self.exempt)
+        ):
+            reason = "non-whitelisted"
+
+        self._decisions[name] = reason
+
+        return reason
+
+
+GateFunc = Callable[[Context], Gate]
+"""Produces a gate's rules for the guild and channel of a context"""
+
+_gates: dict[int, dict[str, GateFunc]] = {}
+"""Registered gates, by bot and name"""
+
+_policies: dict[int, dict[tuple[int, int], Policy]] = {}
+"""Compiled policies, by guild ID, then by bot and channel ID"""
+
+_watchers: list[Callable[[int | None], None]] = []
+"""Functions to call when policies are invalidated"""
+
+
+def _compile(ctx: Context) -> Policy:
+    """
+    Compile the policy for a context's bot, guild, and channel.
+
+    Args:
+        ctx: The context
+
+    Returns:
+        The policy
+    """
+
+    assert ctx.guild
+    gates = []
+
+    for name, func in _gates.get(id(ctx.bot), {}).items():
+        try:
+            gates.append(func(ctx))
+        except Exception:
+            log.exception("Error compiling gate %s", name)
+
+    policy = Policy(gates)
+    _policies.setdefault(ctx.guild.id, {})[(id(ctx.bot), ctx.channel.id)] = (
+        policy
+    )
+    log.debug("Compiled command policy for %s in %s", ctx.channel, ctx.guild)
+
+    return policy
+
+
+async def check_gates(ctx: Context) -> bool:
+    """Check a command against its channel's compiled policy."""
+
+    # can't gate commands via DM, since we need a guild to check settings
+    if ctx.guild is None:
+        return True
+
+    assert ctx.command
+
+    try:
+        policy = _policies[ctx.guild.id][(id(ctx.bot), ctx.channel.id)]
+    except KeyError:
+        policy = _compile(ctx)
+
+    reason = policy.refuse(ctx.command.name)
+
+    if (
+        reason is None
+        and policy.name_only
+        and ctx.interaction is None
+        and not ctx.bot.user.mentioned_in(ctx.message)
+    ):
+        reason = "unaddressed"
+
+    if reason is None:
+        return True
+
+    if reason == "unaddressed":
+        log.warning("%s attempted command without mentioning bot", ctx.author)
+
+        return False
+
+    log.debug(
+        "Suppressing %s command from %s: %s in #%s (%s)",
+        reason,
+        ctx.author,
+        ctx.command.name,
+        ctx.channel,
+        ctx.guild,
+    )
+
+    return False
+
+
+def add_gate(bot: Bot, name: str, func: GateFunc):
+    """
+    Register a gate. The bot's commands are checked against the gates'
+    compiled policies once any gate is registered.
+
+    Args:
+        bot: The bot whose commands the gate applies to
+        name: The gate's name
+        func: Produces the gate's rules for the guild and channel of a context
+    """
+
+    gates = _gates.setdefault(id(bot), {})
+
+    if not gates:
+        bot.add_check(check_gates)
+
+    gates[name] = func
+    invalidate()
+
+
+def remove_gate(bot: Bot, name: str):
+    """
+    Unregister a gate.
+
+    Args:
+        bot: The bot whose commands the gate applies to
+        name: The gate's name
+    """
+
+    gates = _gates.get(id(bot), {})
+    gates.pop(name, None)
+
+    if not gates:
+        bot.remove_check(check_gates)
+        _gates.pop(id(bot), None)
+
+    invalidate()
+
+
+def invalidate(guild_id: int | None = None):
+    """
+    Discard compiled policies, so that they are compiled again when next
+    needed.
+
+    Args:
+        guild_id: The guild whose policies should be discarded, or None for
+            every guild
+    """
+
+    if guild_id is None:
+        _policies.clear()
+    else:
+        _policies.pop(guild_id, None)
+
+    for callback in _watchers:
+        callback(guild_id)
+
+
+def watch(callback: Callable[[int | None], None]):
+    """
+    Call a function whenever policies are invalidated, so that anything
+    derived from them (such as rendered help) can be discarded. The function
+    is passed the ID of the guild whose policies were invalidated, or None
+    for every guild.
+
+    Args:
+        callback: The function to call
+    """
+
+    if callback not in _watchers:
+        _watchers.append(callback)
+
+
+def invalidate_key(key: str | None):
+    """
+    Discard compiled policies when a setting they depend on changes. This
+    may be passed to `aethersprite.settings.watch`.
+
+    Args:
+        key: The setting's composite key, or None for every guild
+    """
+
+    invalidate(None if key is None else int(key.split("#")[0]))
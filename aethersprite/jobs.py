@@ -0,0 +1,353 @@
+"""
+Startup job module
+
+Work which reconciles persisted state with Discord (cleaning up deleted
+posts, expiring old records, re-arming timers) is registered as a job rather
+than being done in an `on_ready` listener. Each bot's jobs are run once per
+process, when the bot is first ready, rather than after every reconnect.
+
+Jobs run concurrently, but calls they make to the Discord API share a budget
+(`bot.job_api_budget` in the configuration), which is granted to jobs in
+order of priority (lower numbers first). Critical jobs start right away;
+the rest are deferred until the critical jobs have finished and the bot has
+been serving commands for a while (`bot.job_defer` seconds).
+
+```python
+from aethersprite.jobs import add_job, Job, remove_job
+
+
+async def _cleanup(job: Job):
+    async def check(item):
+        async with job.api():
+            await ...
+
+    await job.map(check, items)
+
+
+async def setup(bot):
+    add_job(bot, "thing.cleanup", _cleanup, concurrency=4)
+
+
+async def teardown(bot):
+    remove_job(bot, "thing.cleanup")
+```
+"""
+
+# stdlib
+import asyncio as aio
+from contextlib import asynccontextmanager
+from heapq import heappop, heappush
+from itertools import count
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Iterable
+
+# 3rd party
+from discord.ext.commands import Bot
+
+# local
+from . import config, log
+
+
+class _Budget(object):
+    """A semaphore which wakes its waiters in order of priority"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._waiters: list[tuple[int, int, aio.Future]] = []
+        self._seq = count()
+
+    async def acquire(self, priority: int):
+        if self.used < self.limit and not self._waiters:
+            self.used += 1
+
+            return
+
+        fut = aio.get_running_loop().create_future()
+        heappush(self._waiters, (priority, next(self._seq), fut))
+
+        try:
+            await fut
+        except aio.CancelledError:
+            # it may have been handed over just before being cancelled
+            if fut.done() and not fut.cancelled():
+                self.release()
+
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, fut = heappop(self._waiters)
+
+            if not fut.done():
+                # hand the slot straight over
+                fut.set_result(None)
+
+                return
+
+        self.used -= 1
+
+
+class Job(object):
+    """A reconciliation job"""
+
+    def __init__(
+        self,
+        bot: Bot,
+        name: str,
+        func: Callable[["Job"], Awaitable[Any]],
+        priority: int,
+        concurrency: int,
+        critical: bool,
+        budget: _Budget,
+    ):
+        self.bot = bot
+        """The bot the job belongs to"""
+
+        self.name = name
+        """The job's name"""
+
+        self.func = func
+        """The job's coroutine function, which is passed the job"""
+
+        self.priority = priority
+        """The job's priority; lower numbers are run first"""
+
+        self.concurrency = concurrency
+        """How many items `map` works on at once"""
+
+        self.critical = critical
+        """If the job must not be deferred"""
+
+        self.state = "pending"
+        """One of pending, running, finished, failed, or cancelled"""
+
+        self.done = 0
+        """Items processed so far"""
+
+        self.total = 0
+        """Items to process"""
+
+        self.failed = 0
+        """Items which raised an exception"""
+
+        self.task: aio.Task | None = None
+        self._budget = budget
+
+    @asynccontextmanager
+    async def api(self):
+        """Wait for (and hold) a share of the bot's API budget."""
+
+        await self._budget.acquire(self.priority)
+
+        try:
+            yield
+        finally:
+            self._budget.release()
+
+    async def map(
+        self, func: Callable[[Any], Awaitable[Any]], items: Iterable[Any]
+    ):
+        """
+        Run a coroutine function for each item, `concurrency` at a time.
+        Exceptions are logged and counted, and do not stop the job.
+
+        Args:
+            func: The coroutine function to run
+            items: The items to run it for
+        """
+
+        items = list(items)
+        self.total += len(items)
+        step = max(1, self.total // 4)
+        queue = iter(items)
+
+        async def worker():
+            for item in queue:
+                try:
+                    await func(item)
+                except Exception:
+                    self.failed += 1
+                    log.exception("Error in job %s for %r", self.name, item)
+
+                self.done += 1
+
+                if self.total >= 8 and self.done % step == 0:
+                    log.info("Job %s: %s/%s", self.name, self.done, self.total)
+
+        await aio.gather(
+            *(worker() for _ in range(min(self.concurrency, len(items))))
+        )
+
+
+class _Scheduler(object):
+    """Runs a bot's jobs"""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self.jobs: dict[str, Job] = {}
+        self.budget = _Budget(config["bot"].get("job_api_budget", 4))
+        self.started = False
+        self.critical_done = aio.Event()
+
+    def add(self, job: Job):
+        old = self.jobs.pop(job.name, None)
+
+        if old is not None and old.task is not None:
+            old.task.cancel()
+
+        self.jobs[job.name] = job
+
+        if self.started:
+            self._spawn(job)
+
+    async def on_ready(self):
+        if self.started:
+            return
+
+        self.started = True
+
+        for job in sorted(self.jobs.values(), key=lambda j: j.priority):
+            self._spawn(job)
+
+        self._check_critical()
+
+    def _spawn(self, job: Job):
+        job.task = aio.create_task(self._run(job))
+
+    def _check_critical(self):
+        if all(
+            j.state not in ("pending", "running")
+            for j in self.jobs.values()
+            if j.critical
+        ):
+            self.critical_done.set()
+
+    async def _run(self, job: Job):
+        if not job.critical:
+            await self.critical_done.wait()
+            await aio.sleep(config["bot"].get("job_defer", 10))
+
+        job.state = "running"
+        start = perf_counter()
+
+        try:
+            await job.func(job)
+            job.state = "finished"
+        except aio.CancelledError:
+            job.state = "cancelled"
+
+            raise
+        except Exception:
+            job.state = "failed"
+            log.exception("Job %s failed", job.name)
+        finally:
+            if job.critical:
+                self._check_critical()
+
+        log.info(
+            "Job %s %s in %.2fs (%s item(s), %s failed)",
+            job.name,
+            job.state,
+            perf_counter() - start,
+            job.done,
+            job.failed,
+        )
+
+
+_schedulers: dict[int, _Scheduler] = {}
+"""Job schedulers, by bot"""
+
+
+def _scheduler(bot: Bot) -> _Scheduler:
+    """
+    Get a bot's job scheduler, creating it if necessary.
+
+    Args:
+        bot: The bot
+
+    Returns:
+        The scheduler
+    """
+
+    sched = _schedulers.get(id(bot))
+
+    if sched is None:
+        sched = _schedulers[id(bot)] = _Scheduler(bot)
+        bot.add_listener(sched.on_ready, "on_ready")
+
+    return sched
+
+
+def add_job(
+    bot: Bot,
+    name: str,
+    func: Callable[[Job], Awaitable[Any]],
+    priority: int = 50,
+    concurrency: int = 1,
+    critical: bool = False,
+) -> Job:
+    """
+    Register a job to run once the bot is ready. If it is already ready, the
+    job is started now. A job which replaces one of the same name (e.g. when
+    an extension is reloaded) is run again.
+
+    Args:
+        bot: The bot the job belongs to
+        name: The job's name
+        func: The job's coroutine function, which is passed the job
+        priority: The job's priority; lower numbers are run first
+        concurrency: How many items `Job.map` works on at once
+        critical: Run the job right away rather than deferring it
+
+    Returns:
+        The job
+    """
+
+    sched = _scheduler(bot)
+    job = Job(bot, name, func, priority, concurrency, critical, sched.budget)
+    sched.add(job)
+
+    return job
+
+
+def remove_job(bot: Bot, name: str):
+    """
+    Unregister a job, cancelling it if it is running.
+
+    Args:
+        bot: The bot the job belongs to
+        name: The job's name
+    """
+
+    sched = _schedulers.get(id(bot))
+
+    if sched is None:
+        return
+
+    job = sched.jobs.pop(name, None)
+
+    if job is not None and job.task is not None:
+        job.task.cancel()
+
+
+def status(bot: Bot) -> dict[str, tuple[str, int, int]]:
+    """
+    Get the progress of a bot's jobs.
+
+    Args:
+        bot: The bot
+
+    Returns:
+        A mapping of job names to (state, items done, items total)
+    """
+
+    sched = _schedulers.get(id(bot))
+
+    if sched is None:
+        return {}
+
+    return {
+        name: (job.state, job.done, job.total)
+        for name, job in sched.jobs.items()
+    }
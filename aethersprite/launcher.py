@@ -0,0 +1,240 @@
+"""
+Sharded launcher module
+
+Runs the bot as several worker processes, each of which connects a subset of
+the bot's shards using an `AutoShardedBot`. The supervising process restarts
+any worker which crashes (backing off if it keeps crashing), forwards
+`SIGHUP` to the workers so they reload their configuration, and stops them
+all when it is interrupted or terminated.
+
+```shell
+python -m aethersprite --workers 4 --shards 16
+```
+
+Workers share the data folder. Since every guild belongs to exactly one
+shard, guild data is only ever read and written by a single process; the
+databases are opened in write-ahead logging mode so that the processes do
+not block each other (see `aethersprite.storage`).
+"""
+
+# stdlib
+from os import environ
+import signal
+from subprocess import Popen, TimeoutExpired
+import sys
+from time import monotonic, sleep
+
+# local
+from . import SHARD_COUNT_ENV, SHARD_IDS_ENV, log
+
+MAX_BACKOFF = 60
+"""Maximum seconds to wait before restarting a crashed worker"""
+
+STAGGER = 5
+"""Seconds between initial worker starts, to spread out gateway logins"""
+
+
+def split_shards(shard_count: int, workers: int) -> list[list[int]]:
+    """
+    Split shard IDs into contiguous groups, one per worker.
+
+    Args:
+        shard_count: The total number of shards
+        workers: The number of worker processes
+
+    Returns:
+        The shard IDs for each worker
+    """
+
+    if workers < 1 or workers > shard_count:
+        raise ValueError("Need at least one shard per worker")
+
+    per, extra = divmod(shard_count, workers)
+    groups = []
+    start = 0
+
+    for i in range(workers):
+        size = per + (1 if i < extra else 0)
+        groups.append(list(range(start, start + size)))
+        start += size
+
+    return groups
+
+
+class Worker(object):
+    """A worker process running a subset of shards"""
+
+    def __init__(self, shard_ids: list[int], shard_count: int, args: list[str]):
+        self.shard_ids = shard_ids
+        """The shards this worker runs"""
+
+        self.shard_count = shard_count
+        """The total number of shards"""
+
+        self.args = args
+        """Command line arguments to pass along"""
+
+        self.process: Popen | None = None
+        """The running process"""
+
+        self.failures = 0
+        """Consecutive crashes"""
+
+        self.started = 0.0
+        """When the process was last started"""
+
+        self.restart_at: float | None = None
+        """When to restart the process after a crash"""
+
+    @property
+    def name(self) -> str:
+        """Name for logging."""
+
+        return f"worker for shards {','.join(map(str, self.shard_ids))}"
+
+    def start(self):
+        """Start the worker process."""
+
+        env = {
+            **environ,
+            SHARD_IDS_ENV: ",".join(map(str, self.shard_ids)),
+            SHARD_COUNT_ENV: str(self.shard_count),
+        }
+        self.process = Popen(
+            [sys.executable, "-m", "aethersprite", *self.args], env=env
+        )
+        self.started = monotonic()
+        self.restart_at = None
+        log.info("Started %s (pid %s)", self.name, self.process.pid)
+
+    def check(self) -> bool:
+        """
+        Check on the worker process, restarting it if it has crashed and its
+        backoff has elapsed.
+
+        Returns:
+            Whether the worker is still running (or will be restarted)
+        """
+
+        now = monotonic()
+
+        if self.restart_at is not None:
+            if now >= self.restart_at:
+                self.start()
+
+            return True
+
+        assert self.process
+        code = self.process.poll()
+
+        if code is None:
+            return True
+
+        if code == 0:
+            log.info("%s exited", self.name)
+
+            return False
+
+        # a worker which ran for a while before crashing starts over
+        if now - self.started > MAX_BACKOFF:
+            self.failures = 0
+
+        self.failures += 1
+        backoff = min(MAX_BACKOFF, 2 ** (self.failures - 1))
+        self.restart_at = now + backoff
+        log.error(
+            "%s crashed with exit code %s; restarting in %ss",
+            self.name,
+            code,
+            backoff,
+        )
+
+        return True
+
+    def signal(self, signum: int):
+        """
+        Send a signal to the worker process, if it is running.
+
+        Args:
+            signum: The signal to send
+        """
+
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signum)
+
+    def stop(self, timeout: float = 10):
+        """
+        Stop the worker process, killing it if it does not exit in time.
+
+        Args:
+            timeout: Seconds to wait for the process to exit
+        """
+
+        if self.process is None or self.process.poll() is not None:
+            return
+
+        self.process.terminate()
+
+        try:
+            self.process.wait(timeout)
+        except TimeoutExpired:
+            log.warning("Killing %s", self.name)
+            self.process.kill()
+            self.process.wait()
+
+
+def supervise(workers: int, shard_count: int | None, args: list[str]):
+    """
+    Run and supervise sharded worker processes until interrupted, or until
+    all of them have exited cleanly.
+
+    Args:
+        workers: The number of worker processes
+        shard_count: The total number of shards; defaults to one per worker
+        args: Command line arguments to pass along to each worker
+    """
+
+    shard_count = shard_count or workers
+    procs = [
+        Worker(ids, shard_count, args)
+        for ids in split_shards(shard_count, workers)
+    ]
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+
+        stopping = True
+
+    def forward(signum, _):
+        for proc in procs:
+            proc.signal(signum)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, forward)
+
+    log.info("Launching %s worker(s) for %s shard(s)", workers, shard_count)
+
+    for i, proc in enumerate(procs):
+        if stopping:
+            break
+
+        if i > 0:
+            sleep(STAGGER)
+
+        proc.start()
+
+    while not stopping:
+        sleep(1)
+        running = [proc.check() for proc in procs]
+
+        if not any(running):
+            break
+
+    for proc in procs:
+        proc.stop()
+
+    log.info("All workers stopped")
@@ -0,0 +1,186 @@
+"""
+Command limits module
+
+Expensive commands can be limited per guild, so that one guild's spam can't
+eat the rate limit every other guild shares. Limiting a command registers two
+settings, which can be changed with the `set` command like any other:
+
+- `<command>.cooldown`: how many times the command may be used in a span of
+  time (e.g. `3/60` or `3/1h`)
+- `<command>.concurrency`: how many of the command's invocations may run at
+  once
+
+Limits are enforced in memory, before the command is invoked (and after its
+checks have passed). When a limit is reached, the bot replies saying so.
+
+```python
+from aethersprite.limits import limit, unlimit
+
+
+async def setup(bot):
+    limit("thing", concurrency=1)
+
+
+async def teardown(bot):
+    unlimit("thing")
+```
+"""
+
+# stdlib
+from collections import deque
+from time import monotonic
+
+# 3rd party
+from discord.ext.commands import Bot, CheckFailure, Context
+
+# local
+from .common import seconds_to_str
+from .filters import CooldownFilter
+from .settings import register, settings, unregister
+
+
+class LimitReached(CheckFailure):
+    """Raised when a command is refused because of a limit"""
+
+
+_limited: set[str] = set()
+"""Names of the commands which are limited"""
+
+_uses: dict[tuple[int, str], deque[float]] = {}
+"""Recent uses of each command, by guild ID and command name"""
+
+_running: dict[tuple[int, str], int] = {}
+"""Running invocations of each command, by guild ID and command name"""
+
+_held: dict[int, tuple[int, str]] = {}
+"""Concurrency slots held by running invocations, by context"""
+
+
+def _positive(value) -> bool:
+    return str(value).isdigit() and int(value) > 0
+
+
+def limit(
+    name: str,
+    cooldown: tuple[int, int] | None = None,
+    concurrency: int | None = None,
+):
+    """
+    Limit a command, registering its limit settings.
+
+    Args:
+        name: The command's name
+        cooldown: The default cooldown (uses, seconds), if any
+        concurrency: The default maximum concurrent invocations, if any
+    """
+
+    register(
+        f"{name}.cooldown",
+        cooldown,
+        lambda _: True,
+        False,
+        f"How often `{name}` may be used, e.g. `3/60` or `3/1h` for three "
+        "times a minute or an hour. Defaults to no limit.",
+        filter=CooldownFilter(f"{name}.cooldown"),
+    )
+    register(
+        f"{name}.concurrency",
+        concurrency,
+        _positive,
+        False,
+        f"How many invocations of `{name}` may run at once. Defaults to no "
+        "limit.",
+    )
+    _limited.add(name)
+
+
+def unlimit(name: str):
+    """
+    Unregister a command's limit settings.
+
+    Args:
+        name: The command's name
+    """
+
+    unregister(f"{name}.cooldown")
+    unregister(f"{name}.concurrency")
+
+    if f"{name}.cooldown" not in settings:
+        _limited.discard(name)
+
+
+async def before_invoke(ctx: Context):
+    """Enforce the command's limits, if it has any."""
+
+    assert ctx.command
+    name = ctx.command.qualified_name
+
+    # stand-ins for lazily loaded commands invoke the real command, which
+    # is limited in their place
+    if (
+        ctx.guild is None
+        or name not in _limited
+        or ctx.command.extras.get("lazy")
+    ):
+        return
+
+    key = (ctx.guild.id, name)
+    concurrency = settings[f"{name}.concurrency"].get(ctx)
+    running = _running.get(key, 0)
+
+    if concurrency is not None and running >= int(concurrency):
+        raise LimitReached(
+            f":hourglass: **{name}** is already running; try again once it "
+            "has finished."
+        )
+
+    cooldown = settings[f"{name}.cooldown"].get(ctx, raw=True)
+
+    if cooldown is not None:
+        uses, per = cooldown
+        now = monotonic()
+        window = _uses.setdefault(key, deque())
+
+        while window and window[0] <= now - per:
+            window.popleft()
+
+        if len(window) >= uses:
+            wait = seconds_to_str(window[0] + per - now)
+
+            raise LimitReached(
+                f":hourglass: **{name}** is cooling down; try again in {wait}."
+            )
+
+        window.append(now)
+
+    if concurrency is not None:
+        _running[key] = running + 1
+        _held[id(ctx)] = key
+
+
+async def after_invoke(ctx: Context):
+    """Release the concurrency slot held by the command, if any."""
+
+    key = _held.pop(id(ctx), None)
+
+    if key is None:
+        return
+
+    running = _running[key] - 1
+
+    if running:
+        _running[key] = running
+    else:
+        del _running[key]
+
+
+def install(bot: Bot):
+    """
+    Enforce command limits for a bot.
+
+    Args:
+        bot: The bot
+    """
+
+    bot.before_invoke(before_invoke)
+    bot.after_invoke(after_invoke)
@@ -0,0 +1,513 @@
+"""
+Extension loader module
+
+Extensions are loaded according to their declared dependencies. Any extension
+module may provide a `DEPENDENCIES` sequence naming the extensions which must
+be set up before it. Names which begin with a `.` are resolved relative to the
+extension's own package, and meta extensions (those with `META_EXTENSION`)
+are expanded to all of their children.
+
+```python
+# my_pack/extensions/thing.py
+DEPENDENCIES = (
+    "aethersprite.extensions.base.alias",
+    ".other_thing",
+)
+
+
+async def setup(bot):
+    ...
+```
+
+Extensions may also provide an `INTENTS` sequence naming the gateway intents
+(attributes of `discord.Intents`) which their listeners rely upon. The bot
+only requests the intents that its loaded extensions need.
+
+```python
+INTENTS = ("members",)
+```
+
+Extensions which do not depend on each other have their `setup` coroutines
+run concurrently, and the time spent loading each extension is logged once
+they have all finished.
+
+When lazy loading is enabled (`bot.lazy_extensions` in the configuration),
+meta extensions may provide a `_lazy` manifest describing the commands and
+events of their children. Those children are not imported at startup; stubs
+are registered in their place, and the first invocation of one of their
+commands (or the first dispatch of one of their events) loads the extension
+and hands off to it. Extensions which handle reactions through
+`aethersprite.reactions` declare their handler's name and a function
+returning the IDs of the messages it owns; only reactions to those messages
+load the extension. Checks which guard a command (e.g. `require_admin`) are
+declared under `checks`, so that only those allowed to use the command can
+load the extension. Commands limited with `aethersprite.limits.limit` (with
+its default limits) are declared under `limits`, so that their limit settings
+exist before the extension is loaded. Extensions which register other
+settings or global checks must not be listed in the manifest, since those
+need to exist before any command is invoked.
+
+```python
+# my_pack/extensions/_all.py
+META_EXTENSION = True
+
+_mods = ("thing",)
+
+_lazy = {
+    "thing": {
+        "commands": {"thing": "Do the thing"},
+        "events": ("on_member_join",),
+        "reactions": ("thing", lambda: open_db("thing.sqlite3", "posts")),
+        "checks": {"thing": (channel_only,)},
+        "limits": ("thing",),
+        "intents": ("guild_reactions", "members"),
+    },
+}
+```
+
+Extensions may be reloaded in place (see the `ext.reload` command). To keep
+live state which is not persisted (pending timers, caches) across a reload,
+an extension can `stash` it during `teardown` and `claim` it during `setup`:
+
+```python
+async def setup(bot):
+    state = claim(bot, __name__)
+
+    if state is not None:
+        ...
+
+
+async def teardown(bot):
+    stash(bot, __name__, {...})
+```
+
+Extension modules are executed once for each bot they are loaded into, so
+their globals are not shared between bots. State which is derived from a
+shared database (e.g. an index) can be kept with `shared` instead, so that it
+is only built once per process, and outlives reloads:
+
+```python
+index = shared(f"{__name__}.index", lambda: build_index(things))
+```
+"""
+
+# stdlib
+import asyncio as aio
+from collections import defaultdict
+from importlib import import_module
+from importlib.util import resolve_name
+from time import perf_counter
+from typing import Any, Callable
+
+# 3rd party
+from discord import Intents
+from discord.ext.commands import Bot, Command, Context
+
+# local
+from . import log
+from .profiler import profiler
+
+_stashed: dict[tuple[int, str], Any] = {}
+"""State handed from an extension's teardown to its next setup"""
+
+
+def stash(bot: Bot, name: str, state: Any):
+    """
+    Keep an extension's live state for it to claim once it is set up again.
+
+    Args:
+        bot: The bot the extension is loaded into
+        name: The name of the extension module
+        state: The state to keep
+    """
+
+    _stashed[(id(bot), name)] = state
+
+
+def claim(bot: Bot, name: str) -> Any | None:
+    """
+    Take the state an extension stashed when it was last torn down.
+
+    Args:
+        bot: The bot the extension is being loaded into
+        name: The name of the extension module
+
+    Returns:
+        The stashed state, or None if there is none
+    """
+
+    return _stashed.pop((id(bot), name), None)
+
+
+_shared: dict[str, Any] = {}
+"""State shared by every bot in the process, by name"""
+
+
+def shared(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Get state which is shared by every bot an extension is loaded into,
+    creating it if it doesn't exist yet.
+
+    Args:
+        name: The name of the state, e.g. prefixed with the module's name
+        factory: Creates the state
+
+    Returns:
+        The state
+    """
+
+    if name not in _shared:
+        _shared[name] = factory()
+
+    return _shared[name]
+
+
+def _resolve(
+    ext: str,
+    package: str | None,
+    graph: dict[str, set[str]],
+    lazy: dict[str, dict] | None = None,
+) -> list[str]:
+    """
+    Resolve an extension to the names of the modules which must be loaded,
+    populating the dependency graph along the way.
+
+    Args:
+        ext: The extension to resolve
+        package: The package to resolve relative names against
+        graph: The dependency graph to populate
+        lazy: If provided, manifests of children which may be deferred
+
+    Returns:
+        The names of the resolved modules
+    """
+
+    mod = import_module(ext, package)
+
+    if hasattr(mod, "META_EXTENSION") and mod.META_EXTENSION:
+        manifests = getattr(mod, "_lazy", {}) if lazy is not None else {}
+        names = []
+
+        for child in mod._mods:
+            if child in manifests:
+                assert lazy is not None
+                lazy[resolve_name(f"..{child}", mod.__name__)] = manifests[
+                    child
+                ]
+
+                continue
+
+            names += _resolve(f"..{child}", mod.__name__, graph, lazy)
+
+        return names
+
+    if not hasattr(mod, "setup"):
+        return []
+
+    name = mod.__name__
+
+    if name not in graph:
+        # placeholder, so that circular references terminate
+        graph[name] = set()
+        deps = set()
+
+        for dep in getattr(mod, "DEPENDENCIES", ()):
+            deps.update(_resolve(dep, mod.__package__, graph))
+
+        graph[name] = deps
+
+    return [name]
+
+
+def _check_cycles(graph: dict[str, set[str]]):
+    """
+    Raise an error if the dependency graph contains a cycle.
+
+    Args:
+        graph: The dependency graph to check
+    """
+
+    done: set[str] = set()
+
+    def visit(name: str, path: tuple[str, ...]):
+        if name in path:
+            cycle = " -> ".join(path[path.index(name) :] + (name,))
+
+            raise ValueError(f"Circular extension dependency: {cycle}")
+
+        if name in done:
+            return
+
+        for dep in graph[name]:
+            visit(dep, path + (name,))
+
+        done.add(name)
+
+    for name in graph:
+        visit(name, ())
+
+
+def resolve(
+    extensions: list[str], lazy: dict[str, dict] | None = None
+) -> dict[str, set[str]]:
+    """
+    Build the dependency graph for the given extensions.
+
+    Args:
+        extensions: The extensions to resolve
+        lazy: If provided, will be populated with the manifests of extensions
+            which may be deferred
+
+    Returns:
+        A mapping of module names to the module names they depend on
+    """
+
+    graph: dict[str, set[str]] = {}
+
+    for ext in extensions:
+        _resolve(ext, None, graph, lazy)
+
+    _check_cycles(graph)
+
+    if lazy is not None:
+        # anything another extension depends on must be loaded up front
+        for name in graph:
+            lazy.pop(name, None)
+
+    return graph
+
+
+def required_intents(
+    extensions: list[str], lazy: bool = False
+) -> dict[str, list[str]]:
+    """
+    Find the gateway intents which the given extensions need.
+
+    Args:
+        extensions: The extensions to check
+        lazy: Read the intents of deferred extensions from their manifests
+            rather than importing them
+
+    Returns:
+        A mapping of intent names to the extensions which need them
+    """
+
+    manifests: dict[str, dict] | None = {} if lazy else None
+    needs: defaultdict[str, list[str]] = defaultdict(list)
+    declared = [
+        (name, getattr(import_module(name), "INTENTS", ()))
+        for name in resolve(extensions, manifests)
+    ] + [(name, m.get("intents", ())) for name, m in (manifests or {}).items()]
+
+    for name, flags in declared:
+        for flag in flags:
+            if flag not in Intents.VALID_FLAGS:
+                raise ValueError(f"Unknown intent in {name}: {flag}")
+
+            needs[flag].append(name)
+
+    return dict(needs)
+
+
+def _add_stubs(bot: Bot, name: str, manifest: dict):
+    """
+    Register stand-in commands and listeners for a deferred extension.
+
+    Args:
+        bot: The bot to register the stubs with
+        name: The name of the extension module
+        manifest: The extension's manifest
+    """
+
+    stubs: list[Command] = []
+    listeners: list[tuple] = []
+    task: aio.Task | None = None
+
+    def add_commands():
+        for cmd in stubs:
+            if bot.get_command(cmd.name) is None:
+                bot.add_command(cmd)
+
+    def add_reactions():
+        if "reactions" not in manifest:
+            return
+
+        from .reactions import add_handler, track
+
+        handler, owned = manifest["reactions"]
+        # the extension's own handler replaces these once it is set up
+        add_handler(bot, handler, make_reaction(True), make_reaction(False))
+
+        for message_id in owned():
+            track(bot, handler, message_id)
+
+    async def replace():
+        # commands must be out of the way before the real ones are added
+        for cmd in stubs:
+            if bot.get_command(cmd.name) is cmd:
+                bot.remove_command(cmd.name)
+
+        try:
+            await load_extensions(bot, [name])
+        except Exception:
+            # keep the extension available to try again; a failed setup
+            # tears down the reaction handler it took over
+            add_commands()
+
+            if "reactions" in manifest:
+                from .reactions import get_handler
+
+                if get_handler(bot, manifest["reactions"][0]) is None:
+                    add_reactions()
+
+            raise
+
+        # listeners stay in place until now so no events are dropped
+        for listener, event in listeners:
+            bot.remove_listener(listener, event)
+
+        if "limits" in manifest:
+            from .limits import unlimit
+
+            # the extension registered its own limits during setup
+            for cmd_name in manifest["limits"]:
+                unlimit(cmd_name)
+
+    async def load():
+        nonlocal task
+
+        if task is None or (task.done() and task.exception() is not None):
+            task = aio.create_task(replace())
+
+        await aio.shield(task)
+
+    def make_command(cmd_name: str, brief: str | None, checks: tuple):
+        async def stub(ctx: Context):
+            await load()
+
+            # invoke the real command in the stub's place, keeping the
+            # invocation (e.g. an alias) as it was resolved
+            ctx.command = bot.get_command(cmd_name)
+            await bot.invoke(ctx)
+
+        # only those allowed to use the command may load the extension
+        return Command(
+            stub,
+            name=cmd_name,
+            brief=brief,
+            help=brief,
+            checks=list(checks),
+            extras={"lazy": True},
+        )
+
+    def make_listener(event: str):
+        async def stub(*args, **kwargs):
+            await load()
+
+            # hand the triggering event to the extension's own listeners
+            for listener in bot.extra_events.get(event, []):
+                if listener.__module__ == name:
+                    await listener(*args, **kwargs)
+
+        return stub
+
+    def make_reaction(added: bool):
+        async def stub(payload):
+            from .reactions import get_handler
+
+            await load()
+
+            # the extension's setup took over the handler; hand it the
+            # triggering reaction
+            real = get_handler(bot, manifest["reactions"][0], added)
+
+            if real is not None and real is not stub:
+                await real(payload)
+
+        return stub
+
+    checks = manifest.get("checks", {})
+
+    for cmd_name, brief in manifest.get("commands", {}).items():
+        stubs.append(make_command(cmd_name, brief, checks.get(cmd_name, ())))
+
+    add_commands()
+
+    for event in manifest.get("events", ()):
+        listener = make_listener(event)
+        listeners.append((listener, event))
+        bot.add_listener(listener, event)
+
+    add_reactions()
+
+    if "limits" in manifest:
+        from .limits import limit
+
+        # register the limit settings, so they can be set before first use
+        for cmd_name in manifest["limits"]:
+            limit(cmd_name)
+
+    log.info("Bot extension deferred: %s", name)
+
+
+async def load_extensions(
+    bot: Bot, extensions: list[str], lazy: bool = False
+) -> dict[str, float]:
+    """
+    Load the given extensions (and their dependencies) into the bot. Modules
+    which have already been loaded are skipped.
+
+    Args:
+        bot: The bot to load the extensions into
+        extensions: The extensions to load
+        lazy: Register stubs for extensions which provide a manifest rather
+            than loading them immediately
+
+    Returns:
+        A mapping of module names to the number of seconds spent loading them
+    """
+
+    manifests: dict[str, dict] | None = {} if lazy else None
+
+    with profiler.phase("resolve"):
+        graph = resolve(extensions, manifests)
+
+    tasks: dict[str, aio.Task] = {}
+    timings: dict[str, float] = {}
+
+    async def load(name: str):
+        if graph[name]:
+            await aio.gather(*(tasks[dep] for dep in graph[name]))
+
+        if name in bot.extensions:
+            return
+
+        log.info("Bot extension setup: %s", name)
+        start = perf_counter()
+
+        with profiler.phase(name):
+            await bot.load_extension(name)
+
+        timings[name] = perf_counter() - start
+
+    start = perf_counter()
+
+    for name in graph:
+        tasks[name] = aio.create_task(load(name))
+
+    await aio.gather(*tasks.values())
+    elapsed = perf_counter() - start
+
+    if timings:
+        log.info("Loaded %s extension(s) in %.3fs", len(timings), elapsed)
+
+        for name, secs in sorted(
+            timings.items(), key=lambda x: x[1], reverse=True
+        ):
+            log.info("%9.2fms %s", secs * 1000, name)
+
+    for name, manifest in (manifests or {}).items():
+        if name not in bot.extensions:
+            _add_stubs(bot, name, manifest)
+
+    return timings
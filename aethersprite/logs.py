@@ -0,0 +1,222 @@
+"""
+Logging module
+
+Log records are put on a queue by whichever thread emits them, and a
+background thread formats and writes them out. Emitting a record therefore
+never blocks the event loop on a slow terminal, pipe, or log collector.
+
+Output is either colored text (the default) or one JSON object per line, as
+chosen by `bot.log_format` in the configuration. Noisy call sites can be rate
+sampled with the `[bot.log_sample]` table, which maps either a module name or
+a `module:function` pair (as they appear in the log output) to the fraction
+of its records to keep:
+
+```toml
+[bot.log_sample]
+"poll:_update_poll" = 0.1
+"roles" = 0.5
+```
+
+Only records below the `WARNING` level are sampled.
+"""
+
+# stdlib
+import atexit
+from copy import copy
+from datetime import datetime, timezone
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+# 3rd party
+import colorlog
+
+FORMATS = ("color", "json")
+"""Supported log output formats"""
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single line of JSON"""
+
+    def __init__(self, fields: dict | None = None):
+        """
+        Args:
+            fields: Static fields to include in every record
+        """
+
+        super().__init__()
+        self.fields = fields or {}
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "module": record.module,
+            "function": record.funcName,
+            "message": record.getMessage(),
+            **self.fields,
+        }
+
+        if record.exc_info:
+            out["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(out, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Keeps a fixed fraction of the records from selected call sites"""
+
+    def __init__(self, rates: dict[str, float] | None = None):
+        """
+        Args:
+            rates: Fractions of records to keep, keyed by module name or by
+                `module:function`
+        """
+
+        super().__init__()
+        self.rates: dict[str, float] = {}
+        self._credit: dict[str, float] = {}
+        self.configure(rates or {})
+
+    def configure(self, rates: dict[str, float]):
+        """
+        Replace the sampling rates.
+
+        Args:
+            rates: Fractions of records to keep, keyed by module name or by
+                `module:function`
+        """
+
+        for key, rate in rates.items():
+            if not 0 <= rate <= 1:
+                raise ValueError(f"Invalid log sample rate for {key}: {rate}")
+
+        self.rates = dict(rates)
+        self._credit = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rates or record.levelno >= logging.WARNING:
+            return True
+
+        key = f"{record.module}:{record.funcName}"
+
+        if key not in self.rates:
+            key = record.module
+
+            if key not in self.rates:
+                return True
+
+        # accumulate credit rather than rolling dice, so that the rate is
+        # exact over any window and the output is predictable
+        credit = self._credit.get(key, 0.0) + self.rates[key]
+
+        if credit < 1:
+            self._credit[key] = credit
+
+            return False
+
+        self._credit[key] = credit - 1
+
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """Enqueues records, leaving everything but the message to the listener"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # arguments may be mutated after the call returns, so the message is
+        # merged now; tracebacks are still formatted on the listener's thread
+        record = copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+
+def make_formatter(fmt: str, shard_tag: str = "") -> logging.Formatter:
+    """
+    Create a formatter for log output.
+
+    Args:
+        fmt: The output format; one of `FORMATS`
+        shard_tag: Text identifying the shards run by this process, if any
+
+    Returns:
+        The formatter
+    """
+
+    if fmt == "json":
+        return JsonFormatter({"shards": shard_tag} if shard_tag else None)
+
+    if fmt != "color":
+        raise ValueError(f"Unknown log format: {fmt}")
+
+    tag = f"[shards {shard_tag}] " if shard_tag else ""
+
+    return colorlog.ColoredFormatter(
+        "{asctime} {log_color}{levelname:<7}{reset} "
+        + tag
+        + "{bold_white}{module}:{funcName}{reset} "
+        + "{cyan}\u00bb{reset} {message}",
+        style="{",
+    )
+
+
+class LogPipeline(object):
+    """Queued log output for a logger"""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        fmt: str = "color",
+        sample: dict[str, float] | None = None,
+        shard_tag: str = "",
+    ):
+        """
+        Args:
+            logger: The logger to attach to
+            fmt: The output format; one of `FORMATS`
+            sample: Sampling rates; see `SampleFilter`
+            shard_tag: Text identifying the shards run by this process, if any
+        """
+
+        self.shard_tag = shard_tag
+        self.output = logging.StreamHandler()
+        """The handler which writes records out, on the listener's thread"""
+
+        self.output.setFormatter(make_formatter(fmt, shard_tag))
+        self.sampler = SampleFilter(sample)
+        """The sampling filter"""
+
+        queue: SimpleQueue = SimpleQueue()
+        self.handler = _QueueHandler(queue)
+        """The handler which enqueues records, on the emitting thread"""
+
+        self.handler.addFilter(self.sampler)
+        self.listener = QueueListener(queue, self.output)
+        logger.addHandler(self.handler)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def configure(self, fmt: str, sample: dict[str, float] | None):
+        """
+        Change the output format and sampling rates.
+
+        Args:
+            fmt: The output format; one of `FORMATS`
+            sample: Sampling rates; see `SampleFilter`
+        """
+
+        self.output.setFormatter(make_formatter(fmt, self.shard_tag))
+        self.sampler.configure(sample or {})
+
+    def stop(self):
+        """Write out any queued records and stop the listener thread."""
+
+        if self._running:
+            self._running = False
+            self.listener.stop()
@@ -0,0 +1,91 @@
+"""
+Member lookup module
+
+When the bot runs with a lean member cache (`bot.member_cache` in the
+configuration), discord.py will not have most members of large guilds on
+hand. `get_member` falls back to fetching those members from the API, and
+keeps the results in a small cache which expires them after a while. The
+cache is shared by every bot in the process, but members are only handed back
+to the bot which fetched them, since they are bound to its connection.
+
+```toml
+[bot]
+member_cache = "active"
+# fetched members to keep, and for how many seconds
+member_cache_size = 1000
+member_cache_ttl = 300
+```
+"""
+
+# stdlib
+from collections import OrderedDict
+from time import monotonic
+
+# 3rd party
+from discord import Guild, Member
+from discord.errors import NotFound
+
+# local
+from . import config
+
+_fetched: OrderedDict[tuple[int, int, int], tuple[float, Member]] = (
+    OrderedDict()
+)
+"""Fetched members, by (bot user ID, guild ID, user ID), oldest first"""
+
+
+def remember(member: Member):
+    """
+    Keep a member on hand for later lookups.
+
+    Args:
+        member: The member to remember
+    """
+
+    key = (member.guild._state.self_id, member.guild.id, member.id)
+    ttl = config["bot"].get("member_cache_ttl", 300)
+    _fetched[key] = (monotonic() + ttl, member)
+    _fetched.move_to_end(key)
+
+    while len(_fetched) > config["bot"].get("member_cache_size", 1000):
+        _fetched.popitem(last=False)
+
+
+async def get_member(guild: Guild, user_id: int) -> Member | None:
+    """
+    Get a guild member, fetching them from the API if they are not cached.
+
+    Args:
+        guild: The guild to look in
+        user_id: The ID of the member
+
+    Returns:
+        The member, or None if they are not in the guild
+    """
+
+    member = guild.get_member(user_id)
+
+    if member is not None:
+        return member
+
+    key = (guild._state.self_id, guild.id, user_id)
+    cached = _fetched.get(key)
+
+    if cached is not None:
+        expires, member = cached
+
+        if expires > monotonic():
+            _fetched.move_to_end(key)
+
+            return member
+
+        del _fetched[key]
+
+    try:
+        member = await guild.fetch_member(user_id)
+    except NotFound:
+        return None
+
+    remember(member)
+
+    return member
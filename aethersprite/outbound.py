@@ -0,0 +1,331 @@
+"""
+Outbound request scheduler module
+
+Calls extensions make to the Discord API on their own account (editing
+embeds, adding and removing reactions, changing roles, cleaning up old posts)
+are submitted to the bot's outbox rather than awaited directly, so that
+low-value work can't hold up the work members are waiting on:
+
+- Each request is submitted to a lane (`URGENT`, `NORMAL`, or `BACKGROUND`),
+  and waiting requests are started in lane order, oldest first.
+- Each request names a route, the resource whose rate limit it counts
+  against (e.g. `("channel", channel.id)`), and only
+  `bot.outbound_route_budget` requests run at once on each route; within a
+  lane, requests on the same route run in the order they were submitted.
+- Requests submitted with the same key (e.g. repeated edits of the same
+  message) are coalesced while they wait: only the last one submitted is
+  sent, and every submitter gets its result.
+
+At most `bot.outbound_concurrency` requests run at once for each bot.
+Replies to commands are still sent directly, ahead of anything in the
+outbox.
+
+```python
+from functools import partial
+
+from aethersprite.outbound import BACKGROUND, NORMAL, outbox
+
+
+async def on_change(msg, emoji, embed):
+    route = ("channel", msg.channel.id)
+    # fire and forget; failures are logged
+    outbox(bot).submit(route, partial(msg.add_reaction, emoji), BACKGROUND)
+    await outbox(bot).submit(
+        route, partial(msg.edit, embed=embed), NORMAL, ("edit", msg.id)
+    )
+```
+
+Queue depths, wait times, and counters for every outbox are available from
+`metrics()`.
+"""
+
+# stdlib
+import asyncio as aio
+from heapq import heappop, heappush
+from itertools import count
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable
+
+# 3rd party
+from discord import NotFound
+from discord.ext.commands import Bot
+
+# local
+from . import config, log
+
+URGENT = 0
+"""Lane for work a member is waiting on, e.g. granting a role"""
+
+NORMAL = 1
+"""Lane for keeping interactive messages up to date"""
+
+BACKGROUND = 2
+"""Lane for work nobody is waiting on, e.g. seeding reactions or cleanup"""
+
+LANES = ("urgent", "normal", "background")
+"""Names of the lanes, in order"""
+
+COUNTERS = ("submitted", "coalesced", "completed", "failed")
+"""Names of the counters kept for each lane"""
+
+Route = tuple[str, int]
+"""The kind and ID of the resource a request counts against"""
+
+
+def _consume(fut: aio.Future):
+    # failures are logged when they happen, so unawaited futures needn't be
+    if not fut.cancelled():
+        fut.exception()
+
+
+class _Request(object):
+    """A request waiting in, or running from, an outbox"""
+
+    __slots__ = ("lane", "route", "key", "func", "futures", "submitted")
+
+    def __init__(
+        self,
+        lane: int,
+        route: Route,
+        key: Hashable | None,
+        func: Callable[[], Awaitable[Any]],
+    ):
+        self.lane = lane
+        self.route = route
+        self.key = key
+        self.func = func
+        self.futures: list[aio.Future] = []
+        self.submitted = monotonic()
+
+
+class Outbox(object):
+    """A bot's outbound request scheduler"""
+
+    def __init__(self, concurrency: int = 8, route_budget: int = 1):
+        """
+        Args:
+            concurrency: How many requests may run at once
+            route_budget: How many requests may run at once on each route
+        """
+
+        self.concurrency = concurrency
+        self.route_budget = route_budget
+        self.running = 0
+        self._queue: list[tuple[int, int, _Request]] = []
+        self._seq = count()
+        self._pending: dict[Hashable, _Request] = {}
+        """Waiting requests, by coalescing key"""
+
+        self._routes: dict[Route, int] = {}
+        """Running requests, by route"""
+
+        self._tasks: set[aio.Task] = set()
+        self.depth = [0] * len(LANES)
+        """Waiting requests, by lane"""
+
+        self.peak = [0] * len(LANES)
+        """The most requests which have waited at once, by lane"""
+
+        self.waited = [0.0] * len(LANES)
+        """Total seconds requests have waited, by lane"""
+
+        self.longest = [0.0] * len(LANES)
+        """The longest any request has waited, by lane"""
+
+        self.counters = [{c: 0 for c in COUNTERS} for _ in LANES]
+        """Counters for the outbox's lifetime, by lane"""
+
+    def submit(
+        self,
+        route: Route,
+        func: Callable[[], Awaitable[Any]],
+        lane: int = NORMAL,
+        key: Hashable | None = None,
+    ) -> aio.Future:
+        """
+        Submit a request.
+
+        Args:
+            route: The kind and ID of the resource the request counts against
+            func: Makes the request when called
+            lane: The request's lane
+            key: If set, a waiting request submitted with the same key is
+                replaced by this one
+
+        Returns:
+            A future for the request's result, which need not be awaited
+        """
+
+        fut = aio.get_running_loop().create_future()
+        fut.add_done_callback(_consume)
+        counters = self.counters[lane]
+        counters["submitted"] += 1
+        req = self._pending.get(key) if key is not None else None
+
+        if req is not None:
+            # last write wins; the earlier submitters get its result too
+            req.func = func
+            req.futures.append(fut)
+            counters["coalesced"] += 1
+
+            return fut
+
+        req = _Request(lane, route, key, func)
+        req.futures.append(fut)
+
+        if key is not None:
+            self._pending[key] = req
+
+        heappush(self._queue, (lane, next(self._seq), req))
+        self.depth[lane] += 1
+        self.peak[lane] = max(self.peak[lane], self.depth[lane])
+        self._pump()
+
+        return fut
+
+    def _pump(self):
+        """Start waiting requests, in order, while there is budget for them."""
+
+        held = []
+
+        while self._queue and self.running < self.concurrency:
+            entry = heappop(self._queue)
+            req = entry[2]
+
+            if self._routes.get(req.route, 0) >= self.route_budget:
+                held.append(entry)
+
+                continue
+
+            self._start(req)
+
+        for entry in held:
+            heappush(self._queue, entry)
+
+    def _start(self, req: _Request):
+        if req.key is not None:
+            del self._pending[req.key]
+
+        waited = monotonic() - req.submitted
+        self.depth[req.lane] -= 1
+        self.waited[req.lane] += waited
+        self.longest[req.lane] = max(self.longest[req.lane], waited)
+        self.running += 1
+        self._routes[req.route] = self._routes.get(req.route, 0) + 1
+        task = aio.ensure_future(self._run(req))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, req: _Request):
+        counters = self.counters[req.lane]
+
+        try:
+            result = await req.func()
+        except aio.CancelledError:
+            for fut in req.futures:
+                fut.cancel()
+
+            raise
+        except Exception as ex:
+            counters["failed"] += 1
+
+            # e.g. the message was deleted while the request was waiting
+            if isinstance(ex, NotFound):
+                log.debug(
+                    "%s request on %s: %s", LANES[req.lane], req.route, ex
+                )
+            else:
+                log.exception(
+                    "Error in %s request on %s",
+                    LANES[req.lane],
+                    req.route,
+                )
+
+            for fut in req.futures:
+                if not fut.done():
+                    fut.set_exception(ex)
+        else:
+            counters["completed"] += 1
+
+            for fut in req.futures:
+                if not fut.done():
+                    fut.set_result(result)
+        finally:
+            self.running -= 1
+            running = self._routes[req.route] - 1
+
+            if running:
+                self._routes[req.route] = running
+            else:
+                del self._routes[req.route]
+
+            self._pump()
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Get the outbox's metrics.
+
+        Returns:
+            Each lane's waiting requests (and peak), total and longest wait
+            in seconds, and counters, by name
+        """
+
+        return {
+            name: {
+                "waiting": self.depth[lane],
+                "peak": self.peak[lane],
+                "waited": self.waited[lane],
+                "longest": self.longest[lane],
+                **self.counters[lane],
+            }
+            for lane, name in enumerate(LANES)
+        }
+
+
+_outboxes: dict[int, Outbox] = {}
+"""Outboxes, by bot"""
+
+
+def outbox(bot: Bot) -> Outbox:
+    """
+    Get a bot's outbox, creating it if it doesn't exist yet.
+
+    Args:
+        bot: The bot
+
+    Returns:
+        The outbox
+    """
+
+    box = _outboxes.get(id(bot))
+
+    if box is None:
+        box = _outboxes[id(bot)] = Outbox(
+            config["bot"].get("outbound_concurrency", 8),
+            config["bot"].get("outbound_route_budget", 1),
+        )
+
+    return box
+
+
+def metrics() -> dict[str, dict[str, float]]:
+    """
+    Get the metrics of every outbox, combined.
+
+    Returns:
+        Each lane's metrics (see `Outbox.metrics`), by name
+    """
+
+    out: dict[str, dict[str, float]] = {}
+
+    for box in _outboxes.values():
+        for name, lane in box.metrics().items():
+            totals = out.setdefault(name, {})
+
+            for key, value in lane.items():
+                if key in ("peak", "longest"):
+                    totals[key] = max(totals.get(key, 0), value)
+                else:
+                    totals[key] = totals.get(key, 0) + value
+
+    return out
@@ -0,0 +1,178 @@
+"""
+Startup profiler module
+
+Records a tree of timed phases while the bot boots: package imports, loading
+the configuration, setting up each extension, connecting to the gateway, and
+running each `on_ready` listener. Phases are always recorded (it is cheap to
+do so), but the results are only written out when requested; see
+`python -m aethersprite --help`.
+
+This module must not import anything from the rest of the package, since it
+is imported before everything else in order to time those imports.
+"""
+
+# stdlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import json
+from time import perf_counter
+
+_current: ContextVar["Phase | None"] = ContextVar("phase", default=None)
+
+
+class Phase(object):
+    """A single timed phase, which may contain other phases"""
+
+    def __init__(self, name: str, start: float | None = None):
+        self.name = name
+        """The phase's name"""
+
+        self.start = perf_counter() if start is None else start
+        """When the phase began"""
+
+        self.end: float | None = None
+        """When the phase finished"""
+
+        self.children: list[Phase] = []
+        """Phases which began during this one"""
+
+        self._token = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds spent in this phase (so far, if it is unfinished)."""
+
+        return (perf_counter() if self.end is None else self.end) - self.start
+
+    def finish(self):
+        """Mark the phase as finished."""
+
+        if self.end is None:
+            self.end = perf_counter()
+
+    def __enter__(self):
+        self._token = _current.set(self)
+
+        return self
+
+    def __exit__(self, *_):
+        self.finish()
+
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+    def to_dict(self, origin: float) -> dict:
+        """
+        Convert the phase (and its children) to a serializable dict.
+
+        Args:
+            origin: The time which offsets are measured from
+
+        Returns:
+            The phase as a dict
+        """
+
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "children": [c.to_dict(origin) for c in self.children],
+        }
+
+
+class StartupProfiler(object):
+    """Collects startup phases and reports on them"""
+
+    def __init__(self):
+        self.root = Phase("startup")
+        """The top-level phase, which began when this module was imported"""
+
+        self.output: str | None = None
+        """Where to write the report; if None, no report is written"""
+
+        self.started = datetime.now(timezone.utc)
+        """Wall clock time when profiling began"""
+
+    @property
+    def finished(self) -> bool:
+        """Whether startup has finished."""
+
+        return self.root.end is not None
+
+    def phase(
+        self,
+        name: str,
+        start: float | None = None,
+        parent: Phase | None = None,
+    ) -> Phase:
+        """
+        Begin a new phase. Unless a parent is given, it is nested beneath the
+        phase which is currently active in this context (if any), or else the
+        root. Once startup has finished, the returned phase is not recorded.
+
+        Use it as a context manager to make it the active phase for code
+        (and tasks created) within the block, or call `Phase.finish()`.
+
+        Args:
+            name: The name of the phase
+            start: When the phase began, if not now
+            parent: The phase to nest the new phase beneath
+
+        Returns:
+            The new phase
+        """
+
+        phase = Phase(name, start)
+
+        if not self.finished:
+            (parent or _current.get() or self.root).children.append(phase)
+
+        return phase
+
+    def summary(self) -> list[str]:
+        """
+        Summarize the recorded phases.
+
+        Returns:
+            One line per phase, indented according to depth
+        """
+
+        lines = []
+
+        def walk(phase: Phase, depth: int):
+            lines.append(
+                f"{phase.duration * 1000:>10.2f}ms {'  ' * depth}{phase.name}"
+            )
+
+            for child in phase.children:
+                walk(child, depth + 1)
+
+        walk(self.root, 0)
+
+        return lines
+
+    def finish(self) -> dict:
+        """
+        Finish profiling, writing the report if an output path is set.
+
+        Returns:
+            The report
+        """
+
+        self.root.finish()
+        report = {
+            "version": 1,
+            "started": self.started.isoformat(),
+            "phases": self.root.to_dict(self.root.start),
+        }
+
+        if self.output is not None:
+            with open(self.output, "w") as f:
+                json.dump(report, f, indent=2)
+
+        return report
+
+
+profiler = StartupProfiler()
+"""Startup profiler instance"""
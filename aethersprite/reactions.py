@@ -0,0 +1,279 @@
+"""
+Reaction router module
+
+Extensions which post interactive messages (polls, self-service role posts,
+catalogs, wipe confirmations, and so on) register a reaction handler and
+track the messages it owns, rather than listening for every reaction the bot
+can see. The router keeps an in-memory index of tracked messages and passes
+each reaction only to the handler which owns its message; reactions to any
+other message (and the bot's own reactions) are dropped without touching any
+extension's data.
+
+```python
+from aethersprite.reactions import add_handler, remove_handler, track, untrack
+
+
+async def on_add(payload):
+    ...
+
+
+async def setup(bot):
+    add_handler(bot, "thing", on_add)
+
+    for message_id in things.keys():
+        track(bot, "thing", int(message_id))
+
+
+async def teardown(bot):
+    remove_handler(bot, "thing")
+```
+
+Counters of the reactions routed to each handler are available from
+`metrics()`, and of the reactions which were dropped from `ignored()`.
+"""
+
+# stdlib
+from typing import Awaitable, Callable
+
+# 3rd party
+from discord.ext.commands import Bot
+from discord.raw_models import RawReactionActionEvent
+
+Handler = Callable[[RawReactionActionEvent], Awaitable[None]]
+"""Handles a reaction to one of its messages"""
+
+
+class _Route(object):
+    """A handler and the messages it owns"""
+
+    __slots__ = ("on_add", "on_remove", "messages", "added", "removed")
+
+    def __init__(self, on_add: Handler | None, on_remove: Handler | None):
+        self.on_add = on_add
+        self.on_remove = on_remove
+        self.messages: set[int] = set()
+        self.added = 0
+        self.removed = 0
+
+
+class _Router(object):
+    """A bot's reaction router"""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self.routes: dict[str, _Route] = {}
+        """Handlers, by name"""
+
+        self.owners: dict[int, _Route] = {}
+        """Handlers, by the ID of the message they own"""
+
+        self.ignored = 0
+        """Reactions which no handler owned"""
+
+    async def on_raw_reaction_add(self, payload: RawReactionActionEvent):
+        route = self._route(payload)
+
+        if route is not None and route.on_add is not None:
+            route.added += 1
+            await route.on_add(payload)
+
+    async def on_raw_reaction_remove(self, payload: RawReactionActionEvent):
+        route = self._route(payload)
+
+        if route is not None and route.on_remove is not None:
+            route.removed += 1
+            await route.on_remove(payload)
+
+    def _route(self, payload: RawReactionActionEvent) -> _Route | None:
+        route = self.owners.get(payload.message_id)
+
+        if route is None:
+            self.ignored += 1
+
+            return None
+
+        assert self.bot.user
+
+        if payload.user_id == self.bot.user.id:
+            return None
+
+        return route
+
+
+_routers: dict[int, _Router] = {}
+"""Reaction routers, by bot"""
+
+
+def add_handler(
+    bot: Bot,
+    name: str,
+    on_add: Handler | None = None,
+    on_remove: Handler | None = None,
+):
+    """
+    Register a reaction handler. The bot's reactions are routed once any
+    handler is registered.
+
+    Args:
+        bot: The bot
+        name: The handler's name
+        on_add: Handles reactions added to the handler's messages
+        on_remove: Handles reactions removed from the handler's messages
+    """
+
+    router = _routers.get(id(bot))
+
+    if router is None:
+        router = _routers[id(bot)] = _Router(bot)
+        bot.add_listener(router.on_raw_reaction_add)
+        bot.add_listener(router.on_raw_reaction_remove)
+
+    route = router.routes.get(name)
+
+    if route is None:
+        router.routes[name] = _Route(on_add, on_remove)
+    else:
+        route.on_add = on_add
+        route.on_remove = on_remove
+
+
+def remove_handler(bot: Bot, name: str):
+    """
+    Unregister a reaction handler, and stop tracking its messages.
+
+    Args:
+        bot: The bot
+        name: The handler's name
+    """
+
+    router = _routers.get(id(bot))
+
+    if router is None:
+        return
+
+    route = router.routes.pop(name, None)
+
+    if route is not None:
+        for message_id in route.messages:
+            router.owners.pop(message_id, None)
+
+    if not router.routes:
+        bot.remove_listener(router.on_raw_reaction_add)
+        bot.remove_listener(router.on_raw_reaction_remove)
+        del _routers[id(bot)]
+
+
+def track(bot: Bot, name: str, message_id: int):
+    """
+    Route reactions to a message to a handler.
+
+    Args:
+        bot: The bot
+        name: The handler's name
+        message_id: The message's ID
+    """
+
+    router = _routers[id(bot)]
+    route = router.routes[name]
+    previous = router.owners.get(message_id)
+
+    if previous is not None:
+        previous.messages.discard(message_id)
+
+    route.messages.add(message_id)
+    router.owners[message_id] = route
+
+
+def untrack(bot: Bot, message_id: int):
+    """
+    Stop routing reactions to a message.
+
+    Args:
+        bot: The bot
+        message_id: The message's ID
+    """
+
+    router = _routers.get(id(bot))
+
+    if router is None:
+        return
+
+    route = router.owners.pop(message_id, None)
+
+    if route is not None:
+        route.messages.discard(message_id)
+
+
+def get_handler(bot: Bot, name: str, added: bool = True) -> Handler | None:
+    """
+    Get one of a handler's functions.
+
+    Args:
+        bot: The bot
+        name: The handler's name
+        added: Get the function which handles added (rather than removed)
+            reactions
+
+    Returns:
+        The function, if the handler is registered and has one
+    """
+
+    router = _routers.get(id(bot))
+    route = router.routes.get(name) if router is not None else None
+
+    if route is None:
+        return None
+
+    return route.on_add if added else route.on_remove
+
+
+def tracked(bot: Bot, message_id: int) -> bool:
+    """
+    Check whether reactions to a message are routed to a handler.
+
+    Args:
+        bot: The bot
+        message_id: The message's ID
+
+    Returns:
+        If the message is tracked
+    """
+
+    router = _routers.get(id(bot))
+
+    return router is not None and message_id in router.owners
+
+
+def ignored() -> int:
+    """
+    Get how many reactions no handler owned.
+
+    Returns:
+        The number of reactions, for every bot
+    """
+
+    return sum(router.ignored for router in _routers.values())
+
+
+def metrics() -> dict[str, dict[str, int]]:
+    """
+    Get the metrics of every reaction handler. Handlers of the same name (e.g.
+    one for each bot an extension is loaded into) are combined.
+
+    Returns:
+        Each handler's tracked messages and reactions added and removed, by
+        name
+    """
+
+    out: dict[str, dict[str, int]] = {}
+
+    for router in _routers.values():
+        for name, route in router.routes.items():
+            totals = out.setdefault(
+                name, {"messages": 0, "added": 0, "removed": 0}
+            )
+            totals["messages"] += len(route.messages)
+            totals["added"] += route.added
+            totals["removed"] += route.removed
+
+    return out
@@ -0,0 +1,187 @@
+"""
+Response cache module
+
+Read-only commands whose output only changes when some underlying data does
+(listing aliases, yeets, settings, and so on) can cache their responses,
+keyed by command, guild, channel, and arguments. Each response is tagged with
+the data it was rendered from, and the commands which change that data
+invalidate the tag.
+
+```python
+from aethersprite.responses import invalidate, send_cached
+
+
+@command(name="thing.list")
+async def list_(ctx):
+    await send_cached(ctx, lambda: render(ctx), f"thing:{ctx.guild.id}")
+
+
+@command(name="thing.add")
+async def add(ctx, name):
+    ...
+    invalidate(f"thing:{ctx.guild.id}")
+```
+"""
+
+# stdlib
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+# 3rd party
+from discord.ext.commands import Context
+
+MAX_ENTRIES = 4096
+"""How many responses to keep before evicting the least recently used"""
+
+Key = tuple[str, int | None, int | None, tuple[Hashable, ...]]
+"""Command name, guild ID, channel ID, and arguments"""
+
+
+class ResponseCache(object):
+    """A bounded cache of rendered responses, invalidated by tag"""
+
+    def __init__(self, size: int = MAX_ENTRIES):
+        self.size = size
+        self.entries: OrderedDict[Key, tuple[str, tuple[str, ...]]] = (
+            OrderedDict()
+        )
+        """Responses and their tags, by key"""
+
+        self.tagged: dict[str, set[Key]] = {}
+        """Keys of the responses rendered from each tag's data"""
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Key) -> str | None:
+        """
+        Get a cached response.
+
+        Args:
+            key: The response's key
+
+        Returns:
+            The response, if it is cached
+        """
+
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+
+        return entry[0]
+
+    def put(self, key: Key, text: str, tags: tuple[str, ...]):
+        """
+        Cache a response.
+
+        Args:
+            key: The response's key
+            text: The response
+            tags: Tags for the data the response was rendered from
+        """
+
+        self._discard(key)
+        self.entries[key] = (text, tags)
+
+        for tag in tags:
+            self.tagged.setdefault(tag, set()).add(key)
+
+        while len(self.entries) > self.size:
+            self._discard(next(iter(self.entries)))
+
+    def _discard(self, key: Key):
+        entry = self.entries.pop(key, None)
+
+        if entry is None:
+            return
+
+        for tag in entry[1]:
+            keys = self.tagged.get(tag)
+
+            if keys is not None:
+                keys.discard(key)
+
+                if not keys:
+                    del self.tagged[tag]
+
+    def invalidate(self, *tags: str):
+        """
+        Discard the responses rendered from the given tags' data.
+
+        Args:
+            tags: The tags
+        """
+
+        for tag in tags:
+            for key in list(self.tagged.get(tag, ())):
+                self._discard(key)
+                self.invalidations += 1
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Get the cache's counters.
+
+        Returns:
+            Hits, misses, invalidations, and cached entries
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self.entries),
+        }
+
+
+responses = ResponseCache()
+"""The response cache"""
+
+
+def invalidate(*tags: str):
+    """
+    Discard the cached responses rendered from the given tags' data.
+
+    Args:
+        tags: The tags
+    """
+
+    responses.invalidate(*tags)
+
+
+async def send_cached(
+    ctx: Context,
+    render: Callable[[], str],
+    *tags: str,
+    args: tuple[Hashable, ...] = (),
+):
+    """
+    Send a command's response, rendering it only if it is not cached.
+
+    Args:
+        ctx: The command's context
+        render: Renders the response
+        tags: Tags for the data the response is rendered from
+        args: The command's arguments, if they affect its response
+    """
+
+    assert ctx.command
+    key: Key = (
+        ctx.command.qualified_name,
+        ctx.guild.id if ctx.guild else None,
+        ctx.channel.id if ctx.channel else None,
+        args,
+    )
+    text = responses.get(key)
+
+    if text is None:
+        text = render()
+        responses.put(key, text, tags)
+
+    await ctx.send(text)
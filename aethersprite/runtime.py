@@ -0,0 +1,90 @@
+"""
+Event loop runtime module
+
+Builds the event loop the bot runs on, according to the `[runtime]` table in
+the configuration:
+
+```toml
+[runtime]
+# "asyncio" or "uvloop" (uvloop is installed with the [web] extra)
+loop = "uvloop"
+# run new tasks eagerly until their first suspension (Python 3.12+)
+eager_tasks = true
+# maximum threads in the default executor (omit for Python's default)
+executor_workers = 8
+```
+
+To compare the available runtimes on your own hardware, run
+`python -m aethersprite.benchmarks.runtime`.
+"""
+
+# stdlib
+import asyncio as aio
+from concurrent.futures import ThreadPoolExecutor
+
+# local
+from . import log
+
+LOOPS = ("asyncio", "uvloop")
+"""Supported event loop implementations"""
+
+
+def new_loop(
+    loop: str = "asyncio",
+    eager_tasks: bool = False,
+    executor_workers: int | None = None,
+) -> aio.AbstractEventLoop:
+    """
+    Create a new event loop.
+
+    Args:
+        loop: The event loop implementation to use
+        eager_tasks: Whether to use the eager task factory
+        executor_workers: The maximum number of threads in the default
+            executor; if None, Python's default is used
+
+    Returns:
+        The new event loop
+    """
+
+    if loop not in LOOPS:
+        raise ValueError(f"Unknown event loop: {loop}")
+
+    new = aio.new_event_loop
+
+    if loop == "uvloop":
+        try:
+            import uvloop
+
+            new = uvloop.new_event_loop
+        except ImportError:
+            log.warning("uvloop is not installed; using asyncio")
+            loop = "asyncio"
+
+    ev = new()
+
+    if eager_tasks:
+        factory = getattr(aio, "eager_task_factory", None)
+
+        if factory is None:
+            log.warning("Eager tasks require Python 3.12 or newer")
+            eager_tasks = False
+        else:
+            ev.set_task_factory(factory)
+
+    if executor_workers:
+        ev.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=executor_workers,
+                thread_name_prefix="aethersprite",
+            )
+        )
+
+    log.debug(
+        "Event loop: %s (eager tasks: %s, executor workers: %s)",
+        loop,
+        eager_tasks,
+        executor_workers or "default",
+    )
+
+    return ev
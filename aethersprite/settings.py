@@ -41,10 +41,10 @@ if typing.TYPE_CHECKING:
 
 # 3rd party
 from discord.ext.commands import Context
-from sqlitedict import SqliteDict
 
 # local
-from . import data_folder
+from . import snapshot
+from .storage import open_db
 
 # TODO cleanup settings for missing servers/channels on startup
 
@@ -53,9 +53,9 @@ class Setting(object):
     """Setting class; represents an individual setting definition"""
 
     # Setting values
-    _values = SqliteDict(
-        f"{data_folder}settings.sqlite3", tablename="values", autocommit=True
-    )
+    _values = open_db("settings.sqlite3", "values")
+    # Setting values already read from the database, by key
+    _cache: dict[str, dict] = {}
 
     def __init__(
         self,
@@ -130,7 +130,7 @@ class Setting(object):
         """
 
         key = self._ctxkey(ctx, channel)
-        vals = self._values[key] if key in self._values else {}
+        vals = dict(self._row(key))
 
         try:
             if not raw and self.filter is not None:
@@ -152,9 +152,33 @@ class Setting(object):
             vals[self.name] = value
 
         self._values[key] = vals
+        self._cache[key] = vals
+        _notify(self.name, key)
 
         return True
 
+    def _row(self, key: str) -> dict:
+        """
+        Get the stored values for a key, reading them from the database only
+        if they have not been read already.
+
+        Args:
+            key: The composite key
+
+        Returns:
+            The values of every setting stored under the key
+        """
+
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        row = self._values.get(key, {})
+        self._cache[key] = row
+
+        return row
+
     def get(
         self, ctx: Context, raw: bool = False, channel: int | None = None
     ) -> typing.Any | None:
@@ -170,12 +194,7 @@ class Setting(object):
             The setting's value
         """
 
-        key = self._ctxkey(ctx, channel)
-        val = (
-            self._values[key][self.name]
-            if key in self._values and self.name in self._values[key]
-            else None
-        )
+        val = self._row(self._ctxkey(ctx, channel)).get(self.name)
 
         if not raw and self.filter is not None:
             val = self.filter.out(ctx, val)
@@ -192,7 +211,10 @@ def register(
     filter: "SettingFilter | None" = None,
 ):
     """
-    Register a setting.
+    Register a setting. When several bots share a process, each of them sets
+    up the same extensions; registering a setting again with the same
+    definition is allowed, and it remains registered until every bot which
+    registered it has unregistered it.
 
     Args:
         name: The name of the setting
@@ -205,12 +227,109 @@ def register(
     global settings
 
     if name in settings:
-        raise Exception(f"Setting already exists: {name}")
+        existing = settings[name]
+
+        if (existing.default, existing.channel, existing.description) != (
+            default,
+            channel,
+            description,
+        ):
+            raise Exception(f"Setting already exists: {name}")
+
+        _registrations[name] += 1
+
+        return
 
     settings[name] = Setting(
         name, default, validator, channel, description, filter=filter
     )
+    _registrations[name] = 1
+    _notify(name, None)
+
+
+def unregister(name: str):
+    """
+    Unregister a setting.
+
+    Args:
+        name: The name of the setting
+    """
+
+    global settings
+
+    _registrations[name] -= 1
+
+    if _registrations[name] <= 0:
+        del _registrations[name]
+        del settings[name]
+        _notify(name, None)
+
+
+def watch(name: str, callback: typing.Callable[[str | None], None]):
+    """
+    Call a function whenever a setting's value changes, so that anything
+    derived from it can be invalidated. The function is passed the composite
+    key (guild ID, plus channel ID for channel settings) whose value changed,
+    or None if the setting was registered or unregistered, since that may
+    change its value everywhere.
+
+    Args:
+        name: The name of the setting, which need not be registered yet, or
+            "*" to watch every setting
+        callback: The function to call
+    """
+
+    watchers = _watchers.setdefault(name, [])
+
+    if callback not in watchers:
+        watchers.append(callback)
+
+
+def unwatch(name: str, callback: typing.Callable[[str | None], None]):
+    """
+    Stop calling a function when a setting's value changes.
+
+    Args:
+        name: The name of the setting, or "*"
+        callback: The function which was passed to `watch`
+    """
+
+    watchers = _watchers.get(name, [])
+
+    if callback in watchers:
+        watchers.remove(callback)
+
+
+def _notify(name: str, key: str | None):
+    """
+    Call the functions watching a setting.
+
+    Args:
+        name: The name of the setting
+        key: The composite key whose value changed, if any
+    """
+
+    for callback in (*_watchers.get(name, ()), *_watchers.get("*", ())):
+        callback(key)
 
 
 settings: dict[str, Setting] = {}
 """Setting definitions"""
+
+_registrations: dict[str, int] = {}
+"""How many times each setting has been registered"""
+
+_watchers: dict[str, list[typing.Callable[[str | None], None]]] = {}
+"""Functions to call when a setting's value changes, by setting name"""
+
+
+def _restore(data: dict[str, dict]):
+    Setting._cache.update(data)
+
+
+snapshot.register(
+    "settings.values",
+    lambda: Setting._cache,
+    _restore,
+    ("settings.sqlite3",),
+)
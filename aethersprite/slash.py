@@ -0,0 +1,310 @@
+"""
+Application (slash) command module
+
+When `bot.command_mode` is "slash" or "both", every visible prefix command is
+also registered as an application command. Its arguments are accepted as a
+single string option, which is parsed by the prefix command exactly as if it
+had followed the command's name in a message; checks, converters, and error
+handling are therefore shared between the two. Since application command
+names may not contain dots, commands with dotted names are grouped by their
+first part (`alias.add` becomes `/alias add`). A group can't share its name
+with a command, so where one would (`get` and `get.all`), the dots are
+replaced with dashes instead (`/get-all`).
+
+Interactions are deferred before the command is invoked, so commands may
+take as long as they need (e.g. waiting on the outbox) to reply.
+
+In "slash" mode, the bot does not request any message intents (including the
+privileged `message_content` intent), and so it only receives the
+interactions addressed to it.
+
+```toml
+[bot]
+command_mode = "slash"
+```
+
+Commands are synced to each guild by a startup job (see `aethersprite.jobs`)
+and when the bot joins a guild, but only if they have changed since the last
+sync to that guild.
+"""
+
+# stdlib
+from hashlib import sha256
+import json
+
+# 3rd party
+from discord import app_commands, Guild, Interaction
+from discord.ext.commands import Bot, Command, Context
+from discord.ext.commands.view import StringView
+
+# local
+from . import config, log
+from .jobs import add_job, Job
+from .storage import open_db
+from .tasks import open_group
+
+MODES = ("prefix", "slash", "both")
+"""Supported command modes"""
+
+synced = open_db("slash.sqlite3", "synced")
+"""Hashes of the commands last synced to each guild, by bot and guild ID"""
+
+syncs = open_group("slash.sync", 1, 8)
+"""Background syncs, e.g. after the configuration is reloaded"""
+
+
+def slash_name(name: str) -> str:
+    """
+    Convert a prefix command's name to an application command name.
+
+    Args:
+        name: The prefix command's name
+
+    Returns:
+        The application command's name
+    """
+
+    return name.lower().replace(".", "-")[:32]
+
+
+class _SlashContext(Context):
+    """The context of a prefix command invoked by an interaction"""
+
+    replied = False
+    """If the command has sent anything in response"""
+
+    async def send(self, *args, **kwargs):
+        assert self.interaction
+
+        if (
+            not self.replied
+            and kwargs.get("ephemeral")
+            and self.interaction.response.is_done()
+        ):
+            # the first followup would take the place of the deferred
+            # response, which everyone can see
+            await self.interaction.delete_original_response()
+
+        self.replied = True
+
+        return await super().send(*args, **kwargs)
+
+
+def _describe(cmd: Command) -> str:
+    """
+    Get an application command description for a prefix command.
+
+    Args:
+        cmd: The prefix command
+
+    Returns:
+        The description
+    """
+
+    text = cmd.brief or (cmd.help or "").split("\n")[0] or cmd.name
+
+    return text if len(text) <= 100 else f"{text[:99]}…"
+
+
+def _bridge(bot: Bot, cmd: Command, slash: str) -> app_commands.Command:
+    """
+    Create an application command which invokes a prefix command.
+
+    Args:
+        bot: The bot the prefix command belongs to
+        cmd: The prefix command
+        slash: The application command's name
+
+    Returns:
+        The application command
+    """
+
+    name = cmd.name
+
+    async def invoke(interaction: Interaction, arguments: str):
+        # interactions must be acknowledged within 3 seconds
+        await interaction.response.defer()
+        ctx = await _SlashContext.from_interaction(interaction)
+        # look the command up now, in case it has been replaced since
+        ctx.command = bot.get_command(name)
+        ctx.invoked_with = name
+        ctx.view = StringView(arguments)
+        await bot.invoke(ctx)
+
+        # every interaction must be answered, even if the command was refused
+        if not ctx.replied:
+            await ctx.send(
+                ":no_entry:" if ctx.command_failed else ":thumbsup:",
+                ephemeral=True,
+            )
+
+    if cmd.extras.get("lazy"):
+        # the real command's parameters are not known until it is loaded
+        async def callback(interaction: Interaction, arguments: str = ""):
+            await invoke(interaction, arguments)
+
+    elif not cmd.clean_params:
+
+        async def callback(interaction: Interaction):
+            await invoke(interaction, "")
+
+    elif any(p.required for p in cmd.clean_params.values()):
+
+        async def callback(interaction: Interaction, arguments: str):
+            await invoke(interaction, arguments)
+
+    else:
+
+        async def callback(interaction: Interaction, arguments: str = ""):
+            await invoke(interaction, arguments)
+
+    if cmd.clean_params or cmd.extras.get("lazy"):
+        signature = cmd.signature or "arguments"
+        app_commands.describe(arguments=signature[:100])(callback)
+
+    return app_commands.Command(
+        name=slash, description=_describe(cmd), callback=callback
+    )
+
+
+def register(bot: Bot):
+    """
+    Register application commands for the bot's visible prefix commands,
+    replacing any registered previously.
+
+    Args:
+        bot: The bot to register commands for
+    """
+
+    help_names = ("help", config["bot"].get("help_command", "aehelp"))
+    bot.tree.clear_commands(guild=None)
+    grouped: dict[str, list[Command]] = {}
+
+    for cmd in sorted(bot.commands, key=lambda c: c.name):
+        if cmd.hidden or cmd.name in help_names:
+            continue
+
+        if "." in cmd.name:
+            grouped.setdefault(cmd.name.split(".")[0], []).append(cmd)
+        else:
+            bot.tree.add_command(
+                _bridge(bot, cmd, slash_name(cmd.name)), override=True
+            )
+
+    for prefix, cmds in grouped.items():
+        if bot.tree.get_command(slash_name(prefix)) is not None:
+            # a group can't share its name with a command
+            for cmd in cmds:
+                bot.tree.add_command(
+                    _bridge(bot, cmd, slash_name(cmd.name)), override=True
+                )
+
+            continue
+
+        group = app_commands.Group(
+            name=slash_name(prefix), description=f"{prefix} commands"
+        )
+
+        for cmd in cmds:
+            sub = slash_name(cmd.name.split(".", 1)[1])
+            group.add_command(_bridge(bot, cmd, sub))
+
+        bot.tree.add_command(group, override=True)
+
+    log.info(
+        "Registered %s application command(s)", len(bot.tree.get_commands())
+    )
+
+
+def _hash(bot: Bot) -> str:
+    """
+    Get a hash of the registered application commands.
+
+    Args:
+        bot: The bot whose commands should be hashed
+
+    Returns:
+        The hash
+    """
+
+    payload = [c.to_dict(bot.tree) for c in bot.tree.get_commands()]
+
+    return sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+async def sync_guild(bot: Bot, guild: Guild, force: bool = False) -> bool:
+    """
+    Sync the application commands to a guild if they have changed.
+
+    Args:
+        bot: The bot whose commands should be synced
+        guild: The guild to sync them to
+        force: Sync even if the commands have not changed
+
+    Returns:
+        Whether the commands were synced
+    """
+
+    assert bot.user
+    digest = _hash(bot)
+    key = f"{bot.user.id}:{guild.id}"
+
+    if not force and synced.get(key) == digest:
+        return False
+
+    bot.tree.clear_commands(guild=guild)
+    bot.tree.copy_global_to(guild=guild)
+    await bot.tree.sync(guild=guild)
+    synced[key] = digest
+    log.info("Synced application commands to %s", guild)
+
+    return True
+
+
+async def sync_all(bot: Bot):
+    """
+    Sync the application commands to every guild, one at a time.
+
+    Args:
+        bot: The bot whose commands should be synced
+    """
+
+    count = 0
+
+    for guild in list(bot.guilds):
+        try:
+            count += await sync_guild(bot, guild)
+        except Exception:
+            log.exception("Error syncing application commands to %s", guild)
+
+    log.info(
+        "Application commands synced to %s of %s guild(s)",
+        count,
+        len(bot.guilds),
+    )
+
+
+def setup_slash(bot: Bot):
+    """
+    Register application commands and sync them as guilds become available.
+
+    Args:
+        bot: The bot to set up
+    """
+
+    register(bot)
+
+    async def sync(job: Job):
+        async def one(guild: Guild):
+            async with job.api():
+                await sync_guild(bot, guild)
+
+        await job.map(one, list(bot.guilds))
+
+    async def on_guild_join(guild: Guild):
+        await sync_guild(bot, guild)
+
+    add_job(bot, "slash.sync", sync, 20, 2, critical=True)
+    bot.add_listener(on_guild_join)
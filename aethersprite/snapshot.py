@@ -0,0 +1,189 @@
+"""
+Warm-start snapshot module
+
+Caches which are derived from persisted data (setting values, indexes over
+extension databases, and so on) are written to a snapshot file in the data
+folder when the bot shuts down gracefully, and loaded again when it starts,
+so that it does not have to rebuild them from scratch.
+
+Each cache is registered with the database files it is derived from. The
+files' sizes and modification times are recorded alongside the cache, and if
+they do not match when the snapshot is loaded (because something changed the
+data while the bot was down), the cache is discarded and rebuilt as usual.
+
+```python
+from aethersprite import snapshot
+
+index: dict[int, float] = {}
+
+
+def _restore(data):
+    index.update(data)
+
+
+snapshot.register("thing.index", lambda: index, _restore, ("thing.sqlite3",))
+```
+"""
+
+# stdlib
+from os import replace, stat
+import pickle
+from typing import Any, Callable, Sequence
+
+# local
+from . import data_folder, log, shard_ids
+
+VERSION = 1
+"""Snapshot file format version"""
+
+filename = (
+    f"{data_folder}snapshot.pickle"
+    if shard_ids is None
+    else f"{data_folder}snapshot-shards-{'-'.join(map(str, shard_ids))}.pickle"
+)
+"""Where the snapshot is kept"""
+
+_caches: dict[str, tuple[Callable[[], Any], Sequence[str], int]] = {}
+"""Registered caches, by name: (dump function, files, version)"""
+
+_loaded: dict[str, dict] | None = None
+"""Caches read from the snapshot file, by name"""
+
+
+def _fingerprint(files: Sequence[str]) -> list[tuple[int, int] | None]:
+    """
+    Get a cheap fingerprint of the given database files.
+
+    Args:
+        files: Database file names, relative to the data folder
+
+    Returns:
+        The size and modification time of each file and its write-ahead log
+    """
+
+    out = []
+
+    for name in files:
+        for path in (f"{data_folder}{name}", f"{data_folder}{name}-wal"):
+            try:
+                st = stat(path)
+                out.append((st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                out.append(None)
+
+    return out
+
+
+def _read() -> dict[str, dict]:
+    """
+    Read the snapshot file.
+
+    Returns:
+        The caches it contains, by name
+    """
+
+    try:
+        with open(filename, "rb") as f:
+            snap = pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        log.exception("Discarding unreadable snapshot %s", filename)
+
+        return {}
+
+    if snap.get("version") != VERSION:
+        log.info("Discarding snapshot with version %s", snap.get("version"))
+
+        return {}
+
+    return snap["caches"]
+
+
+def register(
+    name: str,
+    dump: Callable[[], Any],
+    load: Callable[[Any], None],
+    files: Sequence[str] = (),
+    version: int = 1,
+) -> bool:
+    """
+    Register a cache to be kept in the snapshot. If the snapshot which was
+    loaded at startup holds a fresh copy of the cache, it is restored now.
+
+    Args:
+        name: The name of the cache
+        dump: Returns the cache's data (which must be picklable)
+        load: Restores the cache from the given data
+        files: The database files the cache is derived from, relative to the
+            data folder
+        version: The version of the cache's data layout
+
+    Returns:
+        Whether the cache was restored
+    """
+
+    global _loaded
+
+    if _loaded is None:
+        _loaded = _read()
+
+    _caches[name] = (dump, files, version)
+    entry = _loaded.pop(name, None)
+
+    if entry is None:
+        return False
+
+    if entry["version"] != version or entry["fingerprint"] != _fingerprint(
+        files
+    ):
+        log.info("Discarding stale snapshot of %s", name)
+
+        return False
+
+    load(entry["data"])
+    log.debug("Restored %s from snapshot", name)
+
+    return True
+
+
+def unregister(name: str):
+    """
+    Stop keeping a cache in the snapshot.
+
+    Args:
+        name: The name of the cache
+    """
+
+    _caches.pop(name, None)
+
+
+def save():
+    """
+    Write every registered cache to the snapshot file. This should be done
+    after the last change to the underlying data (i.e. at shutdown).
+    """
+
+    from .storage import flush
+
+    # the fingerprints must reflect every write
+    flush()
+    caches = {}
+
+    for name, (dump, files, version) in _caches.items():
+        try:
+            caches[name] = {
+                "version": version,
+                "fingerprint": _fingerprint(files),
+                "data": dump(),
+            }
+        except Exception:
+            log.exception("Error dumping %s for snapshot", name)
+
+    tmp = f"{filename}.tmp"
+
+    with open(tmp, "wb") as f:
+        pickle.dump({"version": VERSION, "caches": caches}, f)
+
+    replace(tmp, filename)
+    log.info("Wrote snapshot of %s cache(s) to %s", len(caches), filename)
@@ -0,0 +1,62 @@
+"""
+Storage module
+
+Extensions persist their data in SQLite-backed dicts within the configured
+data folder. Opening them through `open_db` ensures each table is only opened
+once per process (no matter how many times an extension module is executed),
+and that they are opened in a mode which is safe to share between the worker
+processes of a sharded launch (see `aethersprite.launcher`).
+
+```python
+from aethersprite.storage import open_db
+
+things = open_db("thing.sqlite3", "things")
+```
+"""
+
+# 3rd party
+from sqlitedict import SqliteDict
+
+# local
+from . import data_folder, shard_ids
+
+_dbs: dict[tuple[str, str], SqliteDict] = {}
+
+
+def open_db(filename: str, tablename: str) -> SqliteDict:
+    """
+    Open a table in a database file within the data folder. Changes are
+    committed automatically.
+
+    When running as one of several sharded worker processes, the database is
+    put in write-ahead logging mode, so that each process may read while
+    another writes. Data keyed by guild (or by message) is only ever touched
+    by the process which runs that guild's shard.
+
+    Args:
+        filename: The name of the database file
+        tablename: The name of the table
+
+    Returns:
+        The table, as a dict
+    """
+
+    key = (filename, tablename)
+
+    if key not in _dbs:
+        _dbs[key] = SqliteDict(
+            f"{data_folder}{filename}",
+            tablename=tablename,
+            autocommit=True,
+            journal_mode="DELETE" if shard_ids is None else "WAL",
+            timeout=30,
+        )
+
+    return _dbs[key]
+
+
+def flush():
+    """Wait for every pending change to be committed to disk."""
+
+    for db in _dbs.values():
+        db.commit(blocking=True)
@@ -0,0 +1,239 @@
+"""
+Supervised background task module
+
+Fire-and-forget work is spawned into a named task group rather than with
+`asyncio.ensure_future`. Each group runs at most `concurrency` tasks at once
+and queues up to `depth` more; anything beyond that is rejected (and logged)
+rather than piling up. Exceptions are logged as tasks finish, and closing a
+group (e.g. when an extension is torn down) cancels whatever is left;
+`cancel` does the same without waiting for the cancelled tasks to finish.
+
+```python
+from aethersprite.tasks import open_group, TaskGroup
+
+updates: TaskGroup
+
+
+async def setup(bot):
+    global updates
+
+    updates = open_group("thing.updates", concurrency=2, depth=50)
+
+
+async def teardown(bot):
+    await updates.close()
+
+
+def on_something():
+    updates.spawn(update())
+```
+
+Counters for every open group are available from `metrics()`.
+"""
+
+# stdlib
+import asyncio as aio
+from collections import deque
+from typing import Coroutine
+
+# local
+from . import log
+
+COUNTERS = ("spawned", "rejected", "completed", "failed", "cancelled")
+"""Names of the counters kept for each group"""
+
+
+class TaskGroup(object):
+    """A bounded group of supervised tasks"""
+
+    def __init__(self, name: str, concurrency: int = 4, depth: int = 100):
+        """
+        Args:
+            name: The group's name, for logging and metrics
+            concurrency: How many tasks may run at once
+            depth: How many tasks may wait for a free slot
+        """
+
+        self.name = name
+        self.concurrency = concurrency
+        self.depth = depth
+        self.running: set[aio.Task] = set()
+        """Tasks which are running"""
+
+        self.queued: deque[Coroutine] = deque()
+        """Coroutines waiting for a free slot"""
+
+        self.counters = {c: 0 for c in COUNTERS}
+        """Counters for the group's lifetime"""
+
+        self.peak = 0
+        """The most tasks which have been running or queued at once"""
+
+        self.closed = False
+
+    def spawn(self, coro: Coroutine) -> bool:
+        """
+        Run a coroutine in the group, or queue it if the group is busy.
+
+        Args:
+            coro: The coroutine to run
+
+        Returns:
+            Whether it was accepted; if not, it has been closed
+        """
+
+        if self.closed or (
+            len(self.running) >= self.concurrency
+            and len(self.queued) >= self.depth
+        ):
+            coro.close()
+            self.counters["rejected"] += 1
+            log.warning(
+                "Task group %s is %s; rejected %s",
+                self.name,
+                "closed" if self.closed else "full",
+                coro.__qualname__,
+            )
+
+            return False
+
+        self.counters["spawned"] += 1
+
+        if len(self.running) < self.concurrency:
+            self._start(coro)
+        else:
+            self.queued.append(coro)
+
+        self.peak = max(self.peak, len(self.running) + len(self.queued))
+
+        return True
+
+    def _start(self, coro: Coroutine):
+        task = aio.create_task(coro)
+        self.running.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: aio.Task):
+        self.running.discard(task)
+
+        if task.cancelled():
+            self.counters["cancelled"] += 1
+        elif task.exception() is not None:
+            self.counters["failed"] += 1
+            log.error(
+                "Task in group %s failed",
+                self.name,
+                exc_info=task.exception(),
+            )
+        else:
+            self.counters["completed"] += 1
+
+        if self.queued:
+            self._start(self.queued.popleft())
+
+    async def close(self, timeout: float = 0):
+        """
+        Stop accepting tasks and cancel those which are left, after giving
+        them time to finish.
+
+        Args:
+            timeout: Seconds to let running and queued tasks finish first
+        """
+
+        self.closed = True
+
+        if timeout > 0 and (self.running or self.queued):
+            try:
+                await aio.wait_for(self._drain(), timeout)
+            except aio.TimeoutError:
+                pass
+
+        running = list(self.running)
+        self.cancel()
+
+        if running:
+            await aio.gather(*running, return_exceptions=True)
+
+    def cancel(self):
+        """
+        Stop accepting tasks and cancel those which are left, without waiting
+        for them to finish.
+        """
+
+        self.closed = True
+
+        if self in _groups:
+            _groups.remove(self)
+
+        # stop queued tasks from being started as running ones are cancelled
+        queued, self.queued = self.queued, deque()
+
+        for coro in queued:
+            coro.close()
+            self.counters["cancelled"] += 1
+
+        for task in list(self.running):
+            task.cancel()
+
+    async def _drain(self):
+        while self.running or self.queued:
+            # queued tasks are started as running ones finish
+            await aio.wait(list(self.running))
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Get the group's counters and current load.
+
+        Returns:
+            The counters, plus the running, queued, and peak task counts
+        """
+
+        return {
+            **self.counters,
+            "running": len(self.running),
+            "queued": len(self.queued),
+            "peak": self.peak,
+        }
+
+
+_groups: list[TaskGroup] = []
+"""Open task groups"""
+
+
+def open_group(name: str, concurrency: int = 4, depth: int = 100) -> TaskGroup:
+    """
+    Open a task group. Several groups may share a name (e.g. one for each bot
+    an extension is loaded into); their metrics are combined.
+
+    Args:
+        name: The group's name, for logging and metrics
+        concurrency: How many tasks may run at once
+        depth: How many tasks may wait for a free slot
+
+    Returns:
+        The group
+    """
+
+    group = TaskGroup(name, concurrency, depth)
+    _groups.append(group)
+
+    return group
+
+
+def metrics() -> dict[str, dict[str, int]]:
+    """
+    Get the metrics of every open task group.
+
+    Returns:
+        Each group's metrics (see `TaskGroup.metrics`), by name
+    """
+
+    out: dict[str, dict[str, int]] = {}
+
+    for group in _groups:
+        totals = out.setdefault(group.name, {})
+
+        for key, value in group.metrics().items():
+            totals[key] = totals.get(key, 0) + value
+
+    return out
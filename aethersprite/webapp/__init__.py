@@ -26,7 +26,7 @@ def _load_ext(ext, package=None):
     if not hasattr(mod, "setup_webapp"):
         return
 
-    log.info(f"Web app setup: {mod.__name__}")
+    log.info("Web app setup: %s", mod.__name__)
     mod.setup_webapp(app, router)
 
 
@@ -0,0 +1,23 @@
+"""Test configuration"""
+
+# stdlib
+import atexit
+from os import environ
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+
+# 3rd party
+import toml
+
+# the package reads its configuration and opens its databases on import, so
+# point it at a temporary data folder before any test imports it
+_data = mkdtemp(prefix="aethersprite-tests-")
+_config = join(_data, "config.toml")
+
+with open(_config, "w") as f:
+    toml.dump({"bot": {"data_folder": _data}}, f)
+
+environ["AETHERSPRITE_CONFIG"] = _config
+environ.setdefault("DISCORD_TOKEN", "test")
+atexit.register(rmtree, _data, ignore_errors=True)
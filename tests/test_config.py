@@ -0,0 +1,56 @@
+"""Tests for merging and comparing configuration"""
+
+# local
+from aethersprite import _diff, _merge, _update
+
+
+def test_merge_overrides_nested_values():
+    base = {"bot": {"prefix": "!", "log_level": "INFO"}, "runtime": {}}
+    merged = _merge(base, {"bot": {"prefix": "?"}, "webapp": {"a": 1}})
+
+    assert merged == {
+        "bot": {"prefix": "?", "log_level": "INFO"},
+        "runtime": {},
+        "webapp": {"a": 1},
+    }
+
+
+def test_merge_leaves_its_arguments_alone():
+    base = {"bot": {"extensions": ["a"]}}
+    overrides = {"bot": {"owner": {"id": 1}}}
+    merged = _merge(base, overrides)
+    merged["bot"]["extensions"].append("b")
+    merged["bot"]["owner"]["id"] = 2
+
+    assert base == {"bot": {"extensions": ["a"]}}
+    assert overrides == {"bot": {"owner": {"id": 1}}}
+
+
+def test_merge_replaces_a_dict_with_a_scalar():
+    assert _merge({"a": {"b": 1}}, {"a": 2}) == {"a": 2}
+
+
+def test_diff_reports_dotted_keys():
+    old = {"bot": {"prefix": "!", "log_level": "INFO"}, "gone": 1}
+    new = {"bot": {"prefix": "?", "log_level": "INFO"}, "added": {"x": 2}}
+
+    assert _diff(old, new) == {
+        "bot.prefix": ("!", "?"),
+        "gone": (1, None),
+        "added": (None, {"x": 2}),
+    }
+
+
+def test_diff_of_equal_configs_is_empty():
+    config = {"bot": {"extensions": ["a", "b"]}}
+
+    assert _diff(config, {"bot": {"extensions": ["a", "b"]}}) == {}
+
+
+def test_update_keeps_nested_dicts():
+    target = {"bot": {"prefix": "!", "gone": True}, "old": 1}
+    bot = target["bot"]
+    _update(target, {"bot": {"prefix": "?"}, "new": 2})
+
+    assert target == {"bot": {"prefix": "?"}, "new": 2}
+    assert target["bot"] is bot
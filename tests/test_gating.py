@@ -0,0 +1,130 @@
+"""Tests for compiling and checking command gating policies"""
+
+# stdlib
+import asyncio as aio
+from types import SimpleNamespace
+
+# 3rd party
+import pytest
+
+# local
+from aethersprite import gating
+from aethersprite.gating import Gate, Policy
+
+
+def test_policy_combines_gates():
+    policy = Policy(
+        [
+            Gate(denied=frozenset({"wipe"})),
+            Gate(
+                denied=frozenset({"poll"}),
+                allowed=frozenset({"gmt", "utc", "poll"}),
+                exempt=("only.",),
+            ),
+            Gate(allowed=frozenset({"gmt", "poll"})),
+            Gate(name_only=True),
+        ]
+    )
+
+    assert policy.denied == {"wipe", "poll"}
+    assert policy.allowed == {"gmt", "poll"}
+    assert policy.exempt == ("only.",)
+    assert policy.name_only
+
+
+def test_policy_refuses_commands():
+    policy = Policy(
+        [
+            Gate(denied=frozenset({"wipe"})),
+            Gate(allowed=frozenset({"gmt", "wipe"}), exempt=("only.",)),
+        ]
+    )
+
+    assert policy.refuse("wipe") == "yeeted"
+    assert policy.refuse("poll") == "non-whitelisted"
+    assert policy.refuse("gmt") is None
+    assert policy.refuse("only.add") is None
+
+
+def test_empty_policy_allows_everything():
+    policy = Policy([])
+
+    assert policy.allowed is None
+    assert not policy.name_only
+    assert policy.refuse("anything") is None
+
+
+def test_policy_remembers_decisions():
+    policy = Policy([Gate(denied=frozenset({"wipe"}))])
+    policy.refuse("wipe")
+    policy.refuse("gmt")
+
+    assert policy._decisions == {"wipe": "yeeted", "gmt": None}
+
+
+@pytest.fixture
+def bot():
+    bot = SimpleNamespace(
+        add_check=lambda check: None,
+        remove_check=lambda check: None,
+        user=SimpleNamespace(mentioned_in=lambda message: False),
+    )
+
+    yield bot
+
+    gating._gates.pop(id(bot), None)
+    gating.invalidate()
+
+
+def _ctx(bot, channel: int, name: str):
+    return SimpleNamespace(
+        author="tester",
+        bot=bot,
+        channel=SimpleNamespace(id=channel),
+        command=SimpleNamespace(name=name),
+        guild=SimpleNamespace(id=1),
+        interaction=None,
+        message=None,
+    )
+
+
+def test_policies_are_compiled_once_per_channel(bot):
+    calls = []
+
+    def gate(ctx):
+        calls.append(ctx.channel.id)
+
+        return Gate(denied=frozenset({"wipe"} if ctx.channel.id == 2 else ()))
+
+    gating.add_gate(bot, "test", gate)
+
+    assert aio.run(gating.check_gates(_ctx(bot, 1, "wipe")))
+    assert aio.run(gating.check_gates(_ctx(bot, 1, "gmt")))
+    assert not aio.run(gating.check_gates(_ctx(bot, 2, "wipe")))
+    assert calls == [1, 2]
+
+    gating.invalidate(1)
+    aio.run(gating.check_gates(_ctx(bot, 1, "gmt")))
+
+    assert calls == [1, 2, 1]
+
+
+def test_name_only_requires_a_mention(bot):
+    gating.add_gate(bot, "test", lambda ctx: Gate(name_only=True))
+
+    assert not aio.run(gating.check_gates(_ctx(bot, 1, "gmt")))
+
+    bot.user.mentioned_in = lambda message: True
+
+    assert aio.run(gating.check_gates(_ctx(bot, 1, "gmt")))
+
+
+def test_failing_gates_are_skipped(bot):
+    def broken(ctx):
+        raise RuntimeError("broken")
+
+    gating.add_gate(bot, "broken", broken)
+    gating.add_gate(bot, "test", lambda ctx: Gate(denied=frozenset({"wipe"})))
+
+    assert not aio.run(gating.check_gates(_ctx(bot, 1, "wipe")))
+    assert aio.run(gating.check_gates(_ctx(bot, 1, "gmt")))
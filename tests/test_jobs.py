@@ -0,0 +1,79 @@
+"""Tests for the startup jobs' shared API budget"""
+
+# stdlib
+import asyncio as aio
+
+# local
+from aethersprite.jobs import _Budget
+
+
+async def _contend(budget: _Budget, priorities: list[int]) -> list[int]:
+    order = []
+
+    async def job(priority: int):
+        await budget.acquire(priority)
+        order.append(priority)
+        await aio.sleep(0)
+        budget.release()
+
+    await budget.acquire(0)
+    tasks = [aio.create_task(job(p)) for p in priorities]
+    await aio.sleep(0)
+    budget.release()
+    await aio.gather(*tasks)
+
+    return order
+
+
+def test_waiters_are_woken_by_priority():
+    budget = _Budget(1)
+    order = aio.run(_contend(budget, [5, 1, 3, 1, 0]))
+
+    assert order == [0, 1, 1, 3, 5]
+    assert budget.used == 0
+
+
+def test_acquires_immediately_within_the_limit():
+    async def run():
+        budget = _Budget(2)
+        await aio.wait_for(budget.acquire(9), 1)
+        await aio.wait_for(budget.acquire(9), 1)
+
+        return budget.used
+
+    assert aio.run(run()) == 2
+
+
+def test_cancelled_waiters_give_up_their_turn():
+    async def run():
+        budget = _Budget(1)
+        await budget.acquire(0)
+        cancelled = aio.create_task(budget.acquire(0))
+        waiting = aio.create_task(budget.acquire(1))
+        await aio.sleep(0)
+        cancelled.cancel()
+        await aio.sleep(0)
+        budget.release()
+        await aio.wait_for(waiting, 1)
+        budget.release()
+
+        return budget.used
+
+    assert aio.run(run()) == 0
+
+
+def test_a_slot_handed_to_a_cancelled_waiter_is_released():
+    async def run():
+        budget = _Budget(1)
+        await budget.acquire(0)
+        waiter = aio.create_task(budget.acquire(0))
+        await aio.sleep(0)
+        # the slot is handed over, then the waiter is cancelled before
+        # it gets to run
+        budget.release()
+        waiter.cancel()
+        await aio.gather(waiter, return_exceptions=True)
+
+        return budget.used
+
+    assert aio.run(run()) == 0
@@ -0,0 +1,28 @@
+"""Tests for splitting shards between worker processes"""
+
+# 3rd party
+import pytest
+
+# local
+from aethersprite.launcher import split_shards
+
+
+def test_split_evenly():
+    assert split_shards(4, 2) == [[0, 1], [2, 3]]
+
+
+def test_split_unevenly_front_loads_the_extra_shards():
+    assert split_shards(7, 3) == [[0, 1, 2], [3, 4], [5, 6]]
+
+
+def test_split_covers_every_shard_once():
+    groups = split_shards(16, 5)
+
+    assert [s for group in groups for s in group] == list(range(16))
+    assert all(groups)
+
+
+@pytest.mark.parametrize(("shards", "workers"), ((4, 0), (2, 3)))
+def test_split_needs_a_shard_per_worker(shards, workers):
+    with pytest.raises(ValueError):
+        split_shards(shards, workers)
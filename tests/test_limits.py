@@ -0,0 +1,121 @@
+"""Tests for command cooldowns and concurrency limits"""
+
+# stdlib
+import asyncio as aio
+from types import SimpleNamespace
+
+# 3rd party
+import pytest
+
+# local
+from aethersprite import limits
+from aethersprite.limits import LimitReached
+
+NAME = "thing"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(limits, "monotonic", lambda: now.value)
+
+    return now
+
+
+@pytest.fixture
+def limited():
+    limits.limit(NAME, cooldown=(2, 60), concurrency=1)
+
+    yield
+
+    limits.unlimit(NAME)
+    limits._uses.clear()
+    limits._running.clear()
+    limits._held.clear()
+
+
+def _ctx(guild: int = 1, name: str = NAME, lazy: bool = False):
+    return SimpleNamespace(
+        channel=SimpleNamespace(id=2),
+        command=SimpleNamespace(
+            extras={"lazy": True} if lazy else {}, qualified_name=name
+        ),
+        guild=SimpleNamespace(id=guild),
+    )
+
+
+async def _use(ctx):
+    await limits.before_invoke(ctx)
+    await limits.after_invoke(ctx)
+
+
+def test_cooldown_refuses_uses_beyond_the_window(limited, clock):
+    aio.run(_use(_ctx()))
+    aio.run(_use(_ctx()))
+
+    with pytest.raises(LimitReached, match="cooling down"):
+        aio.run(_use(_ctx()))
+
+
+def test_cooldown_forgets_uses_outside_the_window(limited, clock):
+    aio.run(_use(_ctx()))
+    aio.run(_use(_ctx()))
+    clock.value += 60
+    aio.run(_use(_ctx()))
+
+    assert len(limits._uses[(1, NAME)]) == 1
+
+
+def test_cooldown_is_kept_per_guild(limited, clock):
+    aio.run(_use(_ctx(guild=1)))
+    aio.run(_use(_ctx(guild=1)))
+    aio.run(_use(_ctx(guild=3)))
+
+
+def test_concurrency_holds_a_slot_until_finished(limited, clock):
+    first, second = _ctx(), _ctx()
+    aio.run(limits.before_invoke(first))
+
+    assert limits._running == {(1, NAME): 1}
+
+    with pytest.raises(LimitReached, match="already running"):
+        aio.run(limits.before_invoke(second))
+
+    aio.run(limits.after_invoke(first))
+
+    assert limits._running == {}
+    assert limits._held == {}
+
+    aio.run(limits.before_invoke(second))
+    aio.run(limits.after_invoke(second))
+
+
+def test_refused_uses_hold_no_slot(limited, clock):
+    aio.run(_use(_ctx()))
+    aio.run(_use(_ctx()))
+
+    with pytest.raises(LimitReached):
+        aio.run(limits.before_invoke(_ctx()))
+
+    assert limits._running == {}
+    assert limits._held == {}
+
+
+def test_unlimited_and_lazy_commands_are_skipped(limited, clock):
+    for _ in range(3):
+        aio.run(_use(_ctx(name="other")))
+        aio.run(_use(_ctx(lazy=True)))
+
+    assert limits._uses == {}
+
+
+def test_limits_are_refcounted():
+    limits.limit(NAME)
+    limits.limit(NAME)
+    limits.unlimit(NAME)
+
+    assert NAME in limits._limited
+
+    limits.unlimit(NAME)
+
+    assert NAME not in limits._limited
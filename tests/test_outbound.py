@@ -0,0 +1,160 @@
+"""Tests for the outbound request scheduler"""
+
+# stdlib
+import asyncio as aio
+
+# local
+from aethersprite.outbound import BACKGROUND, NORMAL, Outbox, URGENT
+
+ROUTE = ("channel", 1)
+
+
+def _recorder(order: list, gate: aio.Event | None = None):
+    def request(name):
+        async def send():
+            order.append(name)
+
+            if gate is not None:
+                await gate.wait()
+
+            return name
+
+        return send
+
+    return request
+
+
+def test_waiting_requests_start_in_lane_order():
+    async def run():
+        order = []
+        gate = aio.Event()
+        request = _recorder(order, gate)
+        box = Outbox(concurrency=1)
+        box.submit(ROUTE, request("first"), BACKGROUND)
+        futures = [
+            box.submit(ROUTE, request("background"), BACKGROUND),
+            box.submit(ROUTE, request("normal 1"), NORMAL),
+            box.submit(ROUTE, request("urgent"), URGENT),
+            box.submit(ROUTE, request("normal 2"), NORMAL),
+        ]
+        gate.set()
+        await aio.gather(*futures)
+
+        return order
+
+    assert aio.run(run()) == [
+        "first",
+        "urgent",
+        "normal 1",
+        "normal 2",
+        "background",
+    ]
+
+
+def test_coalesced_requests_send_the_last_submitted():
+    async def run():
+        order = []
+        gate = aio.Event()
+        request = _recorder(order, gate)
+        box = Outbox(concurrency=1)
+        box.submit(ROUTE, request("blocker"))
+        futures = [
+            box.submit(ROUTE, request(f"edit {n}"), key=("edit", 1))
+            for n in range(3)
+        ]
+        gate.set()
+
+        return order, await aio.gather(*futures), box.metrics()["normal"]
+
+    order, results, metrics = aio.run(run())
+
+    assert order == ["blocker", "edit 2"]
+    assert results == ["edit 2"] * 3
+    assert metrics["submitted"] == 4
+    assert metrics["coalesced"] == 2
+    assert metrics["completed"] == 2
+
+
+def test_running_requests_are_not_coalesced():
+    async def run():
+        order = []
+        gate = aio.Event()
+        request = _recorder(order, gate)
+        box = Outbox()
+        first = box.submit(ROUTE, request("edit 1"), key=("edit", 1))
+        await aio.sleep(0)
+        second = box.submit(ROUTE, request("edit 2"), key=("edit", 1))
+        gate.set()
+
+        return order, await aio.gather(first, second)
+
+    assert aio.run(run()) == (["edit 1", "edit 2"], ["edit 1", "edit 2"])
+
+
+def test_route_budget_limits_each_route():
+    async def run():
+        running = {}
+        peak = {}
+        box = Outbox(concurrency=8, route_budget=2)
+
+        def request(route):
+            async def send():
+                running[route] = running.get(route, 0) + 1
+                peak[route] = max(peak.get(route, 0), running[route])
+                await aio.sleep(0)
+                running[route] -= 1
+
+            return send
+
+        futures = [
+            box.submit(route, request(route))
+            for route in (("channel", 1), ("channel", 2)) * 5
+        ]
+        await aio.gather(*futures)
+
+        return peak, box.running
+
+    peak, running = aio.run(run())
+
+    assert peak == {("channel", 1): 2, ("channel", 2): 2}
+    assert running == 0
+
+
+def test_held_routes_do_not_block_other_routes():
+    async def run():
+        order = []
+        gate = aio.Event()
+        request = _recorder(order, gate)
+        box = Outbox(concurrency=2)
+        busy = box.submit(("channel", 1), request("busy"))
+        box.submit(("channel", 1), request("held"), URGENT)
+        other = box.submit(("channel", 2), request("other"), BACKGROUND)
+        await aio.sleep(0)
+        started = list(order)
+        gate.set()
+        await aio.gather(busy, other)
+
+        return started
+
+    assert aio.run(run()) == ["busy", "other"]
+
+
+def test_failures_reach_every_submitter():
+    async def run():
+        gate = aio.Event()
+        box = Outbox(concurrency=1)
+
+        async def fail():
+            raise RuntimeError("failed")
+
+        box.submit(ROUTE, _recorder([], gate)("blocker"))
+        futures = [box.submit(ROUTE, fail, key="k") for _ in range(2)]
+        gate.set()
+        results = await aio.gather(*futures, return_exceptions=True)
+
+        return results, box.metrics()["normal"]
+
+    results, metrics = aio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert metrics["failed"] == 1
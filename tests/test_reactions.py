@@ -0,0 +1,118 @@
+"""Tests for routing reactions to their messages' handlers"""
+
+# stdlib
+import asyncio as aio
+from types import SimpleNamespace
+
+# 3rd party
+import pytest
+
+# local
+from aethersprite import reactions
+
+BOT_ID = 1
+USER_ID = 2
+
+
+@pytest.fixture
+def bot():
+    bot = SimpleNamespace(
+        listeners=[],
+        user=SimpleNamespace(id=BOT_ID),
+    )
+    bot.add_listener = bot.listeners.append
+    bot.remove_listener = bot.listeners.remove
+
+    yield bot
+
+    reactions._routers.pop(id(bot), None)
+
+
+def _payload(message_id: int, user_id: int = USER_ID):
+    return SimpleNamespace(message_id=message_id, user_id=user_id)
+
+
+def _handler(seen: list, name: str):
+    async def handle(payload):
+        seen.append((name, payload.message_id))
+
+    return handle
+
+
+async def _react(bot, *payloads, added: bool = True):
+    for payload in payloads:
+        for listener in bot.listeners:
+            if listener.__name__ == (
+                "on_raw_reaction_add" if added else "on_raw_reaction_remove"
+            ):
+                await listener(payload)
+
+
+def test_reactions_reach_only_their_owner(bot):
+    seen = []
+    reactions.add_handler(bot, "poll", _handler(seen, "poll"))
+    reactions.add_handler(
+        bot, "roles", _handler(seen, "roles"), _handler(seen, "unrole")
+    )
+    reactions.track(bot, "poll", 10)
+    reactions.track(bot, "roles", 20)
+    aio.run(_react(bot, _payload(10), _payload(20), _payload(30)))
+    aio.run(_react(bot, _payload(10), _payload(20), added=False))
+
+    assert seen == [("poll", 10), ("roles", 20), ("unrole", 20)]
+    assert reactions.ignored() == 1
+    assert reactions.metrics() == {
+        "poll": {"messages": 1, "added": 1, "removed": 0},
+        "roles": {"messages": 1, "added": 1, "removed": 1},
+    }
+
+
+def test_the_bots_own_reactions_are_dropped(bot):
+    seen = []
+    reactions.add_handler(bot, "poll", _handler(seen, "poll"))
+    reactions.track(bot, "poll", 10)
+    aio.run(_react(bot, _payload(10, BOT_ID)))
+
+    assert seen == []
+
+
+def test_tracking_moves_a_message_between_handlers(bot):
+    seen = []
+    reactions.add_handler(bot, "poll", _handler(seen, "poll"))
+    reactions.add_handler(bot, "roles", _handler(seen, "roles"))
+    reactions.track(bot, "poll", 10)
+    reactions.track(bot, "roles", 10)
+    aio.run(_react(bot, _payload(10)))
+
+    assert seen == [("roles", 10)]
+    assert reactions.metrics()["poll"]["messages"] == 0
+
+
+def test_untracked_messages_are_ignored(bot):
+    seen = []
+    reactions.add_handler(bot, "poll", _handler(seen, "poll"))
+    reactions.track(bot, "poll", 10)
+    reactions.untrack(bot, 10)
+    aio.run(_react(bot, _payload(10)))
+
+    assert seen == []
+    assert not reactions.tracked(bot, 10)
+
+
+def test_removing_the_last_handler_stops_listening(bot):
+    reactions.add_handler(bot, "poll", _handler([], "poll"))
+    reactions.add_handler(bot, "roles", _handler([], "roles"))
+    reactions.track(bot, "poll", 10)
+
+    assert len(bot.listeners) == 2
+
+    reactions.remove_handler(bot, "poll")
+
+    assert not reactions.tracked(bot, 10)
+    assert reactions.get_handler(bot, "poll") is None
+    assert len(bot.listeners) == 2
+
+    reactions.remove_handler(bot, "roles")
+
+    assert bot.listeners == []
+    assert id(bot) not in reactions._routers
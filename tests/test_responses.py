@@ -0,0 +1,61 @@
+"""Tests for the response cache"""
+
+# local
+from aethersprite.responses import ResponseCache
+
+
+def _key(name: str, guild: int = 1):
+    return (name, guild, 2, ())
+
+
+def test_get_counts_hits_and_misses():
+    cache = ResponseCache()
+
+    assert cache.get(_key("a")) is None
+
+    cache.put(_key("a"), "text", ())
+
+    assert cache.get(_key("a")) == "text"
+    assert cache.metrics() == {
+        "hits": 1,
+        "misses": 1,
+        "invalidations": 0,
+        "entries": 1,
+    }
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResponseCache(size=2)
+    cache.put(_key("a"), "a", ("x",))
+    cache.put(_key("b"), "b", ())
+    cache.get(_key("a"))
+    cache.put(_key("c"), "c", ())
+
+    assert list(cache.entries) == [_key("a"), _key("c")]
+
+    cache.put(_key("d"), "d", ())
+
+    assert list(cache.entries) == [_key("c"), _key("d")]
+    assert cache.tagged == {}
+
+
+def test_invalidate_discards_only_tagged_responses():
+    cache = ResponseCache()
+    cache.put(_key("a", 1), "a", ("alias:1",))
+    cache.put(_key("a", 3), "a", ("alias:3",))
+    cache.put(_key("b", 1), "b", ("alias:1", "settings"))
+    cache.invalidate("alias:1")
+
+    assert list(cache.entries) == [_key("a", 3)]
+    assert cache.tagged == {"alias:3": {_key("a", 3)}}
+    assert cache.invalidations == 2
+
+
+def test_replacing_a_response_drops_its_old_tags():
+    cache = ResponseCache()
+    cache.put(_key("a"), "old", ("x",))
+    cache.put(_key("a"), "new", ("y",))
+    cache.invalidate("x")
+
+    assert cache.get(_key("a")) == "new"
+    assert cache.tagged == {"y": {_key("a")}}